@@ -0,0 +1,80 @@
+"""
+Overhead of `api_request`, `create_request` and generated methods without network.
+
+Client answers every request at once, so measured time is the time spent by vkwave itself:
+choosing token and client, creating request context, sending signals, checking response.
+
+Run from repository root:
+
+    python -m benchmarks.api_request_overhead [iterations]
+"""
+import asyncio
+import functools
+import sys
+import time
+import typing
+
+from vkwave.api import API
+from vkwave.client import AIOHTTPClient
+from vkwave.client.types import MethodName
+
+RESPONSE = {"response": 1}
+
+
+class NoopClient(AIOHTTPClient):
+    """Real client (context creation, signals) which doesn't do HTTP requests"""
+
+    async def request_callback(self, method_name: MethodName, params: dict) -> dict:
+        return RESPONSE
+
+
+def per_call_us(started: float, iterations: int) -> float:
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+def bench_create_request(client: AIOHTTPClient, iterations: int) -> float:
+    method_name = MethodName("users.get")
+    started = time.perf_counter()
+    for _ in range(iterations):
+        client.create_request(method_name, {})
+    return per_call_us(started, iterations)
+
+
+async def bench_api_request(api: API, iterations: int) -> float:
+    ctx = api.get_context()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await ctx.api_request("users.get", {})
+    return per_call_us(started, iterations)
+
+
+async def bench_method(method: typing.Callable, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await method(return_raw_response=True, peer_id=1, message="hi", random_id=0)
+    return per_call_us(started, iterations)
+
+
+async def main(iterations: int) -> None:
+    client = NoopClient()
+    api = API("token", clients=client)
+    try:
+        # warm up caches of pydantic, logging and strategies
+        await bench_api_request(api, 1000)
+        bench_create_request(client, 1000)
+        messages = api.get_context().messages
+        # body of generated module: get_params(locals()) and name lookup on every call
+        generic_send = functools.partial(type(messages).send.__wrapped__, messages)
+        await bench_method(messages.send, 1000)
+        await bench_method(generic_send, 1000)
+
+        print(f"create_request: {bench_create_request(client, iterations):.2f} us/call")
+        print(f"api_request:    {await bench_api_request(api, iterations):.2f} us/call")
+        print(f"messages.send:  {await bench_method(messages.send, iterations):.2f} us/call")
+        print(f"  not compiled: {await bench_method(generic_send, iterations):.2f} us/call")
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000))
@@ -0,0 +1,48 @@
+import asyncio
+import typing
+
+import pytest
+from aiohttp import ClientConnectionError
+
+from vkwave.client.abstract import AbstractAPIClient
+from vkwave.client.context import RequestContext
+from vkwave.client.factory import AbstractFactory, DefaultFactory
+from vkwave.client.types import MethodName
+
+Responder = typing.Callable[[MethodName, dict], typing.Awaitable[dict]]
+
+
+class FakeAPIClient(AbstractAPIClient):
+    """Client which answers with `responder` instead of doing HTTP requests."""
+
+    def __init__(self, responder: Responder):
+        self._factory = DefaultFactory()
+        self.responder = responder
+        self.calls: typing.List[typing.Tuple[MethodName, dict]] = []
+
+    @property
+    def context_factory(self) -> AbstractFactory:
+        return self._factory
+
+    def set_context_factory(self, factory: AbstractFactory) -> None:
+        self._factory = factory
+
+    def create_request(self, method_name: MethodName, params: dict) -> RequestContext:
+        return self.context_factory.create_context(
+            exceptions={ClientConnectionError: None, asyncio.TimeoutError: None},
+            request_callback=self.request_callback,
+            request_params=params,
+            method_name=method_name,
+        )
+
+    async def request_callback(self, method_name: MethodName, params: dict) -> dict:
+        self.calls.append((method_name, dict(params)))
+        return await self.responder(method_name, params)
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_client():
+    return FakeAPIClient
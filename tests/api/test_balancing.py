@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+from aiohttp import ClientConnectionError
+
+from vkwave.api import (
+    API,
+    BalancedGetClientStrategy,
+    EWMALatencyBalancer,
+    LeastInFlightBalancer,
+    WeightedRoundRobinBalancer,
+)
+from vkwave.api.methods._error import APIError
+from vkwave.api.token import BalancedGetTokenStrategy
+from vkwave.api.token.token import BotSyncSingleToken, Token
+
+
+def test_least_in_flight():
+    balancer = LeastInFlightBalancer()
+    first = balancer.choose(["a", "b"])
+    second = balancer.choose(["a", "b"])
+    assert {first, second} == {"a", "b"}
+
+    balancer.release(first, 0.1)
+    assert balancer.choose(["a", "b"]) == first
+
+
+def test_weighted_round_robin():
+    balancer = WeightedRoundRobinBalancer(weights={"a": 3})
+    chosen = [balancer.choose(["a", "b"]) for _ in range(8)]
+    assert chosen.count("a") == 6
+    assert chosen.count("b") == 2
+
+
+def test_ewma_latency():
+    balancer = EWMALatencyBalancer()
+    for item, latency in (("slow", 1.0), ("fast", 0.1)):
+        balancer.choose([item])
+        balancer.release(item, latency)
+
+    assert balancer.choose(["slow", "fast"]) == "fast"
+
+
+def test_ewma_spreads_burst_between_new_items():
+    balancer = EWMALatencyBalancer()
+    chosen = [balancer.choose(["a", "b", "c"]) for _ in range(9)]
+    assert sorted(chosen) == ["a"] * 3 + ["b"] * 3 + ["c"] * 3
+
+
+def test_ejected_after_failures():
+    balancer = LeastInFlightBalancer(max_failures=2)
+    for _ in range(2):
+        balancer.choose(["a"])
+        balancer.release("a", 0.1, failed=True)
+
+    assert balancer.is_ejected("a")
+    assert balancer.choose(["a", "b"]) == "b"
+    # everything is ejected, so anything is better than nothing
+    assert balancer.choose(["a"]) == "a"
+
+
+@pytest.mark.asyncio
+async def test_token_is_ejected_on_auth_error(fake_client):
+    async def responder(method_name, params):
+        if params["access_token"] == "bad":
+            return {"error": {"error_code": 5, "error_msg": "Auth", "request_params": []}}
+        return {"response": 1}
+
+    bad, good = BotSyncSingleToken(Token("bad")), BotSyncSingleToken(Token("good"))
+    strategy = BalancedGetTokenStrategy(WeightedRoundRobinBalancer())
+    api = API([bad, good], fake_client(responder), get_token_strategy=strategy).get_context()
+
+    for _ in range(2):
+        try:
+            await api.api_request("users.get", {})
+        except APIError as e:
+            assert e.code == 5
+
+    assert strategy.balancer.is_ejected(bad)
+    for _ in range(3):
+        assert await api.api_request("users.get", {}) == {"response": 1}
+
+
+@pytest.mark.asyncio
+async def test_client_is_ejected_on_connection_errors(fake_client):
+    async def broken(method_name, params):
+        raise ClientConnectionError()
+
+    async def working(method_name, params):
+        return {"response": 1}
+
+    broken_client, working_client = fake_client(broken), fake_client(working)
+    strategy = BalancedGetClientStrategy(WeightedRoundRobinBalancer(max_failures=1))
+    api = API(
+        BotSyncSingleToken(Token("t")),
+        [broken_client, working_client],
+        get_client_strategy=strategy,
+    ).get_context()
+
+    for _ in range(2):
+        try:
+            await api.api_request("users.get", {})
+        except ClientConnectionError:
+            pass
+
+    assert strategy.balancer.is_ejected(broken_client)
+    assert await api.api_request("users.get", {}) == {"response": 1}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request_is_released(fake_client):
+    async def slow(method_name, params):
+        await asyncio.sleep(10)
+
+    client = fake_client(slow)
+    client_strategy = BalancedGetClientStrategy(LeastInFlightBalancer())
+    token_strategy = BalancedGetTokenStrategy(LeastInFlightBalancer())
+    api = API(
+        BotSyncSingleToken(Token("t")),
+        client,
+        get_client_strategy=client_strategy,
+        get_token_strategy=token_strategy,
+    ).get_context()
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(api.api_request("users.get", {}), 0.01)
+
+    assert client_strategy.balancer.health[client].in_flight == 0
+    assert all(health.in_flight == 0 for health in token_strategy.balancer.health.values())
@@ -0,0 +1,59 @@
+import re
+
+import pytest
+
+from vkwave.api import API, BulkFetcher, PageSpec
+from vkwave.api.token.token import BotSyncSingleToken, Token
+
+TOTAL = 95
+
+
+def get_api(client):
+    return API(BotSyncSingleToken(Token("t")), client).get_context()
+
+
+async def execute_responder(method_name, params):
+    """Runs compiled script of PageSpec("groups.getMembers", page_size=5)"""
+    code = params["code"]
+    assert 'API.groups.getMembers({"group_id": 1, "count": 5, "offset": offset})' in code
+    offset = int(re.search(r"var offset = (\d+);", code).group(1))
+    calls = int(re.search(r"while \(calls < (\d+)", code).group(1))
+    if calls > 8:
+        error = {"error_code": 13, "error_msg": "Response size is too big", "request_params": []}
+        return {"error": error}
+
+    items = list(range(offset, min(offset + calls * 5, TOTAL)))
+    return {"response": {"items": items, "offset": offset + calls * 5, "count": TOTAL}}
+
+
+@pytest.mark.asyncio
+async def test_bulk_fetcher_shrinks_batch(fake_client):
+    client = fake_client(execute_responder)
+    fetcher = BulkFetcher(get_api(client), PageSpec("groups.getMembers", page_size=5))
+
+    items = [item async for item in fetcher.items(group_id=1)]
+
+    assert items == list(range(TOTAL))
+    # 25 and 12 pages fail, then 6, 7 and 8 pages are fetched
+    assert fetcher.requests == 5
+    assert fetcher.calls == 9
+
+
+@pytest.mark.asyncio
+async def test_bulk_fetcher_max_items(fake_client):
+    client = fake_client(execute_responder)
+    spec = PageSpec("groups.getMembers", page_size=5)
+    fetcher = BulkFetcher(get_api(client), spec, max_calls=2)
+
+    pages = [page async for page in fetcher.pages(offset=10, max_items=12, group_id=1)]
+
+    assert pages == [list(range(10, 20)), [20, 21]]
+
+
+def test_page_spec_sort():
+    spec = PageSpec("groups.getMembers", page_size=5, sort="id_asc")
+    assert '"sort": "id_asc", "count": 5' in spec.compile({"group_id": 1}, 0, 1, None)
+    assert '"sort": "time_desc"' in spec.compile({"sort": "time_desc"}, 0, 1, None)
+
+    history = PageSpec("messages.getHistory", sort=True, sort_param="rev")
+    assert '"rev": 1' in history.compile({}, 0, 1, None)
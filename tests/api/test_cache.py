@@ -0,0 +1,125 @@
+import pytest
+
+from vkwave.api import API, ResponseCache
+from vkwave.api.token.token import BotSyncSingleToken, Token
+from vkwave.bots.storage.storages import TTLStorage
+
+
+async def responder(method_name, params):
+    return {"response": [params.get("user_ids")]}
+
+
+def get_api(client, cache, token="t"):
+    return API(BotSyncSingleToken(Token(token)), client, response_cache=cache).get_context()
+
+
+@pytest.mark.asyncio
+async def test_configured_method_is_cached(fake_client):
+    client = fake_client(responder)
+    cache = ResponseCache(ttls={"users.get": 60})
+    api = get_api(client, cache)
+
+    first = await api.api_request("users.get", {"user_ids": "1"})
+    second = await api.api_request("users.get", {"user_ids": "1"})
+    await api.api_request("users.get", {"user_ids": "2"})
+
+    assert first == second == {"response": ["1"]}
+    assert len(client.calls) == 2
+    assert cache.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_not_configured_method_is_not_cached(fake_client):
+    client = fake_client(responder)
+    api = get_api(client, ResponseCache(ttls={"users.get": 60}))
+
+    for _ in range(2):
+        await api.api_request("groups.getById", {})
+    assert len(client.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_with_cache_caches_only_read_methods(fake_client):
+    client = fake_client(responder)
+    api = get_api(client, ResponseCache()).with_cache()
+
+    for _ in range(2):
+        await api.api_request("groups.getById", {})
+        await api.api_request("messages.send", {})
+    assert [method for method, _ in client.calls] == [
+        "groups.getById",
+        "messages.send",
+        "messages.send",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_tokens_have_own_scope(fake_client):
+    client = fake_client(responder)
+    cache = ResponseCache(ttls={"users": 60})
+
+    await get_api(client, cache, "a").api_request("users.get", {})
+    await get_api(client, cache, "b").api_request("users.get", {})
+    assert len(client.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_lru_and_invalidation(fake_client):
+    client = fake_client(responder)
+    cache = ResponseCache(
+        ttls={"users.get": 60}, max_size=1, invalidate_on={"account.saveProfileInfo": ["users"]}
+    )
+    api = get_api(client, cache)
+
+    await api.api_request("users.get", {"user_ids": "1"})
+    await api.api_request("users.get", {"user_ids": "2"})
+    await api.api_request("users.get", {"user_ids": "1"})
+    assert len(client.calls) == 3
+
+    await api.api_request("account.saveProfileInfo", {})
+    await api.api_request("users.get", {"user_ids": "1"})
+    assert len(client.calls) == 5
+
+
+@pytest.mark.asyncio
+async def test_storage_tier(fake_client):
+    client = fake_client(responder)
+    storage = TTLStorage()
+    ttls = {"users.get": 60}
+
+    await get_api(client, ResponseCache(ttls=ttls, storage=storage)).api_request("users.get", {})
+    # another process with empty memory tier
+    result = await get_api(client, ResponseCache(ttls=ttls, storage=storage)).api_request(
+        "users.get", {}
+    )
+
+    assert result == {"response": [None]}
+    assert len(client.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_hits_are_copies(fake_client):
+    client = fake_client(responder)
+    api = get_api(client, ResponseCache(ttls={"users.get": 60}))
+
+    first = await api.api_request("users.get", {"user_ids": "1"})
+    first["response"].append("changed")
+
+    assert await api.api_request("users.get", {"user_ids": "1"}) == {"response": ["1"]}
+
+
+@pytest.mark.asyncio
+async def test_storage_hits_are_kept_in_memory(fake_client):
+    client = fake_client(responder)
+    storage = TTLStorage()
+    ttls = {"users.get": 60}
+    await get_api(client, ResponseCache(ttls=ttls, storage=storage)).api_request("users.get", {})
+
+    cache = ResponseCache(ttls=ttls, storage=storage)
+    api = get_api(client, cache)
+    await api.api_request("users.get", {})
+    await storage.delete(next(iter(cache._data)))
+
+    assert await api.api_request("users.get", {}) == {"response": [None]}
+    assert cache.hits == 2
+    assert len(client.calls) == 1
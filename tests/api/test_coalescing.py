@@ -0,0 +1,148 @@
+import asyncio
+import json
+import re
+import time
+
+import pytest
+
+from vkwave.api import API, ExecuteCoalescer
+from vkwave.api.methods import ExecuteResultError
+from vkwave.api.methods._error import APIError
+from vkwave.api.token import RateLimitedGetTokenStrategy
+from vkwave.api.token.token import BotSyncSingleToken, Token
+
+CALL_RE = re.compile(r"API\.([\w.]+)\((\{.*?\})\)")
+
+
+async def execute_responder(method_name, params):
+    if method_name != "execute":
+        return {"response": {"method": method_name}}
+    responses, errors = [], []
+    for method, args in CALL_RE.findall(params["code"]):
+        if method == "messages.send":
+            responses.append(False)
+            errors.append({"method": method, "error_code": 901, "error_msg": "Can't send"})
+        else:
+            responses.append(json.loads(args)["user_ids"])
+    result = {"response": responses}
+    if errors:
+        result["execute_errors"] = errors
+    return result
+
+
+def get_api(client, **kwargs):
+    coalescer = ExecuteCoalescer(**kwargs)
+    return API(BotSyncSingleToken(Token("t")), client, coalescer=coalescer).get_context()
+
+
+@pytest.mark.asyncio
+async def test_calls_are_packed(fake_client):
+    client = fake_client(execute_responder)
+    api = get_api(client)
+
+    results = await asyncio.gather(
+        *(api.api_request("users.get", {"user_ids": str(i)}) for i in range(3))
+    )
+
+    assert [r["response"] for r in results] == ["0", "1", "2"]
+    assert len(client.calls) == 1
+    assert client.calls[0][0] == "execute"
+
+
+@pytest.mark.asyncio
+async def test_batch_is_flushed_on_max_calls(fake_client):
+    client = fake_client(execute_responder)
+    api = get_api(client, window=10, max_calls=2)
+
+    results = await asyncio.gather(
+        *(api.api_request("users.get", {"user_ids": str(i)}) for i in range(2))
+    )
+
+    assert [r["response"] for r in results] == ["0", "1"]
+
+
+@pytest.mark.asyncio
+async def test_execute_errors_are_split(fake_client):
+    client = fake_client(execute_responder)
+    api = get_api(client)
+
+    users, message = await asyncio.gather(
+        api.api_request("users.get", {"user_ids": "1"}),
+        api.api_request("messages.send", {"peer_id": 1}),
+        return_exceptions=True,
+    )
+
+    assert users == {"response": "1"}
+    assert isinstance(message, APIError)
+    assert message.code == 901
+
+
+@pytest.mark.asyncio
+async def test_excluded_methods_are_not_packed(fake_client):
+    client = fake_client(execute_responder)
+    api = get_api(client)
+
+    result = await api.api_request("execute", {"code": "return 1;"})
+
+    assert client.calls[0][1]["code"] == "return 1;"
+    assert result == {"response": []}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("response", [["0"], False])
+async def test_missing_results_fail(fake_client, response):
+    async def responder(method_name, params):
+        return {"response": response}
+
+    api = get_api(fake_client(responder))
+
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            *(api.api_request("users.get", {"user_ids": str(i)}) for i in range(2)),
+            return_exceptions=True,
+        ),
+        1,
+    )
+
+    assert isinstance(results[1], ExecuteResultError)
+    if response == ["0"]:
+        assert results[0] == {"response": "0"}
+
+
+@pytest.mark.asyncio
+async def test_request_params_of_errors_are_in_vk_format(fake_client):
+    client = fake_client(execute_responder)
+    api = get_api(client)
+
+    _, message = await asyncio.gather(
+        api.api_request("users.get", {"user_ids": "1"}),
+        api.api_request("messages.send", {"peer_id": 1}),
+        return_exceptions=True,
+    )
+
+    assert message.request_params == [
+        {"key": "method", "value": "messages.send"},
+        {"key": "peer_id", "value": "1"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_is_taken_by_execute(fake_client):
+    client = fake_client(execute_responder)
+    strategy = RateLimitedGetTokenStrategy()
+    api = API(
+        BotSyncSingleToken(Token("t")),
+        client,
+        get_token_strategy=strategy,
+        coalescer=ExecuteCoalescer(),
+    ).get_context()
+
+    start = time.monotonic()
+    results = await asyncio.gather(
+        *(api.api_request("users.get", {"user_ids": str(i)}) for i in range(25))
+    )
+
+    assert [r["response"] for r in results] == [str(i) for i in range(25)]
+    assert [method for method, _ in client.calls] == ["execute"]
+    assert strategy.buckets[Token("t")].requests == 1
+    assert time.monotonic() - start < 0.5
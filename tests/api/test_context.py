@@ -0,0 +1,43 @@
+import pytest
+
+from vkwave.api import API
+from vkwave.api.methods.messages import Messages
+
+
+async def responder(method_name, params):
+    return {"response": [{"id": 1, "first_name": "a", "last_name": "b"}]}
+
+
+def test_categories_are_created_lazily(fake_client):
+    ctx = API("t", fake_client(responder)).get_context()
+    assert "messages" not in vars(ctx)
+
+    messages = ctx.messages
+    assert isinstance(messages, Messages)
+    assert messages.category_name == "messages"
+    assert ctx.messages is messages
+    assert ctx.lead_forms.category_name == "leadForms"
+
+
+@pytest.mark.asyncio
+async def test_lazy_category_requests(fake_client):
+    client = fake_client(responder)
+    ctx = API("t", client).get_context()
+    await ctx.users.get(user_ids=1)
+    assert client.calls[0][0] == "users.get"
+
+
+def test_token_contexts_are_cached(fake_client):
+    api = API("t", fake_client(responder))
+    api.token_contexts_size = 2
+
+    first = api.with_token("a")
+    assert api.with_token("a") is first
+    assert first.api_options.tokens == ["a"]
+    assert api.with_token("b") is not first
+
+    api.with_token("a")
+    api.with_token("c")
+    # least recently used context is dropped
+    assert api.with_token("a") is first
+    assert list(api._token_contexts) == ["c", "a"]
@@ -0,0 +1,131 @@
+import asyncio
+import gc
+import weakref
+
+import pytest
+
+from vkwave.api import API, ResponseCache
+from vkwave.api.methods import UsersLoader
+from vkwave.api.token.token import BotSyncSingleToken, Token
+
+
+async def responder(method_name, params):
+    if method_name == "users.get":
+        ids = [int(user_id) for user_id in params["user_ids"].split(",")]
+        return {
+            "response": [
+                {
+                    "id": user_id,
+                    "first_name": "A",
+                    "last_name": "B",
+                    "domain": params.get("fields"),
+                }
+                for user_id in ids
+                if user_id != 404
+            ]
+        }
+    if method_name == "groups.isMember":
+        ids = [int(user_id) for user_id in params["user_ids"].split(",")]
+        return {"response": [{"user_id": user_id, "member": user_id % 2} for user_id in ids]}
+    raise AssertionError(method_name)
+
+
+def get_api(client):
+    return API(BotSyncSingleToken(Token("t")), client).get_context()
+
+
+@pytest.mark.asyncio
+async def test_users_are_loaded_in_one_request(fake_client):
+    client = fake_client(responder)
+    api = get_api(client)
+
+    users = await asyncio.gather(*(api.loaders.users.load(user_id) for user_id in (1, 2, 2, 3)))
+
+    assert [user.id for user in users] == [1, 2, 2, 3]
+    assert client.calls == [
+        ("users.get", {"user_ids": "1,2,3", "v": "5.131", "access_token": "t"})
+    ]
+
+
+@pytest.mark.asyncio
+async def test_one_request_per_fields_set(fake_client):
+    client = fake_client(responder)
+    api = get_api(client)
+
+    photo, plain, missing = await asyncio.gather(
+        api.loaders.users.load(1, fields=["photo_50"]),
+        api.loaders.users.load(2),
+        api.loaders.users.load(404),
+    )
+
+    assert photo.domain == "photo_50"
+    assert plain.domain is None
+    assert missing is None
+    assert len(client.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_loaders_are_shared_between_contexts(fake_client):
+    client = fake_client(responder)
+    api = API(BotSyncSingleToken(Token("t")), client)
+
+    await asyncio.gather(
+        api.get_context().loaders.is_member.load(1, group_id=1),
+        api.get_context().loaders.is_member.load(2, group_id=1),
+    )
+    assert len(client.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_loaders_keep_cache_of_context(fake_client):
+    client = fake_client(responder)
+    api = API(BotSyncSingleToken(Token("t")), client, response_cache=ResponseCache())
+    cached_ctx = api.get_context().with_cache(60)
+
+    assert cached_ctx.loaders is not api.get_context().loaders
+    assert cached_ctx.loaders is api.get_context().with_cache(60).loaders
+
+    await cached_ctx.loaders.users.load(1)
+    await cached_ctx.loaders.users.load(1)
+    # second request is answered by response cache of context
+    assert len(client.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_cache(fake_client):
+    client = fake_client(responder)
+    loader = UsersLoader(get_api(client), cache_ttl=60)
+
+    await loader.load(1)
+    await loader.load(1)
+    assert len(client.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_every_awaiter_gets_own_object(fake_client):
+    client = fake_client(responder)
+    api = get_api(client)
+    cached_loader = UsersLoader(api, cache_ttl=60)
+
+    first, second = await asyncio.gather(api.loaders.users.load(1), api.loaders.users.load(1))
+    assert first == second
+    assert first is not second
+
+    first = await cached_loader.load(1)
+    second = await cached_loader.load(1)
+    assert first == second
+    assert first is not second
+
+
+@pytest.mark.asyncio
+async def test_loaders_of_token_contexts_are_dropped_with_them(fake_client):
+    api = API(BotSyncSingleToken(Token("t")), fake_client(responder))
+    api.token_contexts_size = 2
+
+    loaders = [
+        weakref.ref(api.with_token(BotSyncSingleToken(Token(str(i)))).loaders) for i in range(10)
+    ]
+    gc.collect()
+
+    assert api.default_api_options.loaders == {}
+    assert sum(ref() is not None for ref in loaders) == 2
@@ -0,0 +1,73 @@
+import pytest
+
+from vkwave.api import API, paginate
+from vkwave.api.token.token import BotSyncSingleToken, Token
+from vkwave.types.objects import UsersUserFull
+
+
+def get_api(client):
+    return API(BotSyncSingleToken(Token("t")), client).get_context()
+
+
+async def members_responder(method_name, params):
+    offset, count = params["offset"], params["count"]
+    return {"response": {"count": 25, "items": list(range(offset, min(offset + count, 25)))}}
+
+
+@pytest.mark.asyncio
+async def test_offset_pagination_stops_on_count(fake_client):
+    client = fake_client(members_responder)
+    items = [item async for item in paginate(get_api(client), "groups.getMembers", page_size=10)]
+
+    assert items == list(range(25))
+    assert [params["offset"] for _, params in client.calls] == [0, 10, 20]
+
+
+@pytest.mark.asyncio
+async def test_max_items_and_typed_items(fake_client):
+    async def responder(method_name, params):
+        assert params["fields"] == "sex"
+        offset = params["offset"]
+        return {
+            "response": {
+                "count": 100,
+                "items": [
+                    {"id": i, "first_name": "A", "last_name": "B"}
+                    for i in range(offset, offset + params["count"])
+                ],
+            }
+        }
+
+    client = fake_client(responder)
+    users = paginate(
+        get_api(client),
+        "friends.get",
+        item_model=UsersUserFull,
+        page_size=5,
+        prefetch=1,
+        max_items=7,
+        fields=["sex"],
+    )
+    result = [user async for user in users]
+
+    assert [user.id for user in result] == list(range(7))
+    assert isinstance(result[0], UsersUserFull)
+    assert len(client.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_cursor_pagination(fake_client):
+    pages = {None: ("a", [1, 2]), "a": ("b", [3]), "b": (None, [4])}
+
+    async def responder(method_name, params):
+        next_from, items = pages[params.get("start_from")]
+        response = {"items": items}
+        if next_from:
+            response["next_from"] = next_from
+        return {"response": response}
+
+    client = fake_client(responder)
+    posts = paginate(get_api(client), "newsfeed.search", cursor_param="start_from", q="vk")
+
+    assert [post async for post in posts] == [1, 2, 3, 4]
+    assert client.calls[0][1]["q"] == "vk"
@@ -0,0 +1,75 @@
+import functools
+import inspect
+
+import pytest
+
+from vkwave.api import API
+from vkwave.api.methods._category import Category
+from vkwave.api.methods._utils import get_params
+from vkwave.api.token.token import BotSyncSingleToken, Token
+from vkwave.types.extension_responses import MessagesSendPeerIdsResponse
+from vkwave.types.objects import BaseBoolInt, UsersFields
+
+
+def _method(self=None, return_raw_response=False, user_ids=None, fields=None, extended=None):
+    return get_params(locals())
+
+
+def test_get_params_encodes_values():
+    params = _method(
+        user_ids=[1, "durov"],
+        fields=[UsersFields.PHOTO_50, UsersFields.SEX],
+        extended=True,
+    )
+    assert params == {"user_ids": "1,durov", "fields": "photo_50,sex", "extended": 1}
+
+
+def test_get_params_skips_none_and_service_locals():
+    assert _method(user_ids=(1, 2), extended=BaseBoolInt.NO) == {"user_ids": "1,2", "extended": 0}
+
+
+def test_method_names_are_shared():
+    first = Category("users", None).make_method_name("get")  # type: ignore
+    second = Category("users", None).make_method_name("get")  # type: ignore
+    assert first == "users.get"
+    assert first is second
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "category, method, kwargs",
+    [
+        ("users", "get", {"user_ids": [1, "durov"], "fields": [UsersFields.PHOTO_50]}),
+        ("users", "get", {"user_ids": ("1",), "name_case": None}),
+        ("groups", "get_members", {"group_id": "1", "filter": "managers", "count": 10}),
+        ("groups", "get", {"user_id": 1, "extended": True, "fields": ["city"]}),
+        ("messages", "send", {"peer_id": 1, "message": "hi", "random_id": 0}),
+        ("messages", "send", {"peer_ids": [1, 2], "random_id": 0, "dont_parse_links": False}),
+        ("wall", "post", {"owner_id": -1, "message": "hi", "attachments": "photo1_1"}),
+    ],
+)
+async def test_compiled_methods_send_same_request(fake_client, category, method, kwargs):
+    async def responder(method_name, params):
+        return {"response": {}}
+
+    client = fake_client(responder)
+    ctx = API(BotSyncSingleToken(Token("t")), client).get_context()
+    compiled = getattr(getattr(ctx, category), method)
+    original = functools.partial(inspect.unwrap(compiled), getattr(ctx, category))
+    assert compiled.__func__ is not inspect.unwrap(compiled)
+
+    assert await compiled(return_raw_response=True, **kwargs) == {"response": {}}
+    await original(return_raw_response=True, **kwargs)
+    assert client.calls[0] == client.calls[1]
+    assert inspect.signature(compiled) == inspect.signature(original)
+
+
+@pytest.mark.asyncio
+async def test_compiled_methods_choose_same_response_model(fake_client):
+    async def responder(method_name, params):
+        return {"response": [{"peer_id": 1, "message_id": 1}]}
+
+    ctx = API(BotSyncSingleToken(Token("t")), fake_client(responder)).get_context()
+
+    result = await ctx.messages.send(peer_ids=[1], random_id=0)
+    assert isinstance(result, MessagesSendPeerIdsResponse)
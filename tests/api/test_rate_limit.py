@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+import pytest
+
+from vkwave.api import API
+from vkwave.api.methods._error import APIError
+from vkwave.api.token import RateLimitedGetTokenStrategy
+from vkwave.api.token.token import BotSyncSingleToken, Token, TokenType, UserSyncSingleToken
+
+
+@pytest.mark.asyncio
+async def test_callers_wait_for_free_slot():
+    strategy = RateLimitedGetTokenStrategy(limits={TokenType.BOT: 100})
+    tokens = [BotSyncSingleToken(Token("t"))]
+
+    start = time.monotonic()
+    await asyncio.gather(*(strategy.get_token(tokens) for _ in range(5)))
+
+    assert time.monotonic() - start >= 0.035
+    assert strategy.buckets[Token("t")].requests == 5
+    assert strategy.wait_time()[Token("t")] > 0
+
+
+@pytest.mark.asyncio
+async def test_least_busy_token_is_chosen():
+    strategy = RateLimitedGetTokenStrategy()
+    tokens = [UserSyncSingleToken(Token("a")), UserSyncSingleToken(Token("b"))]
+
+    first = await strategy.get_token(tokens)
+    second = await strategy.get_token(tokens)
+
+    assert {first, second} == {"a", "b"}
+    assert strategy.buckets[Token("a")].limit == 3
+
+
+@pytest.mark.asyncio
+async def test_flood_error_shrinks_budget(fake_client):
+    async def responder(method_name, params):
+        return {"error": {"error_code": 6, "error_msg": "Too many", "request_params": []}}
+
+    strategy = RateLimitedGetTokenStrategy()
+    api = API(
+        BotSyncSingleToken(Token("t")), fake_client(responder), get_token_strategy=strategy
+    ).get_context()
+
+    with pytest.raises(APIError):
+        await api.api_request("users.get", {})
+
+    bucket = strategy.buckets[Token("t")]
+    assert bucket.flood_errors == 1
+    assert bucket.rate == 10
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue():
+    strategy = RateLimitedGetTokenStrategy(limits={TokenType.BOT: 10})
+    tokens = [BotSyncSingleToken(Token("t"))]
+    await strategy.get_token(tokens)
+
+    waiter = asyncio.ensure_future(strategy.get_token(tokens))
+    await asyncio.sleep(0)
+    assert strategy.buckets[Token("t")].queued == 1
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert strategy.buckets[Token("t")].queued == 0
+    assert await asyncio.wait_for(strategy.get_token(tokens), 0.5) == "t"
@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+from aiohttp import ClientConnectionError
+
+from vkwave.api import API, RetryPolicy
+from vkwave.api.methods._error import APIError
+from vkwave.api.methods._retry import is_read_method
+from vkwave.api.token.token import BotSyncSingleToken, Token
+from vkwave.client import AIOHTTPClient
+
+
+def get_api(client, policy):
+    return API(BotSyncSingleToken(Token("t")), client, retry_policy=policy).get_context()
+
+
+def failing_responder(code, fails):
+    async def responder(method_name, params):
+        if fails:
+            fails.pop()
+            return {"error": {"error_code": code, "error_msg": "Oops", "request_params": []}}
+        return {"response": 1}
+
+    return responder
+
+
+def test_read_methods():
+    assert is_read_method("users.get")
+    assert is_read_method("groups.getById")
+    assert is_read_method("groups.isMember")
+    assert is_read_method("utils.resolveScreenName")
+    assert not is_read_method("messages.send")
+    assert not is_read_method("account.setInfo")
+    assert not is_read_method("friends.issue")
+
+
+@pytest.mark.asyncio
+async def test_read_method_is_retried(fake_client):
+    client = fake_client(failing_responder(10, [1, 1]))
+    policy = RetryPolicy(base_delay=0.001)
+
+    assert await get_api(client, policy).api_request("users.get", {}) == {"response": 1}
+    assert len(client.calls) == 3
+    assert policy.retries["users.get"] == 2
+
+
+@pytest.mark.asyncio
+async def test_write_method_is_not_retried(fake_client):
+    client = fake_client(failing_responder(10, [1]))
+
+    with pytest.raises(APIError):
+        await get_api(client, RetryPolicy(base_delay=0.001)).api_request("messages.send", {})
+    assert len(client.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_too_many_requests_is_always_retried(fake_client):
+    client = fake_client(failing_responder(6, [1]))
+
+    result = await get_api(client, RetryPolicy(base_delay=0.001)).api_request("messages.send", {})
+    assert result == {"response": 1}
+
+
+@pytest.mark.asyncio
+async def test_max_attempts(fake_client):
+    client = fake_client(failing_responder(10, [1, 1, 1]))
+
+    with pytest.raises(APIError):
+        await get_api(client, RetryPolicy(base_delay=0.001, max_attempts=2)).api_request(
+            "users.get", {}
+        )
+    assert len(client.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_connection_error_is_retried_by_exception_handler(fake_client):
+    fails = [1]
+
+    async def responder(method_name, params):
+        if fails:
+            fails.pop()
+            raise ClientConnectionError()
+        return {"response": 1}
+
+    client = fake_client(responder)
+    api = get_api(client, RetryPolicy(base_delay=0.001))
+
+    assert await api.api_request("users.get", {}) == {"response": 1}
+    assert len(client.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_original_exception_is_raised_when_retries_are_exhausted(fake_client):
+    async def responder(method_name, params):
+        raise ClientConnectionError()
+
+    api = get_api(fake_client(responder), RetryPolicy(base_delay=0.001))
+
+    with pytest.raises(ClientConnectionError):
+        await api.api_request("users.get", {})
+
+
+@pytest.mark.asyncio
+async def test_timeout_is_retried(fake_client):
+    fails = [1]
+
+    async def responder(method_name, params):
+        if fails:
+            fails.pop()
+            raise asyncio.TimeoutError()
+        return {"response": 1}
+
+    client = fake_client(responder)
+    api = get_api(client, RetryPolicy(base_delay=0.001))
+
+    assert await api.api_request("users.get", {}) == {"response": 1}
+    assert len(client.calls) == 2
+
+    # default client lets policy handle all exceptions it retries by default
+    aiohttp_client = AIOHTTPClient()
+    RetryPolicy().install(aiohttp_client.create_request("users.get", {}))
+    await aiohttp_client.close()
+
+
+@pytest.mark.asyncio
+async def test_exception_which_client_does_not_register(fake_client):
+    client = fake_client(failing_responder(10, []))
+    api = get_api(client, RetryPolicy(exceptions=(KeyError,)))
+
+    with pytest.raises(ValueError):
+        await api.api_request("users.get", {})
+
+
+@pytest.mark.asyncio
+async def test_exceptions_and_error_codes_share_attempts(fake_client):
+    async def responder(method_name, params):
+        if len(client.calls) % 2:
+            raise ClientConnectionError()
+        return {"error": {"error_code": 10, "error_msg": "Oops", "request_params": []}}
+
+    client = fake_client(responder)
+    policy = RetryPolicy(base_delay=0.001, max_attempts=4)
+
+    with pytest.raises((APIError, ClientConnectionError)):
+        await get_api(client, policy).api_request("users.get", {})
+    assert len(client.calls) == 4
+    assert policy.retries["users.get"] == 3
@@ -0,0 +1,166 @@
+import asyncio
+
+import pytest
+
+from vkwave.api import API, RequestScheduler
+from vkwave.api.methods import QueueOverflowError
+from vkwave.api.token import RateLimitedGetTokenStrategy
+from vkwave.api.token.token import BotSyncSingleToken, Token, TokenType
+
+
+async def slow_responder(method_name, params):
+    await asyncio.sleep(0.01)
+    return {"response": 1}
+
+
+@pytest.mark.asyncio
+async def test_interactive_requests_go_first(fake_client):
+    client = fake_client(slow_responder)
+    scheduler = RequestScheduler(max_in_flight=1)
+    api = API(BotSyncSingleToken(Token("t")), client, scheduler=scheduler).get_context()
+    background = api.with_priority("background")
+
+    tasks = [
+        asyncio.ensure_future(background.api_request("wall.get", {"offset": i}))
+        for i in range(3)
+    ]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.ensure_future(api.api_request("messages.send", {"peer_id": 1})))
+    await asyncio.gather(*tasks)
+
+    assert [method for method, _ in client.calls] == [
+        "wall.get",
+        "messages.send",
+        "wall.get",
+        "wall.get",
+    ]
+    assert scheduler.in_flight == 0
+    assert scheduler.waited["interactive"] == 1
+
+
+@pytest.mark.asyncio
+async def test_low_priority_lane_does_not_starve():
+    scheduler = RequestScheduler(
+        max_in_flight=1, lanes={"high": 0.0, "low": 0.01}, default_lane="high"
+    )
+    order = []
+
+    async def request(lane, name):
+        async with scheduler.slot(lane):
+            order.append(name)
+            await asyncio.sleep(0.005)
+
+    await scheduler.acquire("high")
+    low = asyncio.ensure_future(request("low", "low"))
+    await asyncio.sleep(0.02)
+    high = asyncio.ensure_future(request("high", "high"))
+    await asyncio.sleep(0)
+    scheduler.release()
+    await asyncio.gather(low, high)
+
+    assert order == ["low", "high"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_frees_queue():
+    scheduler = RequestScheduler(max_in_flight=1)
+    await scheduler.acquire("default")
+    waiter = asyncio.ensure_future(scheduler.acquire("background"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert scheduler.queued == 0
+    scheduler.release()
+    await asyncio.wait_for(scheduler.acquire("default"), 0.1)
+
+
+def test_unknown_lane(fake_client):
+    api = API(BotSyncSingleToken(Token("t")), fake_client(slow_responder)).get_context()
+    with pytest.raises(ValueError):
+        api.with_priority("interactive")
+
+
+@pytest.mark.asyncio
+async def test_full_queue_fails_fast(fake_client):
+    client = fake_client(slow_responder)
+    scheduler = RequestScheduler(max_in_flight=1, max_queue=1)
+    api = API(BotSyncSingleToken(Token("t")), client, scheduler=scheduler).get_context()
+
+    results = await asyncio.gather(
+        *(api.api_request("wall.get", {"offset": i}) for i in range(3)), return_exceptions=True
+    )
+
+    assert results[:2] == [{"response": 1}] * 2
+    assert isinstance(results[2], QueueOverflowError)
+    assert scheduler.rejected == 1
+    assert scheduler.max_queued == 1
+
+
+@pytest.mark.asyncio
+async def test_client_limit(fake_client):
+    in_flight = []
+
+    async def responder(method_name, params):
+        in_flight.append(params["offset"])
+        await asyncio.sleep(0.01)
+        assert len(in_flight) <= 2
+        in_flight.remove(params["offset"])
+        return {"response": 1}
+
+    scheduler = RequestScheduler(max_in_flight=10, max_in_flight_per_client=2)
+    api = API(BotSyncSingleToken(Token("t")), fake_client(responder), scheduler=scheduler)
+    ctx = api.get_context()
+
+    await asyncio.gather(*(ctx.api_request("wall.get", {"offset": i}) for i in range(5)))
+    assert scheduler.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_interactive_requests_skip_rate_limit_queue(fake_client):
+    async def responder(method_name, params):
+        return {"response": 1}
+
+    client = fake_client(responder)
+    strategy = RateLimitedGetTokenStrategy(limits={TokenType.BOT: 100})
+    scheduler = RequestScheduler(max_in_flight=50)
+    api = API(
+        BotSyncSingleToken(Token("t")), client, get_token_strategy=strategy, scheduler=scheduler
+    ).get_context()
+    background = api.with_priority("background")
+
+    tasks = [
+        asyncio.ensure_future(background.api_request("wall.get", {"offset": i}))
+        for i in range(20)
+    ]
+    await asyncio.sleep(0)
+    await api.api_request("messages.send", {"peer_id": 1})
+    await asyncio.gather(*tasks)
+
+    methods = [method for method, _ in client.calls]
+    assert methods.index("messages.send") <= 2
+    assert strategy.buckets[Token("t")].queued == 0
+
+
+@pytest.mark.asyncio
+async def test_client_limit_respects_priority(fake_client):
+    client = fake_client(slow_responder)
+    scheduler = RequestScheduler(max_in_flight=10, max_in_flight_per_client=1)
+    api = API(BotSyncSingleToken(Token("t")), client, scheduler=scheduler).get_context()
+    background = api.with_priority("background")
+
+    tasks = [
+        asyncio.ensure_future(background.api_request("wall.get", {"offset": i}))
+        for i in range(3)
+    ]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.ensure_future(api.api_request("messages.send", {"peer_id": 1})))
+    await asyncio.gather(*tasks)
+
+    assert [method for method, _ in client.calls] == [
+        "wall.get",
+        "messages.send",
+        "wall.get",
+        "wall.get",
+    ]
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from vkwave.api import API, SingleFlight
+from vkwave.api.methods._error import APIError
+from vkwave.api.token.token import BotSyncSingleToken, Token
+
+
+def get_api(client, single_flight):
+    return API(BotSyncSingleToken(Token("t")), client, single_flight=single_flight).get_context()
+
+
+async def slow_responder(method_name, params):
+    await asyncio.sleep(0.01)
+    if params.get("fail"):
+        return {"error": {"error_code": 15, "error_msg": "Access denied", "request_params": []}}
+    return {"response": [params.get("peer_id")]}
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_share_one_call(fake_client):
+    client = fake_client(slow_responder)
+    single_flight = SingleFlight()
+    api = get_api(client, single_flight)
+
+    results = await asyncio.gather(
+        *(api.api_request("messages.getConversationMembers", {"peer_id": 1}) for _ in range(5)),
+        api.api_request("messages.getConversationMembers", {"peer_id": 2}),
+    )
+
+    assert results[:5] == [{"response": [1]}] * 5
+    assert results[5] == {"response": [2]}
+    assert len(client.calls) == 2
+    assert single_flight.shared == 4
+    assert single_flight.in_flight() == 0
+    # every caller has its own result
+    results[0]["response"].append("changed")
+    assert results[1] == {"response": [1]}
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared(fake_client):
+    client = fake_client(slow_responder)
+    api = get_api(client, SingleFlight())
+
+    results = await asyncio.gather(
+        *(api.api_request("users.get", {"fail": 1}) for _ in range(3)), return_exceptions=True
+    )
+
+    assert all(isinstance(result, APIError) for result in results)
+    assert len(client.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_write_methods_are_not_deduplicated(fake_client):
+    client = fake_client(slow_responder)
+    api = get_api(client, SingleFlight())
+
+    await asyncio.gather(*(api.api_request("messages.send", {"peer_id": 1}) for _ in range(2)))
+    assert len(client.calls) == 2
@@ -0,0 +1,169 @@
+import asyncio
+import functools
+import os
+import typing
+
+import pytest
+
+from vkwave.api import API
+from vkwave.api.token.token import BotSyncPoolTokens, BotSyncSingleToken, Token
+from vkwave.bots import Dispatcher, MultiprocessDispatcher, TokenStorage
+from vkwave.bots.core.dispatching.dp.multiprocess import HashRing
+from vkwave.bots.core.dispatching.dp.processing_options import ProcessEventOptions
+from vkwave.bots.core.dispatching.events.raw import ExtensionEvent
+from vkwave.bots.core.types.bot_type import BotType
+
+OPTIONS = ProcessEventOptions(do_not_handle=False)
+
+
+class FileDispatcher(Dispatcher):
+    """Writes `pid peer_id n` of every event to file"""
+
+    def __init__(self, path: str):
+        super().__init__(API("t"), TokenStorage())
+        self.path = path
+
+    async def process_event(self, revent, options):
+        # the first event of every peer is the slowest one
+        default_sleep = 0.02 if revent.raw_event["n"] == 0 else 0
+        await asyncio.sleep(revent.raw_event.get("sleep", default_sleep))
+        with open(self.path, "a") as file:
+            peer_id = revent.raw_event["object"]["peer_id"]
+            file.write(f"{os.getpid()} {peer_id} {revent.raw_event['n']}\n")
+        return True
+
+
+class TokenDispatcher(FileDispatcher):
+    """Writes token of event's context to file"""
+
+    async def process_event(self, revent, options):
+        with open(self.path, "a") as file:
+            token = revent.api.api_options.tokens[0]
+            file.write(f"{type(token).__name__} {token.get_token()} {id(revent.api)}\n")
+        return True
+
+
+def create_dispatcher(path: str) -> FileDispatcher:
+    return FileDispatcher(path)
+
+
+def create_token_dispatcher(path: str) -> FileDispatcher:
+    return TokenDispatcher(path)
+
+
+def _peer_event(peer_id: int, number: int) -> ExtensionEvent:
+    return ExtensionEvent(
+        BotType.BOT,
+        {"type": "message_event", "group_id": 1, "object": {"peer_id": peer_id}, "n": number},
+    )
+
+
+def _read(path: str) -> typing.List[typing.Tuple[int, int, int]]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as file:
+        return [tuple(map(int, line.split())) for line in file]  # type: ignore
+
+
+async def wait_for(condition: typing.Callable[[], bool]) -> None:
+    for _ in range(500):
+        if condition():
+            return
+        await asyncio.sleep(0.02)
+    raise AssertionError("Condition wasn't met")
+
+
+def test_hash_ring():
+    ring = HashRing(range(4))
+    keys = range(1000)
+    nodes = [ring.get(key) for key in keys]
+    assert nodes == [ring.get(key) for key in keys]
+    assert set(nodes) == {0, 1, 2, 3}
+
+    # adding node moves only keys which go to this node
+    bigger = HashRing(range(5))
+    moved = [key for key in keys if bigger.get(key) != ring.get(key)]
+    assert all(bigger.get(key) == 4 for key in moved)
+    assert len(moved) < 400
+
+
+@pytest.mark.asyncio
+async def test_peers_are_ordered_in_one_process(tmp_path):
+    path = str(tmp_path / "events")
+    runtime = MultiprocessDispatcher(
+        functools.partial(create_dispatcher, path), processes=2, workers=4
+    )
+    await runtime.start()
+    try:
+        for number in range(3):
+            for peer_id in range(1, 9):
+                assert await runtime.put(_peer_event(peer_id, number), OPTIONS)
+    finally:
+        await runtime.stop(drain=True)
+
+    events = _read(path)
+    assert len(events) == 24
+    for peer_id in range(1, 9):
+        assert [n for _, peer, n in events if peer == peer_id] == [0, 1, 2]
+        assert len({pid for pid, peer, _ in events if peer == peer_id}) == 1
+    # peers are spread over both processes
+    assert len({pid for pid, _, _ in events}) == 2
+
+
+@pytest.mark.asyncio
+async def test_dead_process_is_restarted(tmp_path):
+    path = str(tmp_path / "events")
+    runtime = MultiprocessDispatcher(
+        functools.partial(create_dispatcher, path),
+        processes=1,
+        heartbeat_interval=0.05,
+    )
+    try:
+        # processes are started by first event
+        assert runtime.put_nowait(_peer_event(1, 1), OPTIONS)
+        await wait_for(lambda: len(_read(path)) == 1)
+
+        worker = runtime.worker_processes[0]
+        stuck = _peer_event(1, 2)
+        stuck.raw_event["sleep"] = 10
+        await runtime.put(stuck, OPTIONS)
+        await wait_for(lambda: worker.sent == 2 and worker.processed == 1)
+
+        old_pid = worker.process.pid
+        worker.process.kill()
+        await wait_for(lambda: worker.restarts == 1 and worker.alive)
+        assert worker.process.pid != old_pid
+        # event which was being processed by killed process is lost
+        assert worker.lost == 1
+
+        await runtime.put(_peer_event(1, 3), OPTIONS)
+        await wait_for(lambda: len(_read(path)) == 2)
+        assert _read(path)[1][0] == worker.process.pid
+    finally:
+        await runtime.stop()
+
+
+@pytest.mark.asyncio
+async def test_context_of_event_is_rebuilt_by_token(tmp_path):
+    path = str(tmp_path / "events")
+    runtime = MultiprocessDispatcher(functools.partial(create_token_dispatcher, path), processes=1)
+    api = API("default")
+    try:
+        for _ in range(2):
+            revent = _peer_event(1, 0)
+            revent.api = api.with_token(BotSyncSingleToken(Token("group")))
+            assert await runtime.put(revent, OPTIONS)
+
+        revent = _peer_event(1, 0)
+        revent.api = api.with_token(BotSyncPoolTokens([Token("a"), Token("b")]))
+        with pytest.raises(ValueError):
+            await runtime.put(revent, OPTIONS)
+    finally:
+        await runtime.stop(drain=True)
+        await api.default_api_options.get_client().close()
+
+    with open(path) as file:
+        lines = [line.split() for line in file]
+    assert [line[:2] for line in lines] == [["BotSyncSingleToken", "group"]] * 2
+    # worker reuses context of the token
+    assert lines[0][2] == lines[1][2]
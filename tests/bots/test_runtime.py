@@ -0,0 +1,199 @@
+import asyncio
+import typing
+import warnings
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from tests.api.conftest import FakeAPIClient
+from vkwave.api import API
+from vkwave.bots import (
+    BotLongpollExtension,
+    Dispatcher,
+    DispatchRuntime,
+    OverflowPolicy,
+    TokenStorage,
+    event_peer_id,
+)
+from vkwave.bots.core.dispatching.dp.processing_options import ProcessEventOptions
+from vkwave.bots.core.dispatching.events.raw import ExtensionEvent
+from vkwave.bots.core.dispatching.extensions.callback import AIOHTTPCallbackExtension
+from vkwave.bots.core.types.bot_type import BotType
+from vkwave.metrics import DispatcherMetrics, MetricsRegistry
+
+OPTIONS = ProcessEventOptions(do_not_handle=False)
+
+
+class BlockingDispatcher(Dispatcher):
+    """Processing of events waits until `release` is set"""
+
+    def __init__(self):
+        super().__init__(API("t", FakeAPIClient(self._respond)), TokenStorage())
+        self.release = asyncio.Event()
+        self.running = 0
+        self.max_running = 0
+        self.events: typing.List[dict] = []
+
+    @staticmethod
+    async def _respond(method_name, params):
+        return {"response": 1}
+
+    async def process_event(self, revent, options):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await self.release.wait()
+        self.running -= 1
+        self.events.append(revent.raw_event)
+        return True
+
+
+def _event(number: int) -> ExtensionEvent:
+    return ExtensionEvent(BotType.BOT, {"type": "message_new", "group_id": 1, "n": number})
+
+
+@pytest.mark.asyncio
+async def test_workers_are_limited():
+    dp = BlockingDispatcher()
+    runtime = DispatchRuntime(dp, workers=2, max_queue=10)
+    registry = MetricsRegistry()
+    DispatcherMetrics(registry).watch(runtime)
+
+    for number in range(5):
+        assert await runtime.put(_event(number), OPTIONS)
+    await asyncio.sleep(0.01)
+    assert dp.running == 2
+    assert runtime.queued == 3
+    assert runtime.utilization == 1
+
+    text = registry.render()
+    assert "vkwave_bots_queue_length 3" in text
+    assert "vkwave_bots_workers_busy 2" in text
+
+    dp.release.set()
+    await runtime.join()
+    assert dp.max_running == 2
+    assert sorted(event["n"] for event in dp.events) == [0, 1, 2, 3, 4]
+    assert runtime.processed == 5
+    await runtime.stop()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_waits():
+    dp = BlockingDispatcher()
+    runtime = DispatchRuntime(dp, workers=1, max_queue=1)
+    await runtime.put(_event(0), OPTIONS)
+    await asyncio.sleep(0)
+    await runtime.put(_event(1), OPTIONS)
+
+    blocked = asyncio.ensure_future(runtime.put(_event(2), OPTIONS))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+    assert not runtime.put_nowait(_event(3), OPTIONS)
+    assert runtime.rejected == 1
+
+    dp.release.set()
+    assert await blocked
+    await runtime.stop()
+    assert len(dp.events) == 3
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops():
+    dp = BlockingDispatcher()
+    runtime = DispatchRuntime(dp, workers=1, max_queue=1, overflow=OverflowPolicy.DROP)
+    assert await runtime.put(_event(0), OPTIONS)
+    await asyncio.sleep(0)
+    assert await runtime.put(_event(1), OPTIONS)
+    assert not await runtime.put(_event(2), OPTIONS)
+    assert runtime.rejected == 1
+
+    dp.release.set()
+    await runtime.stop()
+    assert len(dp.events) == 2
+
+
+@pytest.mark.asyncio
+async def test_callback_asks_to_resend_when_queue_is_full():
+    dp = BlockingDispatcher()
+    runtime = DispatchRuntime(dp, workers=1, max_queue=1)
+    extension = AIOHTTPCallbackExtension(dp, "/", "localhost", 0, runtime=runtime)
+    with warnings.catch_warnings():
+        # app keys are declared with web.AppKey
+        warnings.simplefilter("error", getattr(web, "NotAppKeyWarning", Warning))
+        app = extension.create_app()
+
+    client = TestClient(TestServer(app))
+    await client.start_server()
+    try:
+        statuses = []
+        for number in range(3):
+            resp = await client.post("/", json={"type": "message_new", "group_id": 1, "n": number})
+            statuses.append(resp.status)
+            await asyncio.sleep(0.01)
+        # first event is processed, second waits in queue, third is rejected
+        assert statuses == [200, 200, 503]
+    finally:
+        dp.release.set()
+        await runtime.stop()
+        await client.close()
+
+
+class OrderRecordingDispatcher(BlockingDispatcher):
+    async def process_event(self, revent, options):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        peer_id = revent.raw_event["object"]["peer_id"]
+        # the first event of every peer is the slowest one
+        await asyncio.sleep(0.02 if revent.raw_event["n"] == 0 else 0)
+        self.running -= 1
+        self.events.append((peer_id, revent.raw_event["n"]))
+        return True
+
+
+def _peer_event(peer_id: int, number: int) -> ExtensionEvent:
+    return ExtensionEvent(
+        BotType.BOT,
+        {"type": "message_event", "group_id": 1, "object": {"peer_id": peer_id}, "n": number},
+    )
+
+
+@pytest.mark.asyncio
+async def test_events_of_peer_are_ordered():
+    dp = OrderRecordingDispatcher()
+    runtime = DispatchRuntime(dp, workers=4, max_queue=10, key=event_peer_id)
+    for number in range(3):
+        for peer_id in (1, 2, 3, 4):
+            await runtime.put(_peer_event(peer_id, number), OPTIONS)
+    await runtime.stop()
+
+    for peer_id in (1, 2, 3, 4):
+        assert [n for peer, n in dp.events if peer == peer_id] == [0, 1, 2]
+    # different peers are processed in parallel
+    assert dp.max_running == 4
+
+
+@pytest.mark.asyncio
+async def test_events_without_key_are_spread():
+    dp = BlockingDispatcher()
+    runtime = DispatchRuntime(dp, workers=3, key=lambda revent: None)
+    for number in range(3):
+        await runtime.put(_event(number), OPTIONS)
+    await asyncio.sleep(0.01)
+    assert dp.running == 3
+    dp.release.set()
+    await runtime.stop()
+
+
+@pytest.mark.asyncio
+async def test_tasks_without_runtime_are_kept():
+    dp = BlockingDispatcher()
+    extension = BotLongpollExtension(dp, lp=None)  # type: ignore
+    await extension._dispatch(_event(0), OPTIONS)
+    assert len(extension._tasks) == 1
+
+    dp.release.set()
+    await asyncio.gather(*extension._tasks)
+    await asyncio.sleep(0)
+    assert not extension._tasks
+    assert len(dp.events) == 1
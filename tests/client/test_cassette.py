@@ -0,0 +1,59 @@
+import pytest
+from aiohttp import ClientConnectionError
+
+from tests.api.conftest import FakeAPIClient
+from vkwave.api import API
+from vkwave.api.methods._error import APIError
+from vkwave.api.token.token import BotSyncSingleToken, Token
+from vkwave.client import CassetteAPIClient, CassetteMissError, CassetteMode
+
+
+async def responder(method_name, params):
+    return {"response": [{"id": int(params["user_ids"]), "first_name": "A", "last_name": "B"}]}
+
+
+def get_api(client):
+    return API(BotSyncSingleToken(Token("secret")), client).get_context()
+
+
+async def record(tmp_path):
+    path = str(tmp_path / "users.jsonl.gz")
+    recorder = CassetteAPIClient(path, CassetteMode.RECORD, client=FakeAPIClient(responder))
+    api = get_api(recorder)
+    await api.users.get(user_ids=1)
+    await api.users.get(user_ids=2)
+    await recorder.close()
+    return path
+
+
+@pytest.mark.asyncio
+async def test_replay(tmp_path):
+    cassette = await record(tmp_path)
+    player = CassetteAPIClient(cassette, latency=0.001)
+    api = get_api(player)
+
+    assert (await api.users.get(user_ids=2)).response[0].id == 2
+    assert (await api.users.get(user_ids=1)).response[0].id == 1
+    with pytest.raises(CassetteMissError):
+        await api.users.get(user_ids=3)
+
+    with open(cassette, "rb") as file:
+        assert b"secret" not in file.read()
+
+
+@pytest.mark.asyncio
+async def test_error_injection(tmp_path):
+    cassette = await record(tmp_path)
+    api = get_api(CassetteAPIClient(cassette, error_rates={10: 1.0}))
+    with pytest.raises(APIError) as exc_info:
+        await api.users.get(user_ids=1)
+    assert exc_info.value.code == 10
+
+    api = get_api(CassetteAPIClient(cassette, error_rates={ClientConnectionError: 1.0}))
+    with pytest.raises(ClientConnectionError):
+        await api.users.get(user_ids=1)
+
+
+def test_record_requires_client(tmp_path):
+    with pytest.raises(ValueError):
+        CassetteAPIClient(str(tmp_path / "c.jsonl"), CassetteMode.RECORD)
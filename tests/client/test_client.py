@@ -1,7 +1,7 @@
 import pytest
 
 from vkwave.client.abstract import AbstractAPIClient
-from vkwave.client.context import RequestContext, Signal
+from vkwave.client.context import RequestContext, ResultState, Signal
 from vkwave.client.factory import AbstractFactory, DefaultFactory
 from vkwave.client.types import MethodName
 
@@ -101,3 +101,29 @@ async def test_signals(client):
 async def test_no_http_client(client):
     with pytest.raises(NotImplementedError):
         client.http_client
+
+
+@pytest.mark.asyncio
+async def test_lean_context(client):
+    ctx = client.create_request("anymethod", {"raise_exception": True})
+    assert not hasattr(ctx, "__dict__")
+    assert ctx._signals is None and ctx._exception_handlers is None
+
+    await ctx.send_request()
+    assert ctx.result.state is ResultState.UNHANDLED_EXCEPTION
+    assert ctx._signals is None and ctx._exception_handlers is None
+
+
+@pytest.mark.asyncio
+async def test_exception_handlers_are_not_shared(client):
+    async def exception_handler(ctx: RequestContext):
+        ctx.result.exception_data = {"handled": True}
+
+    first = client.create_request("anymethod", {"raise_exception": True})
+    second = client.create_request("anymethod", {"raise_exception": True})
+    first.set_exception_handler(SomeAPIException, exception_handler)
+
+    await first.send_request()
+    await second.send_request()
+    assert first.result.state is ResultState.HANDLED_EXCEPTION
+    assert second.result.state is ResultState.UNHANDLED_EXCEPTION
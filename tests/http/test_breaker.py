@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from vkwave.client import AIOHTTPClient
+from vkwave.client.context import ResultState, Signal
+from vkwave.http import CircuitBreaker, CircuitBreakers, CircuitOpenError, CircuitState
+
+
+async def _ok():
+    return "ok"
+
+
+async def _fail():
+    raise ConnectionError()
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_and_recovers():
+    breaker = CircuitBreaker(min_calls=2, failure_rate=0.5, open_time=0.05)
+
+    assert await breaker.call(_ok) == "ok"
+    with pytest.raises(ConnectionError):
+        await breaker.call(_fail)
+    assert breaker.state is CircuitState.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(_ok)
+    assert breaker.rejected == 1
+
+    await asyncio.sleep(0.06)
+    assert breaker.state is CircuitState.HALF_OPEN
+    assert await breaker.call(_ok) == "ok"
+    assert breaker.state is CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_failed_probe_opens_breaker_again():
+    breaker = CircuitBreaker(min_calls=1, open_time=0.05)
+    with pytest.raises(ConnectionError):
+        await breaker.call(_fail)
+
+    await asyncio.sleep(0.06)
+    with pytest.raises(ConnectionError):
+        await breaker.call(_fail)
+    assert breaker.state is CircuitState.OPEN
+    assert breaker.opened == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_calls_are_failures():
+    breaker = CircuitBreaker(min_calls=1, slow_call_time=0.0)
+    await breaker.call(_ok)
+    assert breaker.state is CircuitState.OPEN
+
+
+@pytest.mark.asyncio
+async def test_api_client_fails_fast_and_signals():
+    client = AIOHTTPClient(circuit_breakers=CircuitBreakers(min_calls=1))
+    client.circuit_breaker.record(0.0, failed=True)  # type: ignore
+
+    signals = []
+
+    async def on_change(ctx):
+        signals.append(ctx.method_name)
+
+    ctx = client.create_request("users.get", {})
+    ctx.signal(Signal.CIRCUIT_STATE_CHANGED, on_change)
+    await ctx.send_request()
+    assert ctx.result.state is ResultState.UNHANDLED_EXCEPTION
+    assert isinstance(ctx.result.exception, CircuitOpenError)
+    assert signals == []
+
+    assert client.circuit_breaker is client.http_client.circuit_breakers.for_url(  # type: ignore
+        "https://api.vk.com/method/users.get"
+    )
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_is_released():
+    breaker = CircuitBreaker(min_calls=1, open_time=0.05)
+    with pytest.raises(ConnectionError):
+        await breaker.call(_fail)
+    await asyncio.sleep(0.06)
+
+    probe = asyncio.ensure_future(breaker.call(asyncio.sleep, 10))
+    await asyncio.sleep(0)
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+    assert breaker.state is CircuitState.HALF_OPEN
+
+    assert await breaker.call(_ok) == "ok"
+    assert breaker.state is CircuitState.CLOSED
@@ -0,0 +1,38 @@
+import pytest
+
+from vkwave.http import JSONCodec, get_codec, set_codec
+from vkwave.http.codec import STDLIB_CODEC, dumps, loads
+
+
+@pytest.fixture
+def restore_codec():
+    codec = get_codec()
+    yield
+    set_codec(codec)
+
+
+def test_loads_accepts_bytes():
+    assert loads('{"response": [1, "й"]}'.encode()) == {"response": [1, "й"]}
+    assert loads('{"a": true}') == {"a": True}
+
+
+def test_set_codec(restore_codec):
+    calls = []
+
+    def custom_loads(data):
+        calls.append(data)
+        return STDLIB_CODEC.loads(data)
+
+    set_codec(JSONCodec(custom_loads, STDLIB_CODEC.dumps))
+    assert loads("[]") == []
+    assert calls == ["[]"]
+    assert dumps({"a": 1}) == '{"a": 1}'
+
+    set_codec()
+    assert get_codec().name in ("orjson", "json")
+
+
+def test_dumps_falls_back_to_stdlib():
+    # orjson rejects non-str keys and ints longer than 64 bits
+    assert dumps({1: "a"}) == '{"1": "a"}'
+    assert dumps([2 ** 70 + 1]) == "[1180591620717411303425]"
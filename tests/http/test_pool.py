@@ -0,0 +1,140 @@
+import asyncio
+import typing
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from vkwave.client import AIOHTTPClient as APIClient
+from vkwave.http import (
+    LANE_LONGPOLL,
+    LANE_UPLOAD,
+    AIOHTTPClient,
+    AIOHTTPWSClient,
+    SessionPool,
+)
+from vkwave.metrics import MetricsRegistry, PoolMetrics
+
+
+async def _start_server(release: typing.Optional[asyncio.Event] = None) -> TestServer:
+    async def ok(request: web.Request) -> web.Response:
+        return web.json_response({"response": 1})
+
+    async def slow(request: web.Request) -> web.Response:
+        await typing.cast(asyncio.Event, release).wait()
+        return web.json_response({"response": 2})
+
+    app = web.Application()
+    app.router.add_route("*", "/", ok)
+    app.router.add_route("*", "/slow", slow)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+@pytest.mark.asyncio
+async def test_clients_share_session():
+    pool = SessionPool(limit=10, limit_per_host=5, keepalive_timeout=30)
+    http = AIOHTTPClient(pool=pool)
+    ws = AIOHTTPWSClient(pool=pool)
+    api = APIClient(pool=pool)
+
+    assert http.session is ws.session is api.http_client.session
+    assert pool.connector.limit == 10
+    assert pool.connector.limit_per_host == 5
+
+    await http.close()
+    await api.close()
+    assert not http.session.closed
+
+    await pool.close()
+    assert http.session.closed
+    # closed session is replaced
+    assert not pool.get_session().closed
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_opens_connections():
+    server = await _start_server()
+    pool = SessionPool(limit_per_host=4)
+    try:
+        opened = await pool.warm_up(3, str(server.make_url("/")))
+        assert opened == 3
+        # idle keep-alive connections are waiting in pool
+        assert sum(len(conns) for conns in pool.connector._conns.values()) == 3
+
+        client = AIOHTTPClient(pool=pool)
+        assert await client.request_json("GET", str(server.make_url("/"))) == {"response": 1}
+    finally:
+        await pool.close()
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_failure_is_not_raised():
+    pool = SessionPool()
+    try:
+        assert await pool.warm_up(2, "http://127.0.0.1:1/") == 0
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_lanes_have_own_connectors():
+    pool = SessionPool(limit=10, lanes={LANE_LONGPOLL: {"limit": 2}})
+    api = APIClient(pool=pool)
+    longpoll = api.get_http_client(LANE_LONGPOLL)
+    upload = api.get_http_client(LANE_UPLOAD)
+
+    assert longpoll is api.get_http_client(LANE_LONGPOLL)
+    assert longpoll.session is not api.http_client.session
+    assert upload.session is not longpoll.session
+    assert pool.get_connector(LANE_LONGPOLL).limit == 2
+    assert pool.get_connector(LANE_UPLOAD).limit == 10
+    await pool.close()
+    assert longpoll.session.closed and api.http_client.session.closed
+
+    # without pool every lane has its own session
+    client = APIClient()
+    longpoll = client.get_http_client(LANE_LONGPOLL)
+    assert longpoll is client.get_http_client(LANE_LONGPOLL)
+    assert longpoll.session is not client.http_client.session
+    assert longpoll.session.connector is not client.http_client.session.connector
+    await client.close()
+    assert longpoll.session.closed and client.http_client.session.closed
+
+
+@pytest.mark.asyncio
+async def test_longpoll_is_not_blocked_by_api_lane():
+    release = asyncio.Event()
+    server = await _start_server(release)
+    pool = SessionPool(limit=1)
+    registry = MetricsRegistry()
+    PoolMetrics(registry).watch(pool)
+    try:
+        api = APIClient(pool=pool)
+        # the only connection of API lane is taken
+        busy = asyncio.ensure_future(
+            api.http_client.request_json("GET", str(server.make_url("/slow")))
+        )
+        while not pool.stats().get("api", {}).get("in_use"):
+            await asyncio.sleep(0.01)
+
+        longpoll = api.get_http_client(LANE_LONGPOLL)
+        response = await asyncio.wait_for(
+            longpoll.request_json("GET", str(server.make_url("/"))), 1
+        )
+        assert response == {"response": 1}
+
+        stats = pool.stats()
+        assert stats["api"] == {"limit": 1, "in_use": 1, "idle": 0}
+        assert stats[LANE_LONGPOLL]["in_use"] == 0
+        text = registry.render()
+        assert 'vkwave_http_connections{lane="api",state="in_use"} 1' in text
+        assert 'vkwave_http_connections_limit{lane="longpoll"} 1' in text
+        release.set()
+        assert await busy == {"response": 2}
+    finally:
+        await pool.close()
+        await server.close()
@@ -0,0 +1,225 @@
+import asyncio
+import typing
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from tests.api.conftest import FakeAPIClient
+from vkwave.api import API
+from vkwave.bots import BaseMiddleware, Dispatcher, LongpollMultiplexer, TokenStorage
+from vkwave.http import AbstractHTTPClient
+from vkwave.metrics import LongpollMetrics, MetricsRegistry
+
+
+class FakeLongpollServer(AbstractHTTPClient):
+    """Answers with scripted responses of every server, then waits forever"""
+
+    def __init__(self, responses: typing.Dict[str, typing.List[dict]]):
+        self.responses = responses
+        self.requests: typing.List[str] = []
+
+    async def request_json(self, method, url, data=None):
+        self.requests.append(url)
+        server = url.split("?")[0]
+        if not self.responses.get(server):
+            await asyncio.Event().wait()
+        return self.responses[server].pop(0)
+
+    async def request_text(self, method, url, data=None):
+        raise NotImplementedError
+
+    async def request_data(self, method, url, data=None):
+        raise NotImplementedError
+
+    async def request_send_json(self, method, url, json=None):
+        raise NotImplementedError
+
+    async def raw_request(self, *args, **kwargs):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class RecordingDispatcher(Dispatcher):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.events: typing.List[dict] = []
+
+    async def process_event(self, revent, options):
+        self.events.append(revent.raw_event)
+        return True
+
+
+async def responder(method_name, params):
+    group_id = params["group_id"]
+    return {"response": {"key": "key", "server": f"https://lp{group_id}", "ts": "1"}}
+
+
+def _update(group_id: int, event_id: str) -> dict:
+    return {"type": "message_typing_state", "group_id": group_id, "event_id": event_id}
+
+
+def get_dispatcher(client: FakeAPIClient) -> RecordingDispatcher:
+    api = API("t", client)
+    return RecordingDispatcher(api, TokenStorage({1: "t1", 2: "t2", 3: "t3"}))
+
+
+async def wait_for(condition: typing.Callable[[], bool]) -> None:
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Condition wasn't met")
+
+
+@pytest.mark.asyncio
+async def test_sources_feed_one_dispatcher():
+    api_client = FakeAPIClient(responder)
+    dp = get_dispatcher(api_client)
+    server = FakeLongpollServer(
+        {
+            "https://lp1": [
+                {"ts": "2", "updates": [_update(1, "a")]},
+                {"failed": 2},
+                {"ts": "3", "updates": [_update(1, "b")]},
+            ],
+            "https://lp2": [{"failed": 1, "ts": "5"}, {"ts": "6", "updates": [_update(2, "c")]}],
+        }
+    )
+    multiplexer = LongpollMultiplexer(dp, http_client=server, refresh_interval=0)
+    registry = MetricsRegistry()
+    LongpollMetrics(registry).watch(multiplexer)
+    multiplexer.add_group(1)
+    multiplexer.add_group(2)
+    await multiplexer.start()
+    try:
+        await wait_for(lambda: len(dp.events) == 3)
+        assert sorted(event["event_id"] for event in dp.events) == ["a", "b", "c"]
+
+        first, second = multiplexer.sources[1], multiplexer.sources[2]
+        # initial refresh and refresh after `failed: 2`
+        assert first.refreshes == 2
+        assert second.refreshes == 1
+        assert first.events == 2 and second.events == 1
+        assert "ts=5" in " ".join(server.requests)
+        # tokens of groups are taken from token storage
+        assert [call[1]["access_token"] for call in api_client.calls].count("t1") == 2
+
+        text = registry.render()
+        assert "vkwave_longpoll_sources 2" in text
+        assert 'vkwave_longpoll_events_total{source="1"} 2' in text
+    finally:
+        await multiplexer.stop()
+
+
+@pytest.mark.asyncio
+async def test_add_and_remove_at_runtime():
+    dp = get_dispatcher(FakeAPIClient(responder))
+    server = FakeLongpollServer({"https://lp3": [{"ts": "2", "updates": [_update(3, "x")]}]})
+    multiplexer = LongpollMultiplexer(dp, http_client=server, refresh_interval=0)
+    await multiplexer.start()
+    try:
+        source = multiplexer.add_group(3)
+        await wait_for(lambda: len(dp.events) == 1)
+        with pytest.raises(ValueError):
+            multiplexer.add_group(3)
+
+        await multiplexer.remove(3)
+        assert 3 not in multiplexer.sources
+        assert source.task is None
+    finally:
+        await multiplexer.stop()
+
+
+@pytest.mark.asyncio
+async def test_refreshes_are_staggered():
+    dp = get_dispatcher(FakeAPIClient(responder))
+    multiplexer = LongpollMultiplexer(
+        dp, http_client=FakeLongpollServer({}), refresh_interval=0.05
+    )
+    for group_id in (1, 2, 3):
+        multiplexer.add_group(group_id)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await multiplexer.start()
+    try:
+        await wait_for(lambda: all(s.refreshes for s in multiplexer.sources.values()))
+        assert loop.time() - started >= 0.1
+    finally:
+        await multiplexer.stop()
+
+
+class RecordingMiddleware(BaseMiddleware):
+    def __init__(self):
+        self.events = []
+
+    async def pre_process_event(self, event):
+        self.events.append(event)
+        return False
+
+
+@pytest.mark.asyncio
+async def test_user_events_are_handled_with_api_of_source():
+    async def user_responder(method_name, params):
+        assert method_name == "messages.getLongPollServer"
+        return {"response": {"key": "key", "server": "lpu", "ts": "1"}}
+
+    client = FakeAPIClient(user_responder)
+    api = API("group_token", client)
+    # dispatcher has only group tokens
+    dp = Dispatcher(api, TokenStorage({1: "group_token"}))
+    middleware = RecordingMiddleware()
+    dp.middleware_manager.add_middleware(middleware)
+    server = FakeLongpollServer({"https://lpu": [{"ts": "2", "updates": [[999, 1]]}]})
+
+    multiplexer = LongpollMultiplexer(dp, http_client=server, refresh_interval=0)
+    user_api = api.with_token("user_token")
+    source = multiplexer.add_user("user", user_api)
+    await multiplexer.start()
+    try:
+        await wait_for(lambda: len(middleware.events) == 1)
+        assert middleware.events[0].api_ctx is user_api
+        assert client.calls[0][1]["access_token"] == "user_token"
+        assert source.events == 1
+    finally:
+        await multiplexer.stop()
+
+
+@pytest.mark.asyncio
+async def test_own_session_has_connection_for_every_source():
+    waiting = set()
+    release = asyncio.Event()
+
+    async def long_poll(request: web.Request) -> web.Response:
+        waiting.add(request.query["key"])
+        await release.wait()
+        return web.json_response({"ts": "2", "updates": []})
+
+    app = web.Application()
+    app.router.add_post("/lp", long_poll)
+    server = TestServer(app)
+    await server.start_server()
+
+    async def lp_responder(method_name, params):
+        url = str(server.make_url("/lp"))
+        return {"response": {"key": params["group_id"], "server": url, "ts": "1"}}
+
+    dp = get_dispatcher(FakeAPIClient(lp_responder))
+    multiplexer = LongpollMultiplexer(dp, refresh_interval=0)
+    for group_id in range(150):
+        multiplexer.add_group(group_id, api=dp.api.get_context())
+    await multiplexer.start()
+    client = multiplexer.client
+    try:
+        # more than default limit of aiohttp connector (100) wait at the same time
+        await wait_for(lambda: len(waiting) == 150)
+    finally:
+        release.set()
+        await multiplexer.stop()
+        await server.close()
+
+    assert multiplexer.client is None
+    assert client.session.closed
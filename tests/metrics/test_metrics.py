@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+
+from tests.api.conftest import FakeAPIClient
+from vkwave.api import API, RetryPolicy
+from vkwave.api.token import RateLimitedGetTokenStrategy
+from vkwave.api.token.token import BotSyncSingleToken, Token, TokenType
+from vkwave.metrics import APIMetrics, Counter, Gauge, Histogram, MetricsRegistry
+
+
+def test_render_prometheus_text():
+    registry = MetricsRegistry()
+    requests = registry.register(Counter("requests_total", "Requests", ["method"]))
+    latency = registry.register(Histogram("latency_seconds", "Latency", buckets=[0.1, 1]))
+
+    requests.inc('say "hi"')
+    requests.inc('say "hi"', value=2)
+    latency.observe(0.05)
+    latency.observe(0.5)
+
+    assert registry.render() == (
+        "# HELP requests_total Requests\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{method="say \\"hi\\""} 3\n'
+        "# HELP latency_seconds Latency\n"
+        "# TYPE latency_seconds histogram\n"
+        'latency_seconds_bucket{le="0.1"} 1\n'
+        'latency_seconds_bucket{le="1"} 2\n'
+        'latency_seconds_bucket{le="+Inf"} 2\n'
+        "latency_seconds_sum 0.55\n"
+        "latency_seconds_count 2\n"
+    )
+
+
+def test_wrong_labels():
+    with pytest.raises(ValueError):
+        Counter("requests_total", "Requests", ["method"]).inc()
+
+
+@pytest.mark.asyncio
+async def test_api_metrics():
+    async def responder(method_name, params):
+        if method_name == "groups.getById":
+            return {"error": {"error_code": 10, "error_msg": "Internal", "request_params": []}}
+        return {"response": []}
+
+    registry = MetricsRegistry()
+    metrics = APIMetrics(registry)
+    api = API(
+        BotSyncSingleToken(Token("secret")),
+        FakeAPIClient(responder),
+        retry_policy=RetryPolicy(max_attempts=2, base_delay=0),
+        metrics=metrics,
+    ).get_context()
+
+    await api.api_request("users.get", {})
+    with pytest.raises(Exception):
+        await api.api_request("groups.getById", {})
+
+    assert metrics.requests.get("users.get", "ok") == 1
+    assert metrics.requests.get("groups.getById", "error") == 2
+    assert metrics.errors.get("groups.getById", 10) == 2
+    assert metrics.latency.count("users.get") == 1
+
+    text = registry.render()
+    assert 'vkwave_api_retries_total{method="groups.getById"} 1' in text
+    assert "vkwave_api_token_requests_total" in text
+    assert "secret" not in text
+
+
+@pytest.mark.asyncio
+async def test_metrics_of_several_apis_are_shared():
+    async def responder(method_name, params):
+        return {"response": []}
+
+    registry = MetricsRegistry()
+    first, second = APIMetrics(registry), APIMetrics(registry)
+    for metrics in (first, second):
+        api = API(
+            BotSyncSingleToken(Token("secret")),
+            FakeAPIClient(responder),
+            retry_policy=RetryPolicy(),
+            metrics=metrics,
+        ).get_context()
+        await api.api_request("users.get", {})
+
+    assert first.requests is second.requests
+    text = registry.render()
+    assert 'vkwave_api_requests_total{method="users.get",status="ok"} 2' in text
+    assert text.count("# TYPE vkwave_api_retries_total") == 1
+
+    with pytest.raises(ValueError):
+        registry.register(Gauge("vkwave_api_requests_total", "Requests", ["method", "status"]))
+
+
+@pytest.mark.asyncio
+async def test_token_wait_time_is_exported():
+    async def responder(method_name, params):
+        return {"response": []}
+
+    registry = MetricsRegistry()
+    metrics = APIMetrics(registry)
+    api = API(
+        BotSyncSingleToken(Token("secret")),
+        FakeAPIClient(responder),
+        get_token_strategy=RateLimitedGetTokenStrategy(limits={TokenType.BOT: 100}),
+        metrics=metrics,
+    ).get_context()
+    await asyncio.gather(*(api.api_request("users.get", {}) for _ in range(3)))
+
+    label = metrics.token_label("secret")
+    text = registry.render()
+    assert f'vkwave_api_token_rate_limit{{token="{label}"}} 100' in text
+    wait_time = registry.get("vkwave_api_token_wait_seconds_total")
+    assert list(wait_time.samples())[0][2] > 0
+
+
+def test_number_of_token_labels_is_limited():
+    registry = MetricsRegistry()
+    metrics = APIMetrics(registry, max_token_labels=2)
+
+    for number in range(10):
+        token = f"token{number}"
+        metrics.request_started(token)
+        metrics.request_finished("users.get", token, 0.1)
+
+    labels = {labels[0] for _, labels, _ in metrics.token_requests.samples()}
+    assert len(labels) == 3
+    assert metrics.token_requests.get("other") == 8
+    assert metrics.token_label("token0") == metrics.token_label("token0") != "other"
+    assert len(metrics._token_labels) == 2
@@ -0,0 +1,63 @@
+import pytest
+
+from tests.api.conftest import FakeAPIClient
+from vkwave.api import API
+from vkwave.api.token.token import BotSyncSingleToken, Token
+from vkwave.bots.core.dispatching.filters.base import BaseFilter, FilterResult
+from vkwave.bots.core.dispatching.filters.manage import FilterManager
+from vkwave.tracing import RecordingTracer, set_tracer, span
+
+
+@pytest.fixture
+def tracer():
+    tracer = RecordingTracer()
+    set_tracer(tracer)
+    yield tracer
+    set_tracer(None)
+
+
+class FalseFilter(BaseFilter):
+    async def check(self, event) -> FilterResult:
+        return FilterResult(False)
+
+
+def test_noop_by_default():
+    with span("anything", a=1) as current:
+        current.set_attribute("b", 2)
+
+
+@pytest.mark.asyncio
+async def test_nested_spans(tracer):
+    async def responder(method_name, params):
+        return {"response": []}
+
+    api = API(BotSyncSingleToken(Token("t")), FakeAPIClient(responder)).get_context()
+    with span("handler", peer_id=1, skipped=None) as parent:
+        await api.users.get()
+        parent.set_attribute("done", True)
+
+    api_span, handler_span = tracer.spans
+    assert api_span.name == "vkwave.api_request"
+    assert api_span.attributes == {"method": "users.get"}
+    assert api_span.parent is handler_span
+    assert handler_span.attributes == {"peer_id": 1, "done": True}
+    assert handler_span.duration >= api_span.duration
+    assert tracer.current_span is None
+
+
+@pytest.mark.asyncio
+async def test_filter_spans(tracer):
+    manager = FilterManager()
+    manager.add_filter(FalseFilter())
+
+    assert not await manager.execute_filters(None)  # type: ignore
+    (filter_span,) = tracer.spans
+    assert filter_span.attributes == {"filter": "FalseFilter", "passed": False}
+
+
+@pytest.mark.asyncio
+async def test_errors_are_recorded(tracer):
+    with pytest.raises(ValueError):
+        with span("failing"):
+            raise ValueError()
+    assert isinstance(tracer.spans[0].error, ValueError)
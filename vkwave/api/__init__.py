@@ -1,3 +1,15 @@
-from .methods import API, APIOptionsRequestContext
+from .methods import (
+    API,
+    APIOptionsRequestContext,
+    ExecuteCoalescer,
+    RequestScheduler,
+    ResponseCache,
+    RetryPolicy,
+    SingleFlight,
+)
 from .token import Token, BotSyncSingleToken
+from .utils.bulk import BulkFetcher, PageSpec
 from .utils.get_all import Fetcher
+from .utils.paginate import paginate
+from .balancing import EWMALatencyBalancer, LeastInFlightBalancer, WeightedRoundRobinBalancer
+from .client_strategy import BalancedGetClientStrategy, RandomGetClientStrategy
@@ -0,0 +1,145 @@
+"""
+Load balancing between tokens and clients.
+"""
+import random
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Generic, Hashable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# 5: user authorization failed (token is revoked or invalid)
+AUTH_ERROR_CODES = frozenset((5,))
+
+
+class Health:
+    """Load and health of one balanced item"""
+
+    __slots__ = ("in_flight", "latency", "failures", "ejected_until", "current_weight")
+
+    def __init__(self):
+        self.in_flight = 0
+        self.latency: Optional[float] = None
+        self.failures = 0
+        self.ejected_until = 0.0
+        self.current_weight = 0
+
+
+class ABCBalancer(ABC, Generic[T]):
+    """
+    Chooses item (token or client) and temporarily ejects unhealthy ones.
+
+    Item is ejected for `eject_time` seconds after auth error
+    or after `max_failures` failed requests in a row.
+    """
+
+    def __init__(self, eject_time: float = 60.0, max_failures: int = 3, decay: float = 0.3):
+        self.eject_time = eject_time
+        self.max_failures = max_failures
+        self.decay = decay
+        self.health: Dict[Hashable, Health] = {}
+
+    def get_health(self, item: Hashable) -> Health:
+        health = self.health.get(item)
+        if health is None:
+            health = self.health[item] = Health()
+        return health
+
+    def is_ejected(self, item: Hashable, now: Optional[float] = None) -> bool:
+        health = self.health.get(item)
+        return health is not None and health.ejected_until > (now or time.monotonic())
+
+    def available(self, items: List[T]) -> List[T]:
+        now = time.monotonic()
+        healthy = [item for item in items if not self.is_ejected(item, now)]
+        # when everything is ejected it's better to try anything than to fail
+        return healthy or items
+
+    def choose(self, items: List[T]) -> T:
+        item = self._choose(self.available(items))
+        self.get_health(item).in_flight += 1
+        return item
+
+    @abstractmethod
+    def _choose(self, items: List[T]) -> T:
+        ...
+
+    def release(self, item: Hashable, latency: float, failed: bool = False) -> None:
+        health = self.get_health(item)
+        health.in_flight = max(0, health.in_flight - 1)
+        if failed:
+            health.failures += 1
+            if health.failures >= self.max_failures:
+                self.eject(item)
+            return
+        health.failures = 0
+        if health.latency is None:
+            health.latency = latency
+        else:
+            health.latency += self.decay * (latency - health.latency)
+
+    def cancel(self, item: Hashable) -> None:
+        """Request with item wasn't finished (cancelled or not sent), health isn't changed"""
+        health = self.get_health(item)
+        health.in_flight = max(0, health.in_flight - 1)
+
+    def eject(self, item: Hashable) -> None:
+        health = self.get_health(item)
+        health.ejected_until = time.monotonic() + self.eject_time
+        health.failures = 0
+
+
+class LeastInFlightBalancer(ABCBalancer[T]):
+    """Chooses item with the least number of unfinished requests"""
+
+    def _choose(self, items: List[T]) -> T:
+        least = min(self.get_health(item).in_flight for item in items)
+        return random.choice([item for item in items if self.get_health(item).in_flight == least])
+
+
+class WeightedRoundRobinBalancer(ABCBalancer[T]):
+    """
+    Smooth weighted round-robin.
+    Items without weight have weight 1.
+    """
+
+    def __init__(self, weights: Optional[Dict[Hashable, int]] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.weights: Dict[Hashable, int] = weights or {}
+
+    def _choose(self, items: List[T]) -> T:
+        total = 0
+        best: Optional[T] = None
+        best_health: Optional[Health] = None
+        for item in items:
+            weight = self.weights.get(item, 1)
+            health = self.get_health(item)
+            health.current_weight += weight
+            total += weight
+            if best_health is None or health.current_weight > best_health.current_weight:
+                best, best_health = item, health
+        best_health.current_weight -= total  # type: ignore
+        return best  # type: ignore
+
+
+class EWMALatencyBalancer(ABCBalancer[T]):
+    """
+    Chooses item with the lowest expected latency:
+    EWMA of latency multiplied by the number of unfinished requests.
+    Idle items without measurements are tried first, busy ones are expected
+    to answer in `default_latency` per unfinished request, so burst of requests
+    is spread between all new items.
+    """
+
+    def __init__(self, default_latency: float = 0.1, **kwargs):
+        super().__init__(**kwargs)
+        self.default_latency = default_latency
+
+    def _cost(self, item: T) -> float:
+        health = self.get_health(item)
+        if health.latency is None:
+            return self.default_latency * health.in_flight
+        return health.latency * (health.in_flight + 1)
+
+    def _choose(self, items: List[T]) -> T:
+        return min(items, key=self._cost)
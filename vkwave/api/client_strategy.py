@@ -0,0 +1,51 @@
+"""
+How to choose API client for request.
+"""
+from abc import ABC, abstractmethod
+from random import choice
+from typing import List, Optional
+
+from vkwave.api.balancing import ABCBalancer
+from vkwave.client.abstract import AbstractAPIClient
+
+
+class ABCGetClientStrategy(ABC):
+    @abstractmethod
+    def get_client(self, clients: List[AbstractAPIClient]) -> AbstractAPIClient:
+        ...
+
+    def report_request(
+        self, client: AbstractAPIClient, latency: float, exception: Optional[Exception] = None
+    ) -> None:
+        """Called after every request made with the client"""
+
+    def report_cancel(self, client: AbstractAPIClient) -> None:
+        """Called when client was chosen, but request wasn't finished (cancelled or not sent)"""
+
+
+class RandomGetClientStrategy(ABCGetClientStrategy):
+    def get_client(self, clients: List[AbstractAPIClient]) -> AbstractAPIClient:
+        return clients[0] if len(clients) == 1 else choice(clients)
+
+
+class BalancedGetClientStrategy(ABCGetClientStrategy):
+    """
+    Chooses client with balancer and ejects clients
+    which keep failing with connection errors for a while.
+
+    >>> api = API(tokens, clients, get_client_strategy=BalancedGetClientStrategy(EWMALatencyBalancer()))
+    """
+
+    def __init__(self, balancer: ABCBalancer[AbstractAPIClient]):
+        self.balancer = balancer
+
+    def get_client(self, clients: List[AbstractAPIClient]) -> AbstractAPIClient:
+        return self.balancer.choose(clients)
+
+    def report_request(
+        self, client: AbstractAPIClient, latency: float, exception: Optional[Exception] = None
+    ) -> None:
+        self.balancer.release(client, latency, failed=exception is not None)
+
+    def report_cancel(self, client: AbstractAPIClient) -> None:
+        self.balancer.cancel(client)
@@ -1,2 +1,8 @@
 from ._abc import API, APIOptionsRequestContext  # noqa: F401
 from ._error import RETURN_RESULT_ERRORS
+from ._coalescing import ExecuteCoalescer, ExecuteResultError  # noqa: F401
+from ._retry import RetryPolicy  # noqa: F401
+from ._scheduler import QueueOverflowError, RequestScheduler  # noqa: F401
+from ._cache import ResponseCache  # noqa: F401
+from ._single_flight import SingleFlight  # noqa: F401
+from ._loaders import BatchLoader, GroupsLoader, IsMemberLoader, Loaders, UsersLoader  # noqa: F401
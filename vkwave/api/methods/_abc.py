@@ -1,8 +1,19 @@
 import copy
 import random
+import time
+from collections import OrderedDict
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator, List, Optional, Tuple, Union, cast
-
+from typing import TYPE_CHECKING, AsyncGenerator, Dict, List, Optional, Tuple, Union, cast
+
+from vkwave.api.client_strategy import ABCGetClientStrategy, RandomGetClientStrategy
+from vkwave.api.methods._cache import ResponseCache
+from vkwave.api.methods._category import LazyCategory
+from vkwave.api.methods._coalescing import ExecuteCoalescer
+from vkwave.api.methods._loaders import Loaders
+from vkwave.api.methods._retry import RetryPolicy, RetryState
+from vkwave.api.methods._scheduler import RequestScheduler
+from vkwave.api.methods._single_flight import SingleFlight
+from vkwave.api.methods._utils import is_read_method, normalize_params, token_scope
 from vkwave.api.methods._error import (
     Error,
     ErrorDispatcher,
@@ -15,6 +26,10 @@ from vkwave.client.context import ResultState
 from vkwave.client.types import MethodName
 from vkwave.client import AIOHTTPClient
 from vkwave import __api_version__
+from vkwave.tracing import get_tracer, span
+
+if TYPE_CHECKING:
+    from vkwave.metrics import APIMetrics
 
 
 from .account import Account
@@ -71,12 +86,30 @@ class APIOptions:
         get_token_strategy: ABCGetTokenStrategy,
         api_version: str,
         error_dispatcher: ErrorDispatcher,
+        coalescer: Optional[ExecuteCoalescer] = None,
+        get_client_strategy: Optional[ABCGetClientStrategy] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        response_cache: Optional[ResponseCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        metrics: Optional["APIMetrics"] = None,
     ):
         self.tokens = tokens if isinstance(tokens, list) else [tokens]
         self.clients = clients if isinstance(clients, list) else [clients]
         self.get_token_strategy = get_token_strategy
         self.api_version: str = api_version
         self.error_dispatcher = error_dispatcher
+        self.coalescer = coalescer
+        self.get_client_strategy = get_client_strategy or RandomGetClientStrategy()
+        self.retry_policy = retry_policy
+        self.response_cache = response_cache
+        self.single_flight = single_flight
+        self.scheduler = scheduler
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.watch(self)
+        # loaders of every priority and cache ttl, copies made by `with_tokens` have their own
+        self.loaders: Dict[Tuple[str, Optional[str], Optional[float]], Loaders] = {}
 
     def add_token(self, tokens: TokensInput):
         self.tokens.extend(tokens if isinstance(tokens, list) else [tokens])
@@ -88,60 +121,102 @@ class APIOptions:
         return await self.get_token_strategy.get_token(self.tokens)
 
     def get_client(self) -> AbstractAPIClient:
-        return random.choice(self.clients)
+        return self.get_client_strategy.get_client(self.clients)
 
     async def get_client_and_token(self) -> Tuple[AbstractAPIClient, Token]:
-        return self.get_client(), await self.get_token()
+        """
+        Client and token of API request.
+        Request must wait for `acquire_token` right before it's sent
+        """
+        client = self.get_client()
+        try:
+            return client, await self.get_token_strategy.choose_token(self.tokens)
+        except BaseException:
+            self.get_client_strategy.report_cancel(client)
+            raise
+
+    async def acquire_token(self, token: Token, head_start: float = 0.0) -> None:
+        """Wait for rate limit of token, every HTTP request to API waits for it once"""
+        await self.get_token_strategy.acquire(token, head_start)
+
+    def report_request(
+        self,
+        client: AbstractAPIClient,
+        token: Token,
+        latency: float,
+        exception: Optional[Exception] = None,
+    ) -> None:
+        self.get_client_strategy.report_request(client, latency, exception)
+        self.get_token_strategy.report_request(token, latency, exception)
+
+    def report_cancel(self, client: AbstractAPIClient, token: Token) -> None:
+        self.get_client_strategy.report_cancel(client)
+        self.get_token_strategy.report_cancel(token)
+
+    def report_error(self, token: Token, code: int) -> None:
+        self.get_token_strategy.report_error(token, code)
 
     def update_pre_request_params(self, params: dict, token: Token) -> dict:
         params.update(v=self.api_version, access_token=token)
         return params
 
+    def with_tokens(self, tokens: List[AnyABCToken]) -> "APIOptions":
+        """
+        Copy of options which uses only these tokens.
+        Copy has its own loaders, so they are dropped together with it
+        """
+        copied = copy.copy(self)
+        copied.tokens = tokens
+        copied.loaders = {}
+        return copied
+
 
 class APIOptionsRequestContext:
+    account = LazyCategory(Account, "account")
+    ads = LazyCategory(Ads, "ads")
+    app_widgets = LazyCategory(AppWidgets, "appWidgets")
+    apps = LazyCategory(Apps, "apps")
+    audio = LazyCategory(Audio, "audio")
+    auth = LazyCategory(Auth, "auth")
+    board = LazyCategory(Board, "board")
+    donut = LazyCategory(Donut, "donut")
+    database = LazyCategory(Database, "database")
+    docs = LazyCategory(Docs, "docs")
+    execute = LazyCategory(Execute, "execute")
+    fave = LazyCategory(Fave, "fave")
+    friends = LazyCategory(Friends, "friends")
+    gifts = LazyCategory(Gifts, "gifts")
+    groups = LazyCategory(Groups, "groups")
+    lead_forms = LazyCategory(LeadForms, "leadForms")
+    likes = LazyCategory(Likes, "likes")
+    market = LazyCategory(Market, "market")
+    money = LazyCategory(Money, "money")
+    messages = LazyCategory(Messages, "messages")
+    newsfeed = LazyCategory(Newsfeed, "newsfeed")
+    notes = LazyCategory(Notes, "notes")
+    notifications = LazyCategory(Notifications, "notifications")
+    orders = LazyCategory(Orders, "orders")
+    pages = LazyCategory(Pages, "pages")
+    photos = LazyCategory(Photos, "photos")
+    polls = LazyCategory(Polls, "polls")
+    pretty_cards = LazyCategory(PrettyCards, "prettyCards")
+    search = LazyCategory(Search, "search")
+    secure = LazyCategory(Secure, "secure")
+    stats = LazyCategory(Stats, "stats")
+    status = LazyCategory(Status, "status")
+    storage = LazyCategory(Storage, "storage")
+    stories = LazyCategory(Stories, "stories")
+    streaming = LazyCategory(Streaming, "streaming")
+    users = LazyCategory(Users, "users")
+    utils = LazyCategory(Utils, "utils")
+    video = LazyCategory(Video, "video")
+    wall = LazyCategory(Wall, "wall")
+    widgets = LazyCategory(Widgets, "widgets")
+
     def __init__(self, api_options: APIOptions):
         self.api_options = api_options
-
-        self.account = Account("account", self)
-        self.ads = Ads("ads", self)
-        self.app_widgets = AppWidgets("appWidgets", self)
-        self.apps = Apps("apps", self)
-        self.audio = Audio("audio", self)
-        self.auth = Auth("auth", self)
-        self.board = Board("board", self)
-        self.donut = Donut('donut', self)
-        self.database = Database("database", self)
-        self.docs = Docs("docs", self)
-        self.execute = Execute("execute", self)
-        self.fave = Fave("fave", self)
-        self.friends = Friends("friends", self)
-        self.gifts = Gifts("gifts", self)
-        self.groups = Groups("groups", self)
-        self.lead_forms = LeadForms("leadForms", self)
-        self.likes = Likes("likes", self)
-        self.market = Market("market", self)
-        self.money = Money("money", self)
-        self.messages = Messages("messages", self)
-        self.newsfeed = Newsfeed("newsfeed", self)
-        self.notes = Notes("notes", self)
-        self.notifications = Notifications("notifications", self)
-        self.orders = Orders("orders", self)
-        self.pages = Pages("pages", self)
-        self.photos = Photos("photos", self)
-        self.polls = Polls("polls", self)
-        self.pretty_cards = PrettyCards("prettyCards", self)
-        self.search = Search("search", self)
-        self.secure = Secure("secure", self)
-        self.stats = Stats("stats", self)
-        self.status = Status("status", self)
-        self.storage = Storage("storage", self)
-        self.stories = Stories("stories", self)
-        self.streaming = Streaming("streaming", self)
-        self.users = Users("users", self)
-        self.utils = Utils("utils", self)
-        self.video = Video("video", self)
-        self.wall = Wall("wall", self)
-        self.widgets = Widgets("widgets", self)
+        self.cache_ttl: Optional[float] = None
+        self.priority: Optional[str] = None
 
     async def handle_error(self, error: Error) -> Optional[dict]:
         dispatcher = self.api_options.error_dispatcher
@@ -153,19 +228,61 @@ class APIOptionsRequestContext:
     @asynccontextmanager
     async def sync_token(self) -> AsyncGenerator["APIOptionsRequestContext", None]:
         """Grab random token and work only with it"""
-        copied = copy.copy(self.api_options)
-        copied.tokens = [random.choice(await copied.get_token())]
+        copied = self.api_options.with_tokens([random.choice(await self.api_options.get_token())])
         new = APIOptionsRequestContext(copied)
         yield new
         del copied
         del new
 
-    async def api_request(self, method_name: Union[str, MethodName], params: dict) -> dict:
-        method_name = cast(MethodName, method_name)
-        client, token = await self.api_options.get_client_and_token()
-
-        params = self.api_options.update_pre_request_params(params, token)
+    @property
+    def loaders(self) -> Loaders:
+        """
+        Batching loaders, shared between all contexts with the same tokens and options,
+        so requests of loaders keep lane and cache of context.
+        """
+        key = (token_scope(self.api_options.tokens), self.priority, self.cache_ttl)
+        loaders = self.api_options.loaders.get(key)
+        if loaders is None:
+            loaders = self.api_options.loaders[key] = Loaders(self)
+        return loaders
+
+    def with_cache(self, ttl: Optional[float] = None) -> "APIOptionsRequestContext":
+        """Context which caches responses of all read methods"""
+        cache = self.api_options.response_cache
+        if cache is None:
+            raise ValueError("API was created without response_cache")
+        ctx = APIOptionsRequestContext(self.api_options)
+        ctx.cache_ttl = ttl if ttl is not None else cache.default_ttl
+        ctx.priority = self.priority
+        return ctx
+
+    def with_priority(self, lane: str) -> "APIOptionsRequestContext":
+        """Context whose requests are scheduled in lane (`interactive`, `background`...)"""
+        scheduler = self.api_options.scheduler
+        if scheduler is None:
+            raise ValueError("API was created without scheduler")
+        if lane not in scheduler.lanes:
+            raise ValueError(f"Unknown lane {lane!r}")
+        ctx = APIOptionsRequestContext(self.api_options)
+        ctx.cache_ttl = self.cache_ttl
+        ctx.priority = lane
+        return ctx
+
+    async def raw_request(
+        self,
+        client: AbstractAPIClient,
+        method_name: MethodName,
+        params: dict,
+        retry_state: Optional[RetryState] = None,
+    ) -> dict:
+        """
+        Send request and return raw result without error handling
+
+        :param retry_state: attempts of API call which the request belongs to
+        """
         ctx = client.create_request(method_name, params)
+        if self.api_options.retry_policy is not None:
+            self.api_options.retry_policy.install(ctx, retry_state)
         await ctx.send_request()
 
         state = ctx.result.state
@@ -178,7 +295,9 @@ class APIOptionsRequestContext:
             raise exc
         if state is ResultState.HANDLED_EXCEPTION:
             exc_data = ctx.result.exception_data
-            exc_data = cast(dict, exc_data)
+            if exc_data is None:
+                # handler gave up
+                raise cast(Exception, ctx.result.exception)
             if not ("error" in exc_data or "response" in exc_data):
                 raise UnsuccessAPIRequestException()
         else:
@@ -186,20 +305,159 @@ class APIOptionsRequestContext:
             data = cast(dict, data)
 
         result = data or exc_data
-        result = cast(dict, result)
+        return cast(dict, result)
+
+    async def _request(
+        self, method_name: MethodName, params: dict, retry_state: Optional[RetryState] = None
+    ) -> dict:
+        scheduler = self.api_options.scheduler
+        if scheduler is None:
+            return await self._send(method_name, params, None, retry_state)
+        lane = scheduler.get_lane(method_name, self.priority)
+        async with scheduler.slot(lane):
+            return await self._send(method_name, params, lane, retry_state)
+
+    async def _send(
+        self,
+        method_name: MethodName,
+        params: dict,
+        lane: Optional[str] = None,
+        retry_state: Optional[RetryState] = None,
+    ) -> dict:
+        client, token = await self.api_options.get_client_and_token()
+        scheduler = self.api_options.scheduler
+        if scheduler is None or lane is None:
+            return await self._send_by(client, token, method_name, params, 0.0, retry_state)
+        sent = False
+        try:
+            async with scheduler.client_slot(client, lane):
+                sent = True
+                return await self._send_by(
+                    client,
+                    token,
+                    method_name,
+                    params,
+                    scheduler.get_head_start(lane),
+                    retry_state,
+                )
+        except BaseException:
+            # client and token were taken, but waiting for slot failed
+            if not sent:
+                self.api_options.report_cancel(client, token)
+            raise
+
+    async def _send_by(
+        self,
+        client: AbstractAPIClient,
+        token: Token,
+        method_name: MethodName,
+        params: dict,
+        head_start: float = 0.0,
+        retry_state: Optional[RetryState] = None,
+    ) -> dict:
+        coalescer = self.api_options.coalescer
+        metrics = self.api_options.metrics
+        if metrics is not None:
+            metrics.request_started(token)
+        started = time.monotonic()
+        try:
+            if coalescer is not None and coalescer.can_coalesce(method_name):
+                # coalescer waits for rate limit once for the whole execute request
+                result = await coalescer.request(
+                    self, client, token, method_name, params, head_start
+                )
+            else:
+                await self.api_options.acquire_token(token, head_start)
+                # waiting for rate limit isn't latency of the request
+                started = time.monotonic()
+                params = self.api_options.update_pre_request_params(params, token)
+                result = await self.raw_request(client, method_name, params, retry_state)
+        except Exception as exc:
+            latency = time.monotonic() - started
+            self.api_options.report_request(client, token, latency, exc)
+            if metrics is not None:
+                metrics.request_finished(method_name, token, latency, exception=exc)
+            raise
+        except BaseException:
+            # cancelled request has no outcome, only in-flight counters are released
+            self.api_options.report_cancel(client, token)
+            if metrics is not None:
+                metrics.request_cancelled(token)
+            raise
+        latency = time.monotonic() - started
+        self.api_options.report_request(client, token, latency)
+
+        error_code = None
+        if "error" in result:
+            error_code = result["error"]["error_code"]
+            self.api_options.report_error(token, error_code)
+        if metrics is not None:
+            metrics.request_finished(method_name, token, latency, error_code)
+        return result
+
+    async def _fetch(self, method_name: MethodName, params: dict) -> dict:
+        retry_policy = self.api_options.retry_policy
+        if retry_policy is None:
+            return await self._request(method_name, params)
+
+        # exceptions retried by request context and error codes share attempts
+        state = RetryState()
+        result = await self._request(method_name, params, state)
+        while "error" in result and retry_policy.should_retry_error(
+            method_name, result["error"]["error_code"]
+        ):
+            if not await retry_policy.wait_retry(method_name, state):
+                break
+            result = await self._request(method_name, params, state)
+        return result
+
+    async def api_request(self, method_name: Union[str, MethodName], params: dict) -> dict:
+        method_name = cast(MethodName, method_name)
+        if get_tracer() is None:
+            return await self._api_request(method_name, params)
+        with span("vkwave.api_request", method=method_name):
+            return await self._api_request(method_name, params)
+
+    async def _api_request(self, method_name: MethodName, params: dict) -> dict:
+
+        cache = self.api_options.response_cache
+        single_flight = self.api_options.single_flight
+        scope = None
+        cache_ttl = cache_key = None
+        if cache is not None:
+            cache.on_request(method_name)
+            cache_ttl = cache.get_ttl(method_name, self.cache_ttl)
+            if cache_ttl:
+                scope = token_scope(self.api_options.tokens)
+                cache_key = cache.make_key(method_name, params, scope)
+                cached = await cache.get(cache_key)
+                if cached is not None:
+                    return cached
+
+        if single_flight is not None and is_read_method(method_name):
+            scope = scope or token_scope(self.api_options.tokens)
+            key = f"{scope}:{method_name}:{normalize_params(params)}"
+            result = await single_flight.do(key, lambda: self._fetch(method_name, params))
+        else:
+            result = await self._fetch(method_name, params)
 
         if "error" in result or "execute_errors" in result:
             if "execute_errors" in result:
                 result["request_params"] = params
-                del result["request_params"]["access_token"]
+                result["request_params"].pop("access_token", None)
             err_handler_result = await self.handle_error(Error(result))
             if err_handler_result:
                 result = err_handler_result
+        elif cache is not None and cache_key is not None and cache_ttl:
+            await cache.put(cache_key, method_name, result, cache_ttl)
 
         return result
 
 
 class API:
+    # max number of cached contexts of `with_token`
+    token_contexts_size: int = 1024
+
     def __init__(
         self,
         tokens: TokensInput,
@@ -207,6 +465,13 @@ class API:
         get_token_strategy: Optional[ABCGetTokenStrategy] = None,
         api_version: Optional[str] = None,
         error_dispatcher: Optional[ErrorDispatcher] = None,
+        coalescer: Optional[ExecuteCoalescer] = None,
+        get_client_strategy: Optional[ABCGetClientStrategy] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        response_cache: Optional[ResponseCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        metrics: Optional["APIMetrics"] = None,
     ):
         self.default_api_options = APIOptions(
             tokens,
@@ -214,15 +479,33 @@ class API:
             get_token_strategy or RandomGetTokenStrategy(),
             api_version or __api_version__,
             error_dispatcher or ErrorDispatcher(),
+            coalescer,
+            get_client_strategy,
+            retry_policy,
+            response_cache,
+            single_flight,
+            scheduler,
+            metrics,
         )
+        self._token_contexts: "OrderedDict[AnyABCToken, APIOptionsRequestContext]" = OrderedDict()
 
     def get_context(self) -> APIOptionsRequestContext:
         return APIOptionsRequestContext(self.default_api_options)
 
     def with_token(self, token: AnyABCToken) -> APIOptionsRequestContext:
-        copied = copy.copy(self.default_api_options)
-        copied.tokens = [token]
-        return APIOptionsRequestContext(copied)
+        """
+        Context which uses only this token.
+        Contexts are cached, so the same context is returned for the same token.
+        """
+        ctx = self._token_contexts.get(token)
+        if ctx is not None:
+            self._token_contexts.move_to_end(token)
+            return ctx
+        copied = self.default_api_options.with_tokens([token])
+        ctx = self._token_contexts[token] = APIOptionsRequestContext(copied)
+        if len(self._token_contexts) > self.token_contexts_size:
+            self._token_contexts.popitem(last=False)
+        return ctx
 
     def with_options(self, options: APIOptions) -> APIOptionsRequestContext:
         return APIOptionsRequestContext(options)
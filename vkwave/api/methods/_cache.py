@@ -0,0 +1,151 @@
+"""
+Cache of responses of read methods.
+"""
+import time
+import typing
+from collections import OrderedDict
+
+from vkwave.api.methods._utils import is_read_method, normalize_params
+from vkwave.client.types import MethodName
+from vkwave.http.codec import dumps, loads
+
+if typing.TYPE_CHECKING:
+    from vkwave.bots.storage.base import AbstractExpiredStorage
+    from vkwave.bots.storage.types import TTL, Key  # noqa: F401
+
+
+class ResponseCache:
+    """
+    LRU cache of API responses with per-method TTLs
+    and optional second tier in expired storage (`RedisStorage` for example).
+
+    TTLs can be set for method (`users.get`) or for whole category (`groups`).
+    Only read methods are cached.
+    Responses are kept serialized, so every hit gets its own copy of response.
+
+    >>> cache = ResponseCache(ttls={"users.get": 3600, "groups": 600})
+    >>> api = API(tokens, response_cache=cache)
+    >>> await api.get_context().with_cache(ttl=60).utils.resolve_screen_name(screen_name="durov")
+    """
+
+    def __init__(
+        self,
+        ttls: typing.Optional[typing.Dict[str, float]] = None,
+        default_ttl: float = 60.0,
+        max_size: int = 1024,
+        storage: typing.Optional["AbstractExpiredStorage"] = None,
+        invalidate_on: typing.Optional[typing.Dict[str, typing.Iterable[str]]] = None,
+        key_prefix: str = "vkwave:api:",
+    ):
+        """
+        :param ttls: TTL of method or category responses
+        :param default_ttl: TTL for calls from `with_cache()` context
+        :param max_size: max number of responses in memory
+        :param storage: second tier of cache
+        :param invalidate_on: drop cached responses of methods when other method is called,
+         for example `{"groups.edit": ["groups.getById"]}`
+        :param key_prefix: prefix of keys in storage
+        """
+        self.ttls: typing.Dict[str, float] = ttls or {}
+        self.default_ttl = default_ttl
+        self.max_size = max_size
+        self.storage = storage
+        self.invalidate_on: typing.Dict[str, typing.FrozenSet[str]] = {
+            method: frozenset(targets) for method, targets in (invalidate_on or {}).items()
+        }
+        self.key_prefix = key_prefix
+
+        # key -> (method name, monotonic expiration time, serialized response)
+        self._data: typing.OrderedDict[str, typing.Tuple[MethodName, float, str]] = OrderedDict()
+        self._generations: typing.Dict[str, int] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def get_ttl(
+        self, method_name: MethodName, ttl: typing.Optional[float] = None
+    ) -> typing.Optional[float]:
+        """TTL of method's response or None if it must not be cached"""
+        if not is_read_method(method_name):
+            return None
+        if ttl is not None:
+            return ttl
+        method_ttl = self.ttls.get(method_name)
+        if method_ttl is None:
+            method_ttl = self.ttls.get(method_name.partition(".")[0])
+        return method_ttl
+
+    def make_key(self, method_name: MethodName, params: dict, scope: str) -> str:
+        generation = self._generation(method_name)
+        return f"{self.key_prefix}{scope}:{method_name}:{generation}:{normalize_params(params)}"
+
+    def _generation(self, method_name: MethodName) -> str:
+        generations = self._generations
+        return "{}.{}.{}".format(
+            generations.get("", 0),
+            generations.get(method_name.partition(".")[0], 0),
+            generations.get(method_name, 0),
+        )
+
+    async def get(self, key: str) -> typing.Optional[dict]:
+        entry = self._data.get(key)
+        if entry is not None:
+            _, expires_at, response = entry
+            if expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return loads(response)
+            del self._data[key]
+
+        if self.storage is not None:
+            stored = await self.storage.get(typing.cast("Key", key), None)
+            if stored is not None:
+                # storage is shared between processes, so expiration time is wall-clock
+                ttl = stored["expires_at"] - time.time()
+                if ttl > 0:
+                    self.hits += 1
+                    self._remember(key, stored["method_name"], stored["response"], ttl)
+                    return loads(stored["response"])
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, method_name: MethodName, result: dict, ttl: float) -> None:
+        response = dumps(result)
+        self._remember(key, method_name, response, ttl)
+
+        if self.storage is not None:
+            stored = {
+                "method_name": method_name,
+                "expires_at": time.time() + ttl,
+                "response": response,
+            }
+            await self.storage.put(typing.cast("Key", key), stored, typing.cast("TTL", ttl))
+
+    def _remember(self, key: str, method_name: MethodName, response: str, ttl: float) -> None:
+        self._data[key] = (method_name, time.monotonic() + ttl, response)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def invalidate(self, method_name: typing.Optional[str] = None) -> None:
+        """
+        Drop cached responses of method (or category) or all responses.
+        Responses in storage will never be read again and will expire by TTL.
+        """
+        if method_name is None:
+            self._data.clear()
+            self._generations[""] = self._generations.get("", 0) + 1
+            return
+
+        for key, (cached_method, _, _) in list(self._data.items()):
+            if cached_method == method_name or cached_method.partition(".")[0] == method_name:
+                del self._data[key]
+        self._generations[method_name] = self._generations.get(method_name, 0) + 1
+
+    def on_request(self, method_name: MethodName) -> None:
+        """Called before every request, drops responses which become stale after it"""
+        targets = self.invalidate_on.get(method_name)
+        if targets:
+            for target in targets:
+                self.invalidate(target)
@@ -1,7 +1,12 @@
+import inspect
+import re
+import textwrap
 import typing
 
 from vkwave.client.types import MethodName
 
+from ._utils import _encode_sequence, encode_value
+
 if typing.TYPE_CHECKING:
     from ._abc import APIOptionsRequestContext
 
@@ -10,13 +15,188 @@ class TemporaryException(Exception):
     """It means nothing."""
 
 
+# full method names by category, shared between all contexts
+_METHOD_NAMES: typing.Dict[str, typing.Dict[str, MethodName]] = {}
+
+# names used by body of generated method, parameters can't shadow them
+_GENERATED_LOCALS = frozenset(("self", "params", "raw_result", "result", "return_raw_response"))
+
+# value is sent as is, other values are encoded
+_PLAIN_CHECK = "type({0}) is int or type({0}) is str"
+
+
 class Category:
     def __init__(self, name: str, api: "APIOptionsRequestContext"):
         self.category_name = name
-        self.__api = api
+        self._api = api
+        self._method_names = _METHOD_NAMES.setdefault(name, {})
 
     def make_method_name(self, method_name: str) -> MethodName:
-        return MethodName(f"{self.category_name}.{method_name}")
+        full_name = self._method_names.get(method_name)
+        if full_name is None:
+            full_name = self._method_names[method_name] = MethodName(
+                f"{self.category_name}.{method_name}"
+            )
+        return full_name
 
     async def api_request(self, method_name: str, params: dict) -> dict:
-        return await self.__api.api_request(self.make_method_name(method_name), params)
+        return await self._api.api_request(self.make_method_name(method_name), params)
+
+
+C = typing.TypeVar("C", bound=Category)
+
+
+def _value_type(annotation: typing.Any) -> typing.Any:
+    """`List[int]` for `Optional[List[int]]`"""
+    args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+    if typing.get_origin(annotation) is typing.Union and len(args) == 1:
+        return args[0]
+    return annotation
+
+
+def _encode_expression(name: str, annotation: typing.Any) -> str:
+    """Expression which encodes parameter, most values of annotated type skip `encode_value`"""
+    value_type = _value_type(annotation)
+    if value_type is bool:
+        return f"int({name}) if type({name}) is bool else _encode_value({name})"
+    if typing.get_origin(value_type) is list:
+        return f"_encode_sequence({name}) if type({name}) is list else _encode_value({name})"
+    return f"{name} if {_PLAIN_CHECK.format(name)} else _encode_value({name})"
+
+
+_PARAMS_LINE = "    params = get_params(locals())"
+_REQUEST_LINE = re.compile(r'^    raw_result = await self\.api_request\("(\w+)", params\)$')
+
+# module globals with encoders, shared by compiled methods of one module
+_NAMESPACES: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+
+
+def _namespace(func: typing.Callable) -> typing.Dict[str, typing.Any]:
+    namespace = _NAMESPACES.get(func.__module__)
+    if namespace is None:
+        namespace = _NAMESPACES[func.__module__] = dict(func.__globals__)
+        namespace["_encode_value"] = encode_value
+        namespace["_encode_sequence"] = _encode_sequence
+    return namespace
+
+
+def _compile_method(func: typing.Callable, category_name: str) -> typing.Optional[typing.Callable]:
+    """
+    Same method with name and parameters resolved once.
+
+    Generated methods look like this:
+
+        params = get_params(locals())
+
+        raw_result = await self.api_request("getById", params)
+        if return_raw_response:
+            return raw_result
+        ...
+
+    Parameters are put into dict one by one with encoders chosen by annotations
+    instead of `get_params(locals())` and request is sent by full name.
+    Code after request (choice of response model) is kept as it is.
+    Methods which don't look like this return None.
+    """
+    try:
+        lines = textwrap.dedent(inspect.getsource(func)).splitlines()
+    except (OSError, TypeError):
+        return None
+    requests = [(i, _REQUEST_LINE.match(line)) for i, line in enumerate(lines)]
+    requests = [(i, match) for i, match in requests if match is not None]
+    if len(requests) != 1 or lines.count(_PARAMS_LINE) != 1:
+        return None
+    request_index, match = requests[0]
+    if any(line.strip() for line in lines[lines.index(_PARAMS_LINE) + 1 : request_index]):
+        return None
+
+    parameters = list(inspect.signature(func).parameters.values())[1:]
+    names = [parameter.name for parameter in parameters]
+    if "return_raw_response" not in names or any(
+        parameter.kind is not parameter.POSITIONAL_OR_KEYWORD
+        or parameter.name.startswith("_")
+        or (parameter.name in _GENERATED_LOCALS and parameter.name != "return_raw_response")
+        for parameter in parameters
+    ):
+        return None
+
+    method_name = f"{category_name}.{match.group(1)}"
+    body = [f"async def {func.__name__}(self, {', '.join(names)}):", "    params = {}"]
+    for parameter in parameters:
+        if parameter.name == "return_raw_response":
+            continue
+        body.append(f"    if {parameter.name} is not None:")
+        expression = _encode_expression(parameter.name, parameter.annotation)
+        body.append(f"        params[{parameter.name!r}] = {expression}")
+    body.append(f"    raw_result = await self._api.api_request({method_name!r}, params)")
+    body += lines[request_index + 1 :]
+
+    namespace = _namespace(func)
+    scope: typing.Dict[str, typing.Any] = {}
+    exec("\n".join(body), namespace, scope)  # noqa: S102
+    compiled = scope[func.__name__]
+    compiled.__defaults__ = func.__defaults__
+    compiled.__doc__ = func.__doc__
+    compiled.__qualname__ = func.__qualname__
+    compiled.__module__ = func.__module__
+    compiled.__annotations__ = func.__annotations__
+    compiled.__wrapped__ = func
+    return compiled
+
+
+def compile_category(category: typing.Type[C], name: str) -> typing.Type[C]:
+    """
+    Subclass of category which methods have full names and parameter encoders
+    built once instead of on every call.
+    Methods which don't look like generated ones are inherited as they are.
+    """
+    methods: typing.Dict[str, typing.Any] = {}
+    for attribute, func in vars(category).items():
+        if not inspect.iscoroutinefunction(func) or attribute.startswith("_"):
+            continue
+        compiled = _compile_method(func, name)
+        if compiled is not None:
+            methods[attribute] = compiled
+    if not methods:
+        return category
+    methods["__module__"] = category.__module__
+    methods["__qualname__"] = category.__qualname__
+    methods["__doc__"] = category.__doc__
+    return typing.cast(typing.Type[C], type(category.__name__, (category,), methods))
+
+
+class LazyCategory(typing.Generic[C]):
+    """
+    Category which is created on first access and then stored in context,
+    so contexts don't build dozens of categories they never use.
+
+    Methods of category are compiled on first access (see `compile_category`),
+    compiled class is shared by all contexts.
+    """
+
+    def __init__(self, category: typing.Type[C], name: str):
+        self.category = category
+        self.name = name
+        self.attribute = name
+        self._compiled: typing.Optional[typing.Type[C]] = None
+
+    def __set_name__(self, owner: type, attribute: str) -> None:
+        self.attribute = attribute
+
+    @typing.overload
+    def __get__(self, instance: None, owner: type) -> "LazyCategory[C]":
+        ...
+
+    @typing.overload
+    def __get__(self, instance: "APIOptionsRequestContext", owner: type) -> C:
+        ...
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        if self._compiled is None:
+            self._compiled = compile_category(self.category, self.name)
+        category = self._compiled(self.name, instance)
+        # instance attribute shadows descriptor, next lookups don't get here
+        instance.__dict__[self.attribute] = category
+        return category
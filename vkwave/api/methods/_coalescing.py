@@ -0,0 +1,216 @@
+"""
+Packing concurrent API calls into `execute` requests.
+"""
+import asyncio
+import json
+import typing
+
+from vkwave.api.methods._utils import encode_value
+from vkwave.api.token.token import Token
+from vkwave.client.abstract import AbstractAPIClient
+from vkwave.client.types import MethodName
+
+if typing.TYPE_CHECKING:
+    from ._abc import APIOptionsRequestContext
+
+# VK doesn't allow more than 25 API calls in one execute
+MAX_EXECUTE_CALLS = 25
+
+# methods which can't be called from VKScript
+DEFAULT_EXCLUDED_METHODS = frozenset(("execute", "execute.", "auth"))
+
+
+def _dump_call(method_name: MethodName, params: dict) -> str:
+    args = {key: encode_value(value) for key, value in params.items()}
+    return f"API.{method_name}({json.dumps(args, ensure_ascii=False)})"
+
+
+class ExecuteResultError(Exception):
+    """`execute` response doesn't contain result of packed call"""
+
+
+class _PendingCall:
+    __slots__ = ("method_name", "params", "future")
+
+    def __init__(self, method_name: MethodName, params: dict, future: asyncio.Future):
+        self.method_name = method_name
+        self.params = params
+        self.future = future
+
+    @property
+    def request_params(self) -> typing.List[dict]:
+        """Params of call in format of VK's `request_params`"""
+        request_params = [{"key": "method", "value": self.method_name}]
+        request_params.extend(
+            {"key": key, "value": str(encode_value(value))} for key, value in self.params.items()
+        )
+        return request_params
+
+
+class _Batch:
+    __slots__ = ("client", "api_ctx", "calls", "timer", "head_start")
+
+    def __init__(
+        self, client: AbstractAPIClient, api_ctx: "APIOptionsRequestContext", head_start: float
+    ):
+        self.client = client
+        self.api_ctx = api_ctx
+        self.calls: typing.List[_PendingCall] = []
+        self.timer: typing.Optional[asyncio.TimerHandle] = None
+        # execute waits for rate limit with priority of its most urgent call
+        self.head_start = head_start
+
+
+class ExecuteCoalescer:
+    """
+    Collects API calls issued within `window` seconds on the same token
+    and sends them as one `execute` request.
+
+    Every caller gets its own part of the response. Failed calls are returned as
+    usual `{"error": ...}` results, so they go through `ErrorDispatcher` of the caller.
+
+    >>> api = API(tokens, coalescer=ExecuteCoalescer(window=0.01))
+    """
+
+    def __init__(
+        self,
+        window: float = 0.01,
+        max_calls: int = MAX_EXECUTE_CALLS,
+        excluded_methods: typing.Iterable[str] = DEFAULT_EXCLUDED_METHODS,
+    ):
+        if not 1 <= max_calls <= MAX_EXECUTE_CALLS:
+            raise ValueError(f"max_calls must be between 1 and {MAX_EXECUTE_CALLS}")
+        self.window = window
+        self.max_calls = max_calls
+        self.excluded_methods = frozenset(excluded_methods)
+        self._batches: typing.Dict[Token, _Batch] = {}
+        self._tasks: typing.Set["asyncio.Task[None]"] = set()
+
+    def can_coalesce(self, method_name: MethodName) -> bool:
+        if method_name in self.excluded_methods:
+            return False
+        category, _, _ = method_name.partition(".")
+        return category not in self.excluded_methods
+
+    async def request(
+        self,
+        api_ctx: "APIOptionsRequestContext",
+        client: AbstractAPIClient,
+        token: Token,
+        method_name: MethodName,
+        params: dict,
+        head_start: float = 0.0,
+    ) -> dict:
+        """Enqueue call and wait for its part of the `execute` response."""
+        loop = asyncio.get_running_loop()
+        batch = self._batches.get(token)
+        if batch is None:
+            batch = self._batches[token] = _Batch(client, api_ctx, head_start)
+            batch.timer = loop.call_later(self.window, self._flush, token)
+        else:
+            batch.head_start = min(batch.head_start, head_start)
+
+        future = loop.create_future()
+        batch.calls.append(_PendingCall(method_name, params, future))
+        if len(batch.calls) >= self.max_calls:
+            self._flush(token)
+
+        return await future
+
+    def _flush(self, token: Token) -> None:
+        batch = self._batches.pop(token, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        task = asyncio.get_running_loop().create_task(self._send(batch, token))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: _Batch, token: Token) -> None:
+        calls = batch.calls
+        options = batch.api_ctx.api_options
+        try:
+            # one execute request takes one slot of token's rate limit
+            await options.acquire_token(token, batch.head_start)
+        except Exception as exc:
+            self._fail(calls, exc)
+            return
+
+        if len(calls) == 1:
+            # there is nothing to pack
+            call = calls[0]
+            params = options.update_pre_request_params(dict(call.params), token)
+            await self._resolve(
+                call, batch.api_ctx.raw_request(batch.client, call.method_name, params)
+            )
+            return
+
+        code = "return [{}];".format(",".join(_dump_call(c.method_name, c.params) for c in calls))
+        params = options.update_pre_request_params({"code": code}, token)
+        try:
+            result = await batch.api_ctx.raw_request(batch.client, MethodName("execute"), params)
+        except Exception as exc:
+            self._fail(calls, exc)
+            return
+
+        for call, call_result in zip(calls, self._split(calls, result)):
+            if not call.future.done():
+                call.future.set_result(call_result)
+        # response is shorter than list of calls or isn't list at all
+        for call in calls:
+            if not call.future.done():
+                call.future.set_exception(
+                    ExecuteResultError(f"No result of {call.method_name} in execute response")
+                )
+
+    @staticmethod
+    def _fail(calls: typing.List[_PendingCall], exc: Exception) -> None:
+        for call in calls:
+            if not call.future.done():
+                call.future.set_exception(exc)
+
+    @staticmethod
+    async def _resolve(call: _PendingCall, coro: typing.Awaitable[dict]) -> None:
+        try:
+            result = await coro
+        except Exception as exc:
+            if not call.future.done():
+                call.future.set_exception(exc)
+            return
+        if not call.future.done():
+            call.future.set_result(result)
+
+    @staticmethod
+    def _split(calls: typing.List[_PendingCall], result: dict) -> typing.List[dict]:
+        if "error" in result:
+            # whole execute failed, so every call failed the same way
+            return [
+                {"error": dict(result["error"], request_params=call.request_params)}
+                for call in calls
+            ]
+
+        responses = result.get("response")
+        if responses is None:
+            responses = [False] * len(calls)
+        elif not isinstance(responses, list):
+            return []
+        # execute_errors are ordered in the same way as failed calls
+        errors = iter(result.get("execute_errors") or ())
+
+        splitted = []
+        for call, response in zip(calls, responses):
+            err = next(errors, None) if response is False else None
+            if err is not None:
+                splitted.append(
+                    {
+                        "error": {
+                            "error_code": err["error_code"],
+                            "error_msg": err["error_msg"],
+                            "request_params": call.request_params,
+                        }
+                    }
+                )
+            else:
+                splitted.append({"response": response})
+        return splitted
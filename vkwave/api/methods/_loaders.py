@@ -0,0 +1,190 @@
+"""
+Batching of lookups by ID (DataLoader pattern).
+"""
+import asyncio
+import copy
+import enum
+import time
+import typing
+from abc import ABC, abstractmethod
+
+from vkwave.types.objects import GroupsGroupFull, GroupsMemberStatus, UsersUserFull
+from vkwave.types.responses import GroupsIsMemberUserIdsResponse
+
+if typing.TYPE_CHECKING:
+    from ._abc import APIOptionsRequestContext
+
+K = typing.TypeVar("K")
+V = typing.TypeVar("V")
+
+Options = typing.Tuple[typing.Tuple[str, typing.Any], ...]
+
+
+def _freeze(value: typing.Any) -> typing.Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(sorted(_freeze(item) for item in value))
+    return value
+
+
+class _Batch(typing.Generic[K]):
+    __slots__ = ("keys", "futures")
+
+    def __init__(self):
+        self.keys: typing.List[K] = []
+        self.futures: typing.List[asyncio.Future] = []
+
+
+class BatchLoader(ABC, typing.Generic[K, V]):
+    """
+    Collects keys requested within one loop iteration
+    and loads them with one request per distinct set of options.
+
+    Every awaiter gets its own object or None if VK didn't return it.
+    """
+
+    max_batch_size: int
+
+    def __init__(self, api: "APIOptionsRequestContext", cache_ttl: typing.Optional[float] = None):
+        """
+        :param api: context which is used for requests
+        :param cache_ttl: how long loaded objects are kept, they are not kept by default
+        """
+        self._api = api
+        self.cache_ttl = cache_ttl
+        self._batches: typing.Dict[Options, _Batch[K]] = {}
+        self._cache: typing.Dict[typing.Tuple[Options, K], typing.Tuple[float, V]] = {}
+        self._tasks: typing.Set["asyncio.Task[None]"] = set()
+
+    async def load(self, key: K, **options: typing.Any) -> typing.Optional[V]:
+        frozen_options: Options = tuple(sorted((k, _freeze(v)) for k, v in options.items()))
+
+        if self.cache_ttl is not None:
+            cached = self._cache.get((frozen_options, key))
+            if cached is not None and cached[0] > time.monotonic():
+                return copy.deepcopy(cached[1])
+
+        loop = asyncio.get_running_loop()
+        batch = self._batches.get(frozen_options)
+        if batch is None:
+            batch = self._batches[frozen_options] = _Batch()
+            loop.call_soon(self._dispatch, frozen_options)
+
+        future = loop.create_future()
+        batch.keys.append(key)
+        batch.futures.append(future)
+        if len(batch.keys) >= self.max_batch_size:
+            self._dispatch(frozen_options)
+        return await future
+
+    async def load_many(
+        self, keys: typing.Iterable[K], **options: typing.Any
+    ) -> typing.List[typing.Optional[V]]:
+        return list(await asyncio.gather(*(self.load(key, **options) for key in keys)))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def _dispatch(self, options: Options) -> None:
+        batch = self._batches.pop(options, None)
+        if batch is not None:
+            task = asyncio.get_running_loop().create_task(self._load_batch(options, batch))
+            # keep reference to task until it's done
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _load_batch(self, options: Options, batch: _Batch[K]) -> None:
+        unique_keys = list(dict.fromkeys(batch.keys))
+        request_options = {
+            key: list(value) if isinstance(value, tuple) else value for key, value in options
+        }
+        try:
+            loaded = await self.batch_load(unique_keys, request_options)
+        except Exception as exc:
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        if self.cache_ttl is not None:
+            expires_at = time.monotonic() + self.cache_ttl
+            for key, value in loaded.items():
+                self._cache[(options, key)] = (expires_at, value)
+
+        # loaded object is given to the first awaiter of key if it isn't cached,
+        # others get copies
+        given: typing.Set[K] = set()
+        for key, future in zip(batch.keys, batch.futures):
+            if future.done():
+                continue
+            value = loaded.get(key)
+            if value is not None and (self.cache_ttl is not None or key in given):
+                value = copy.deepcopy(value)
+            given.add(key)
+            future.set_result(value)
+
+    @abstractmethod
+    async def batch_load(self, keys: typing.List[K], options: dict) -> typing.Dict[K, V]:
+        """Load objects of keys with one request"""
+
+
+class UsersLoader(BatchLoader[int, UsersUserFull]):
+    """
+    `users.get` by user ID.
+
+    >>> user = await api.loaders.users.load(1, fields=["photo_50"])
+    """
+
+    max_batch_size = 1000
+
+    async def batch_load(
+        self, keys: typing.List[int], options: dict
+    ) -> typing.Dict[int, UsersUserFull]:
+        result = await self._api.users.get(user_ids=keys, **options)
+        return {user.id: user for user in result.response}
+
+
+class GroupsLoader(BatchLoader[int, GroupsGroupFull]):
+    """
+    `groups.getById` by group ID.
+
+    >>> group = await api.loaders.groups.load(1, fields=["members_count"])
+    """
+
+    max_batch_size = 500
+
+    async def batch_load(
+        self, keys: typing.List[int], options: dict
+    ) -> typing.Dict[int, GroupsGroupFull]:
+        result = await self._api.groups.get_by_id(group_ids=keys, **options)
+        return {group.id: group for group in result.response}
+
+
+class IsMemberLoader(BatchLoader[int, GroupsMemberStatus]):
+    """
+    `groups.isMember` by user ID.
+
+    >>> status = await api.loaders.is_member.load(1, group_id=1)
+    >>> status.member
+    """
+
+    max_batch_size = 500
+
+    async def batch_load(
+        self, keys: typing.List[int], options: dict
+    ) -> typing.Dict[int, GroupsMemberStatus]:
+        raw_result = await self._api.groups.is_member(
+            user_ids=keys, return_raw_response=True, **options
+        )
+        result = GroupsIsMemberUserIdsResponse(**raw_result)
+        return {status.user_id: status for status in result.response}
+
+
+class Loaders:
+    """Loaders of one API context"""
+
+    def __init__(self, api: "APIOptionsRequestContext", cache_ttl: typing.Optional[float] = None):
+        self.users = UsersLoader(api, cache_ttl)
+        self.groups = GroupsLoader(api, cache_ttl)
+        self.is_member = IsMemberLoader(api, cache_ttl)
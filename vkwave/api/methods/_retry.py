@@ -0,0 +1,140 @@
+"""
+Declarative retries of failed API requests.
+"""
+import asyncio
+import random
+import time
+import typing
+from collections import Counter
+
+from aiohttp import ClientConnectionError
+
+from vkwave.api.methods._utils import is_read_method
+from vkwave.client.context import RequestContext
+from vkwave.client.types import MethodName
+
+# 1: unknown error
+# 6: too many requests per second
+# 10: internal server error
+DEFAULT_RETRY_CODES = frozenset((1, 6, 10))
+
+# request wasn't executed at all, so it can be retried even if method changes something
+DEFAULT_ALWAYS_RETRY_CODES = frozenset((6,))
+
+DEFAULT_RETRY_EXCEPTIONS: typing.Tuple[typing.Type[Exception], ...] = (
+    ClientConnectionError,
+    asyncio.TimeoutError,
+)
+
+
+class RetryState:
+    """Attempts of one API call, shared by retries of error codes and exceptions"""
+
+    __slots__ = ("started", "attempt")
+
+    def __init__(self):
+        self.started = time.monotonic()
+        # number of requests which were sent or are being sent
+        self.attempt = 1
+
+
+class RetryPolicy:
+    """
+    Retries failed requests with exponential back-off and full jitter,
+    so retries of many coroutines don't happen at the same moment.
+
+    Only read methods are retried automatically (see `is_read_method`),
+    except `always_retry_codes` which mean that request wasn't executed.
+
+    Retries of error codes and exceptions of one call share `max_attempts` and `budget`.
+    Client must register every exception of `exceptions` in its request contexts.
+
+    >>> api = API(tokens, retry_policy=RetryPolicy(max_attempts=5))
+    """
+
+    def __init__(
+        self,
+        codes: typing.Iterable[int] = DEFAULT_RETRY_CODES,
+        exceptions: typing.Tuple[typing.Type[Exception], ...] = DEFAULT_RETRY_EXCEPTIONS,
+        max_attempts: int = 3,
+        base_delay: float = 0.2,
+        max_delay: float = 5.0,
+        budget: float = 10.0,
+        always_retry_codes: typing.Iterable[int] = DEFAULT_ALWAYS_RETRY_CODES,
+        read_methods: typing.Iterable[str] = (),
+        write_methods: typing.Iterable[str] = (),
+    ):
+        self.codes = frozenset(codes)
+        self.exceptions = exceptions
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.always_retry_codes = frozenset(always_retry_codes)
+        self.read_methods = frozenset(read_methods)
+        self.write_methods = frozenset(write_methods)
+
+        self.retries: typing.Counter[MethodName] = Counter()
+
+    def is_idempotent(self, method_name: MethodName) -> bool:
+        if method_name in self.write_methods:
+            return False
+        return method_name in self.read_methods or is_read_method(method_name)
+
+    def get_delay(self, attempt: int, started: float) -> typing.Optional[float]:
+        """Delay before next attempt or None if we must give up"""
+        if attempt >= self.max_attempts:
+            return None
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if time.monotonic() - started + delay > self.budget:
+            return None
+        return delay
+
+    def should_retry_error(self, method_name: MethodName, code: int) -> bool:
+        if code in self.always_retry_codes:
+            return True
+        return code in self.codes and self.is_idempotent(method_name)
+
+    async def wait_retry(self, method_name: MethodName, state: RetryState) -> bool:
+        """Sleep before next attempt. Returns False if we must give up"""
+        delay = self.get_delay(state.attempt, state.started)
+        if delay is None:
+            return False
+        state.attempt += 1
+        self.retries[method_name] += 1
+        await asyncio.sleep(delay)
+        return True
+
+    def install(self, ctx: RequestContext, state: typing.Optional[RetryState] = None) -> None:
+        """
+        Set exception handlers of request context which retry the request
+
+        :param state: attempts of the call, new ones are counted if it isn't passed
+        """
+        if not self.is_idempotent(ctx.method_name):
+            return
+        if state is None:
+            state = RetryState()
+
+        async def handle_exception(ctx: RequestContext) -> None:
+            await self._handle_exception(ctx, state)
+
+        for exception in self.exceptions:
+            try:
+                ctx.set_exception_handler(exception, handle_exception)
+            except ValueError:
+                raise ValueError(
+                    f"Client doesn't register {exception.__name__}, so it can't be retried. "
+                    "Register it in exceptions of request context "
+                    "or remove it from exceptions of RetryPolicy"
+                ) from None
+
+    async def _handle_exception(self, ctx: RequestContext, state: RetryState) -> None:
+        while await self.wait_retry(ctx.method_name, state):
+            try:
+                ctx.result.exception_data = await ctx.request_callback(
+                    ctx.method_name, ctx.request_params
+                )
+                return
+            except self.exceptions as exc:
+                ctx.result.exception = exc
@@ -0,0 +1,186 @@
+"""
+Priority lanes of API requests.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+import typing
+from collections import Counter
+from contextlib import asynccontextmanager
+
+from vkwave.client.abstract import AbstractAPIClient
+from vkwave.client.types import MethodName
+
+# head start of lane in seconds: request of "background" lane is served before
+# "interactive" request only if it has waited 5 seconds longer
+DEFAULT_LANES: typing.Dict[str, float] = {
+    "interactive": 0.0,
+    "default": 0.5,
+    "background": 5.0,
+}
+
+DEFAULT_METHOD_LANES: typing.Dict[str, str] = {
+    "messages.send": "interactive",
+    "messages.edit": "interactive",
+    "messages.sendMessageEventAnswer": "interactive",
+}
+
+
+class QueueOverflowError(Exception):
+    """Request was rejected because too many requests are waiting"""
+
+
+class _PrioritySlots:
+    """Limited number of slots which are given to waiters with the earliest deadline first"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.taken = 0
+        self.waiters: typing.List[typing.Tuple[float, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+
+    def try_acquire(self) -> bool:
+        if self.taken < self.size and not self.waiters:
+            self.taken += 1
+            return True
+        return False
+
+    async def wait(self, deadline: float) -> None:
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (deadline, next(self._counter), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # slot was given right before cancellation
+                self.release()
+            else:
+                self.waiters = [waiter for waiter in self.waiters if waiter[2] is not future]
+                heapq.heapify(self.waiters)
+            raise
+
+    def release(self) -> None:
+        self.taken -= 1
+        while self.waiters and self.taken < self.size:
+            _, _, future = heapq.heappop(self.waiters)
+            if future.done():
+                continue
+            self.taken += 1
+            future.set_result(None)
+
+
+class RequestScheduler:
+    """
+    Limits the number of requests in flight and serves waiting requests by priority.
+
+    Waiting requests are ordered by their arrival time plus head start of their lane,
+    so requests of low-priority lanes are delayed but never starve.
+    The same order is used by per-client limits and by rate limits of tokens.
+
+    When `max_queue` requests are already waiting, new ones fail with `QueueOverflowError`
+    instead of piling up.
+
+    >>> api = API(tokens, scheduler=RequestScheduler(max_in_flight=50))
+    >>> await api.get_context().with_priority("background").wall.get(owner_id=1)
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        lanes: typing.Optional[typing.Dict[str, float]] = None,
+        method_lanes: typing.Optional[typing.Dict[str, str]] = None,
+        default_lane: str = "default",
+        max_in_flight_per_client: typing.Optional[int] = None,
+        max_queue: typing.Optional[int] = None,
+    ):
+        """
+        :param max_in_flight: max number of requests which are sent at the same time
+        :param lanes: head start of every lane in seconds
+        :param method_lanes: lanes of methods which are called from context without priority
+        :param default_lane: lane of other methods
+        :param max_in_flight_per_client: max number of requests sent by one client at the same time
+        :param max_queue: max number of waiting requests, there is no limit by default
+        """
+        self.max_in_flight = max_in_flight
+        self.lanes = lanes if lanes is not None else dict(DEFAULT_LANES)
+        self.method_lanes = (
+            method_lanes if method_lanes is not None else dict(DEFAULT_METHOD_LANES)
+        )
+        if default_lane not in self.lanes:
+            raise ValueError(f"Unknown lane {default_lane!r}")
+        self.default_lane = default_lane
+        self.max_in_flight_per_client = max_in_flight_per_client
+        self.max_queue = max_queue
+
+        self._slots = _PrioritySlots(max_in_flight)
+        self._client_slots: typing.Dict[AbstractAPIClient, _PrioritySlots] = {}
+
+        self.waited: typing.Counter[str] = Counter()
+        self.wait_time: typing.Dict[str, float] = {lane: 0.0 for lane in self.lanes}
+        self.max_queued = 0
+        self.rejected = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._slots.taken
+
+    @property
+    def queued(self) -> int:
+        return len(self._slots.waiters)
+
+    def get_lane(self, method_name: MethodName, priority: typing.Optional[str] = None) -> str:
+        if priority is not None:
+            return priority
+        return self.method_lanes.get(method_name, self.default_lane)
+
+    def get_head_start(self, lane: str) -> float:
+        try:
+            return self.lanes[lane]
+        except KeyError:
+            raise ValueError(f"Unknown lane {lane!r}") from None
+
+    async def acquire(self, lane: str) -> None:
+        head_start = self.get_head_start(lane)
+        if self._slots.try_acquire():
+            return
+
+        if self.max_queue is not None and self.queued >= self.max_queue:
+            self.rejected += 1
+            raise QueueOverflowError(f"{self.queued} requests are already waiting")
+
+        enqueued_at = time.monotonic()
+        # request is about to join the queue
+        self.max_queued = max(self.max_queued, self.queued + 1)
+        await self._slots.wait(enqueued_at + head_start)
+        self.waited[lane] += 1
+        self.wait_time[lane] += time.monotonic() - enqueued_at
+
+    def release(self) -> None:
+        self._slots.release()
+
+    @asynccontextmanager
+    async def slot(self, lane: str) -> typing.AsyncGenerator[None, None]:
+        await self.acquire(lane)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def client_slot(
+        self, client: AbstractAPIClient, lane: typing.Optional[str] = None
+    ) -> typing.AsyncGenerator[None, None]:
+        if self.max_in_flight_per_client is None:
+            yield
+            return
+        slots = self._client_slots.get(client)
+        if slots is None:
+            slots = self._client_slots[client] = _PrioritySlots(self.max_in_flight_per_client)
+        if not slots.try_acquire():
+            head_start = self.get_head_start(lane) if lane is not None else 0.0
+            await slots.wait(time.monotonic() + head_start)
+        try:
+            yield
+        finally:
+            slots.release()
@@ -0,0 +1,50 @@
+"""
+Deduplication of identical requests which are in flight at the same time.
+"""
+import asyncio
+import typing
+
+from vkwave.http.codec import dumps, loads
+
+
+class _Call:
+    __slots__ = ("future", "waiters")
+
+    def __init__(self, future: "asyncio.Future[dict]"):
+        self.future = future
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Identical requests which are in flight at the same time share one underlying request,
+    its result and its error. Nothing is kept after request is finished.
+    Every caller of shared request gets its own copy of result.
+
+    Only read methods are deduplicated.
+
+    >>> api = API(tokens, single_flight=SingleFlight())
+    """
+
+    def __init__(self):
+        self._calls: typing.Dict[str, _Call] = {}
+        self.shared = 0
+
+    async def do(self, key: str, request: typing.Callable[[], typing.Awaitable[dict]]) -> dict:
+        """Run request or join the same request which is already in flight"""
+        call = self._calls.get(key)
+        if call is None or call.future.done():
+            call = self._calls[key] = _Call(asyncio.ensure_future(request()))
+            call.future.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.shared += 1
+        call.waiters += 1
+        # cancellation of one caller mustn't cancel request of others
+        result = await asyncio.shield(call.future)
+        if call.waiters > 1:
+            # callers change results (error handlers add request_params, for example)
+            return loads(dumps(result))
+        return result
+
+    def in_flight(self) -> int:
+        return len(self._calls)
@@ -1,8 +1,100 @@
-def get_params(func_locals: dict):
+import enum
+import hashlib
+import typing
+
+if typing.TYPE_CHECKING:
+    from vkwave.api.token.token import AnyABCToken
+    from vkwave.client.types import MethodName
+
+READ_METHOD_PREFIXES = ("get", "search", "is", "resolve", "check")
+
+NOT_KEYED_PARAMS = frozenset(("access_token", "v"))
+
+
+EXCLUDED_LOCALS = frozenset(("self", "return_raw_response"))
+
+
+def _encode_plain(value: typing.Any) -> typing.Any:
+    return value
+
+
+def _encode_bool(value: bool) -> int:
+    return int(value)
+
+
+def _encode_enum(value: enum.Enum) -> typing.Any:
+    return encode_value(value.value)
+
+
+def _encode_sequence(value: typing.Iterable[typing.Any]) -> str:
+    return ",".join([item if type(item) is str else str(encode_value(item)) for item in value])
+
+
+_ENCODERS: typing.Dict[type, typing.Callable[[typing.Any], typing.Any]] = {
+    str: _encode_plain,
+    int: _encode_plain,
+    float: _encode_plain,
+    bool: _encode_bool,
+    list: _encode_sequence,
+    tuple: _encode_sequence,
+}
+
+
+def _find_encoder(type_: type) -> typing.Callable[[typing.Any], typing.Any]:
+    # enum members are checked first: `class X(str, Enum)` is also str
+    if issubclass(type_, enum.Enum):
+        return _encode_enum
+    for base in (bool, list, tuple, set, frozenset):
+        if issubclass(type_, base):
+            return _ENCODERS.get(base, _encode_sequence)
+    return _encode_plain
+
+
+def encode_value(value: typing.Any) -> typing.Any:
+    """Value as VK expects it: enum's value, 1/0 instead of bool, comma-separated list"""
+    type_ = type(value)
+    encoder = _ENCODERS.get(type_)
+    if encoder is None:
+        encoder = _ENCODERS[type_] = _find_encoder(type_)
+    return encoder(value)
+
+
+def get_params(func_locals: dict) -> dict:
     params = {}
-    for key, value_ in func_locals.items():
-        if key not in ["self", "return_raw_response"] and value_ is not None:
-            if isinstance(value_, list):
-                value_ = ",".join(str(item) for item in value_)
-            params[key] = value_
+    for key, value in func_locals.items():
+        if value is None or key in EXCLUDED_LOCALS:
+            continue
+        type_ = type(value)
+        if type_ is not str and type_ is not int:
+            value = encode_value(value)
+        params[key] = value
     return params
+
+
+def is_read_method(method_name: "MethodName") -> bool:
+    """Guess by name whether method only reads data: `users.get`, `groups.isMember`..."""
+    _, _, name = method_name.partition(".")
+    for prefix in READ_METHOD_PREFIXES:
+        if name.startswith(prefix) and (len(name) == len(prefix) or name[len(prefix)].isupper()):
+            return True
+    return False
+
+
+def normalize_params(params: dict) -> str:
+    """Params in the same order and format, without token and API version"""
+    return "&".join(
+        f"{key}={encode_value(value)}"
+        for key, value in sorted(params.items())
+        if key not in NOT_KEYED_PARAMS and value is not None
+    )
+
+
+def token_scope(tokens: typing.List["AnyABCToken"]) -> str:
+    """Identifier of tokens which doesn't contain tokens themselves"""
+    parts = []
+    for token in tokens:
+        if isinstance(token, str):
+            parts.append(token)
+        else:
+            parts.append(str(getattr(token, "_token", None) or id(token)))
+    return hashlib.sha1(",".join(parts).encode()).hexdigest()[:16]
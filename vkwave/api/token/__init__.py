@@ -1 +1,3 @@
 from .token import BotSyncSingleToken, UserSyncSingleToken, BotSyncPoolTokens, Token
+from .strategy import BalancedGetTokenStrategy
+from .rate_limit import RateLimitedGetTokenStrategy
@@ -0,0 +1,201 @@
+"""
+Token strategy which respects VK's requests per second limits.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from vkwave.api.token.strategy import ABCGetTokenStrategy, resolve_token
+from vkwave.api.token.token import AnyABCToken, GetTokenType, Token, TokenType
+
+DEFAULT_LIMITS: Dict[TokenType, float] = {TokenType.BOT: 20, TokenType.USER: 3}
+
+# 6: too many requests per second
+# 9: flood control
+# 29: rate limit reached
+FLOOD_ERROR_CODES: FrozenSet[int] = frozenset((6, 9, 29))
+
+
+class TokenBucket:
+    """
+    Requests budget of one token.
+
+    Requests which can't be sent at once wait in queue, ordered by arrival time
+    plus head start of their priority lane (see `RequestScheduler`),
+    so interactive requests don't wait behind background ones.
+    """
+
+    def __init__(
+        self,
+        limit: float,
+        burst: int = 1,
+        decrease_factor: float = 0.5,
+        increase_step: float = 1.0,
+        min_rate: float = 0.5,
+    ):
+        self.limit = limit
+        self.rate = limit
+        self.burst = burst
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self.min_rate = min_rate
+
+        self.requests = 0
+        self.wait_time = 0.0
+        self.flood_errors = 0
+
+        self._tat = 0.0
+        self._last_adjust = time.monotonic()
+        self._waiters: List[Tuple[float, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _recover(self, now: float) -> None:
+        if self.rate < self.limit:
+            self.rate = min(self.limit, self.rate + self.increase_step * (now - self._last_adjust))
+        self._last_adjust = now
+
+    def delay(self, now: float) -> float:
+        """How long the first waiter has to wait for a free slot"""
+        interval = 1 / self.rate
+        return max(0.0, max(self._tat, now) - (self.burst - 1) * interval - now)
+
+    def expected_delay(self, now: float) -> float:
+        """How long new request will wait if it doesn't overtake anybody"""
+        return self.delay(now) + len(self._waiters) / self.rate
+
+    def _take(self, now: float) -> None:
+        self._tat = max(self._tat, now) + 1 / self.rate
+        self.requests += 1
+
+    async def acquire(self, head_start: float = 0.0) -> None:
+        """Wait for free slot and take it"""
+        now = time.monotonic()
+        self._recover(now)
+        if not self._waiters and not self.delay(now):
+            self._take(now)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (now + head_start, next(self._counter), future))
+        self._schedule(now)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if not future.done() or future.cancelled():
+                self._waiters = [waiter for waiter in self._waiters if waiter[2] is not future]
+                heapq.heapify(self._waiters)
+            raise
+        self.wait_time += time.monotonic() - now
+
+    def _schedule(self, now: float) -> None:
+        if self._waiters and self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.delay(now), self._wake)
+
+    def _wake(self) -> None:
+        self._timer = None
+        now = time.monotonic()
+        self._recover(now)
+        while self._waiters and not self.delay(now):
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._take(now)
+            future.set_result(None)
+        self._schedule(now)
+
+    def decrease(self, now: float) -> None:
+        """Shrink budget after flood error"""
+        self._recover(now)
+        self.flood_errors += 1
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        self._tat = max(self._tat, now + 1 / self.rate)
+
+
+class RateLimitedGetTokenStrategy(ABCGetTokenStrategy):
+    """
+    Picks token with the earliest free slot and waits for it
+    instead of sending request which will fail with error 6.
+    Waiting requests are served by priority of their lane.
+
+    API takes a slot right before HTTP request is sent, so calls packed
+    into one `execute` by `ExecuteCoalescer` take one slot.
+
+    Budget of token is shrunk on flood errors (6, 9, 29) and recovers linearly (AIMD).
+
+    >>> api = API(tokens, get_token_strategy=RateLimitedGetTokenStrategy())
+    """
+
+    token_type = (TokenType.BOT, TokenType.USER)
+    get_token_type = (GetTokenType.SYNC, GetTokenType.ASYNC)
+
+    def __init__(
+        self,
+        limits: Optional[Dict[TokenType, float]] = None,
+        default_token_type: TokenType = TokenType.BOT,
+        burst: int = 1,
+        decrease_factor: float = 0.5,
+        increase_step: float = 1.0,
+        min_rate: float = 0.5,
+    ):
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.default_token_type = default_token_type
+        self.burst = burst
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self.min_rate = min_rate
+
+        self.buckets: Dict[Token, TokenBucket] = {}
+
+    def _get_bucket(self, token: Token, token_type: TokenType) -> TokenBucket:
+        bucket = self.buckets.get(token)
+        if bucket is None:
+            bucket = self.buckets[token] = TokenBucket(
+                self.limits[token_type],
+                burst=self.burst,
+                decrease_factor=self.decrease_factor,
+                increase_step=self.increase_step,
+                min_rate=self.min_rate,
+            )
+        return bucket
+
+    async def get_token(self, tokens: List[AnyABCToken]) -> Token:
+        token = await self.choose_token(tokens)
+        await self.acquire(token)
+        return token
+
+    async def choose_token(self, tokens: List[AnyABCToken]) -> Token:
+        """Token with the earliest free slot, slot itself is taken by `acquire`"""
+        candidates: List[Tuple[Token, TokenBucket]] = []
+        for abc_token in tokens:
+            token_type = getattr(abc_token, "typeof", self.default_token_type)
+            token = await resolve_token(abc_token)
+            candidates.append((token, self._get_bucket(token, token_type)))
+
+        now = time.monotonic()
+        token, _ = min(candidates, key=lambda candidate: candidate[1].expected_delay(now))
+        return token
+
+    async def acquire(self, token: Token, head_start: float = 0.0) -> None:
+        bucket = self.buckets.get(token)
+        if bucket is None:
+            # token wasn't chosen by this strategy
+            return
+        await bucket.acquire(head_start)
+
+    def report_error(self, token: Token, code: int) -> None:
+        if code not in FLOOD_ERROR_CODES:
+            return
+        bucket = self.buckets.get(token)
+        if bucket is not None:
+            bucket.decrease(time.monotonic())
+
+    def wait_time(self) -> Dict[Token, float]:
+        """Total time callers spent waiting for every token"""
+        return {token: bucket.wait_time for token, bucket in self.buckets.items()}
@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
 from random import choice
-from typing import List, Tuple, Union, cast
+from typing import Dict, List, Optional, Tuple, Union, cast
 
+from vkwave.api.balancing import AUTH_ERROR_CODES, ABCBalancer
 from vkwave.api.token.token import (
     ABCAsyncToken,
     ABCSyncToken,
@@ -12,6 +13,18 @@ from vkwave.api.token.token import (
 )
 
 
+async def resolve_token(token: AnyABCToken) -> Token:
+    """Get token's value no matter is it sync or async"""
+    if isinstance(token, str):
+        return cast(Token, token)
+
+    if token.get_token_type is GetTokenType.ASYNC:
+        token = cast(ABCAsyncToken, token)
+        return await token.get_token()
+    token = cast(ABCSyncToken, token)
+    return token.get_token()
+
+
 class ABCGetTokenStrategy(ABC):
     token_type: Union[TokenType, Tuple[TokenType, ...]]
     get_token_type: Union[GetTokenType, Tuple[GetTokenType, ...]]
@@ -20,18 +33,74 @@ class ABCGetTokenStrategy(ABC):
     async def get_token(self, tokens: List[AnyABCToken]) -> Token:
         ...
 
+    async def choose_token(self, tokens: List[AnyABCToken]) -> Token:
+        """
+        Choose token of request which is sent later.
+        `acquire` of the token must be awaited right before the request is sent
+        """
+        return await self.get_token(tokens)
+
+    async def acquire(self, token: Token, head_start: float = 0.0) -> None:
+        """
+        Wait until one more request can be sent with the token
+
+        :param head_start: head start of request's lane in seconds (see `RequestScheduler`),
+         requests with bigger head start are served later
+        """
+
+    def report_request(
+        self, token: Token, latency: float, exception: Optional[Exception] = None
+    ) -> None:
+        """Called after every request made with the token"""
+
+    def report_cancel(self, token: Token) -> None:
+        """Called when token was got, but request wasn't finished (cancelled or not sent)"""
+
+    def report_error(self, token: Token, code: int) -> None:
+        """Called when VK returns error for request made with the token"""
+
 
 class RandomGetTokenStrategy(ABCGetTokenStrategy):
     token_type = (TokenType.BOT, TokenType.USER)
     get_token_type = (GetTokenType.SYNC, GetTokenType.ASYNC)
 
     async def get_token(self, tokens: List[AnyABCToken]) -> Token:
-        token = choice(tokens)
-        if isinstance(token, str):
-            return cast(Token, token)
-
-        if token.get_token_type is GetTokenType.ASYNC:
-            token = cast(ABCAsyncToken, token)
-            return await token.get_token()
-        token = cast(ABCSyncToken, token)
-        return token.get_token()
+        return await resolve_token(tokens[0] if len(tokens) == 1 else choice(tokens))
+
+
+class BalancedGetTokenStrategy(ABCGetTokenStrategy):
+    """
+    Chooses token with balancer and ejects tokens which got auth error for a while.
+
+    >>> api = API(tokens, get_token_strategy=BalancedGetTokenStrategy(LeastInFlightBalancer()))
+    """
+
+    token_type = (TokenType.BOT, TokenType.USER)
+    get_token_type = (GetTokenType.SYNC, GetTokenType.ASYNC)
+
+    def __init__(self, balancer: ABCBalancer[AnyABCToken]):
+        self.balancer = balancer
+        self._owners: Dict[Token, AnyABCToken] = {}
+
+    async def get_token(self, tokens: List[AnyABCToken]) -> Token:
+        abc_token = self.balancer.choose(tokens)
+        try:
+            token = await resolve_token(abc_token)
+        except BaseException:
+            self.balancer.cancel(abc_token)
+            raise
+        self._owners[token] = abc_token
+        return token
+
+    def report_request(
+        self, token: Token, latency: float, exception: Optional[Exception] = None
+    ) -> None:
+        # connection problems are not token's fault
+        self.balancer.release(self._owners.get(token, token), latency)
+
+    def report_cancel(self, token: Token) -> None:
+        self.balancer.cancel(self._owners.get(token, token))
+
+    def report_error(self, token: Token, code: int) -> None:
+        if code in AUTH_ERROR_CODES:
+            self.balancer.eject(self._owners.get(token, token))
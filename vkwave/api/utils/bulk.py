@@ -0,0 +1,150 @@
+import json
+import typing
+
+from vkwave.api.methods._error import APIError
+from vkwave.api.methods._utils import encode_value
+
+if typing.TYPE_CHECKING:
+    from vkwave.api.methods import APIOptionsRequestContext
+
+# VK doesn't allow more than 25 API calls in one execute
+MAX_EXECUTE_CALLS = 25
+
+# 13: runtime error in execute, response is too big or code ran too long
+EXECUTE_RUNTIME_ERROR = 13
+
+
+class PageSpec:
+    """
+    Paginated method which can be fetched with execute.
+
+    Offset pagination is consistent only when order of items is stable,
+    so order can be set for every page request.
+
+    >>> members = PageSpec("groups.getMembers", page_size=1000, sort="id_asc")
+    >>> comments = PageSpec("wall.getComments", page_size=100, sort="asc")
+    >>> history = PageSpec("messages.getHistory", page_size=200, sort=1, sort_param="rev")
+    """
+
+    def __init__(
+        self,
+        method: str,
+        page_size: int = 100,
+        item_path: str = "items",
+        count_path: str = "count",
+        count_param: str = "count",
+        offset_param: str = "offset",
+        sort: typing.Optional[typing.Any] = None,
+        sort_param: str = "sort",
+    ):
+        """
+        :param method: name of method, `groups.getMembers`
+        :param page_size: number of items in one call
+        :param item_path: path of items in method's response
+        :param count_path: path of total number of items in method's response
+        :param sort: order of items, it's sent as `sort_param` unless params of fetch set it
+        """
+        self.method = method
+        self.page_size = page_size
+        self.item_path = item_path
+        self.count_path = count_path
+        self.count_param = count_param
+        self.offset_param = offset_param
+        self.sort = sort
+        self.sort_param = sort_param
+
+    def compile(self, params: dict, offset: int, calls: int, end: typing.Optional[int]) -> str:
+        """VKScript which fetches `calls` pages starting from `offset`"""
+        args = {key: encode_value(value) for key, value in params.items() if value is not None}
+        if self.sort is not None:
+            args.setdefault(self.sort_param, encode_value(self.sort))
+        args[self.count_param] = self.page_size
+        args.pop(self.offset_param, None)
+        dumped_args = json.dumps(args, ensure_ascii=False)
+        call_args = f'{dumped_args[:-1]}, "{self.offset_param}": offset}}'
+
+        return (
+            f"var offset = {offset};"
+            f"var end = {end if end is not None else -1};"
+            "var items = [];"
+            "var total = end;"
+            "var calls = 0;"
+            f"while (calls < {calls} && (end < 0 || offset < end)) {{"
+            f"var page = API.{self.method}({call_args});"
+            f"var page_items = page.{self.item_path};"
+            f"total = page.{self.count_path};"
+            "if (end < 0 || total < end) { end = total; }"
+            "items = items + page_items;"
+            f"offset = offset + {self.page_size};"
+            "calls = calls + 1;"
+            f"if (page_items.length == 0) {{ calls = {calls}; }}"
+            "}"
+            'return {"items": items, "offset": offset, "count": total};'
+        )
+
+
+class BulkFetcher:
+    """
+    Fetches up to 25 pages of paginated method with one execute request.
+
+    When VK refuses to execute the code (response is too big or it takes too long),
+    the number of pages in one request is halved and then slowly increased again.
+
+    >>> fetcher = BulkFetcher(api, PageSpec("groups.getMembers", page_size=1000))
+    >>> async for members in fetcher.pages(group_id=1):
+    ...     print(len(members))
+    """
+
+    def __init__(
+        self,
+        api: "APIOptionsRequestContext",
+        spec: PageSpec,
+        max_calls: int = MAX_EXECUTE_CALLS,
+    ):
+        self.api = api
+        self.spec = spec
+        self.max_calls = min(max_calls, MAX_EXECUTE_CALLS)
+        self.calls = self.max_calls
+        self.requests = 0
+
+    async def _execute(self, code: str) -> dict:
+        self.requests += 1
+        result = await self.api.execute(code=code, return_raw_response=True)
+        return result["response"]
+
+    async def pages(
+        self, offset: int = 0, max_items: typing.Optional[int] = None, **params: typing.Any
+    ) -> typing.AsyncGenerator[list, None]:
+        """Items of every execute request"""
+        end = offset + max_items if max_items is not None else None
+        while end is None or offset < end:
+            code = self.spec.compile(params, offset, self.calls, end)
+            try:
+                response = await self._execute(code)
+            except APIError as exc:
+                if exc.code != EXECUTE_RUNTIME_ERROR or self.calls == 1:
+                    raise
+                self.calls = max(1, self.calls // 2)
+                continue
+
+            if self.calls < self.max_calls:
+                self.calls += 1
+
+            items = response["items"]
+            if not items:
+                return
+            if end is not None and offset + len(items) > end:
+                items = items[: end - offset]
+            yield items
+
+            offset = response["offset"]
+            total = response["count"]
+            if total is not None and total >= 0:
+                end = total if end is None else min(end, total)
+
+    async def items(
+        self, offset: int = 0, max_items: typing.Optional[int] = None, **params: typing.Any
+    ) -> typing.AsyncGenerator[typing.Any, None]:
+        async for page in self.pages(offset, max_items, **params):
+            for item in page:
+                yield item
@@ -0,0 +1,156 @@
+import asyncio
+import typing
+from collections import deque
+
+from pydantic import BaseModel
+
+from vkwave.api.methods._utils import encode_value
+
+if typing.TYPE_CHECKING:
+    from vkwave.api.methods import APIOptionsRequestContext
+
+
+async def _fetch_page(api: "APIOptionsRequestContext", method: str, params: dict) -> typing.Any:
+    return (await api.api_request(method, params))["response"]
+
+
+def _page_items(response: typing.Any) -> list:
+    if isinstance(response, list):
+        return response
+    return response.get("items") or []
+
+
+def paginate(
+    api: "APIOptionsRequestContext",
+    method: str,
+    *,
+    item_model: typing.Optional[typing.Type[BaseModel]] = None,
+    page_size: int = 100,
+    count_param: str = "count",
+    offset_param: str = "offset",
+    cursor_param: typing.Optional[str] = None,
+    next_cursor_key: str = "next_from",
+    prefetch: int = 2,
+    max_items: typing.Optional[int] = None,
+    **params: typing.Any,
+) -> typing.AsyncIterator[typing.Any]:
+    """
+    Iterate over items of paginated method.
+
+    Pages of offset-based methods are requested `prefetch` at a time,
+    iteration stops when `count` from response is reached or page is empty.
+    Cursor-based methods (`cursor_param="start_from"`) are requested one by one,
+    but next page is requested while current one is being processed.
+
+    >>> async for member in paginate(api, "groups.getMembers", group_id=1, page_size=1000):
+    ...     print(member)
+    >>> async for post in paginate(api, "newsfeed.search", cursor_param="start_from", q="vk"):
+    ...     print(post)
+
+    :param item_model: pydantic model which items are parsed to, dicts are yielded by default
+    :param page_size: value of `count_param`
+    :param prefetch: number of pages which are requested at the same time
+    :param max_items: stop after this number of items
+    :param params: other params of method
+    """
+    base_params = {key: encode_value(value) for key, value in params.items() if value is not None}
+    base_params[count_param] = page_size
+
+    if cursor_param is not None:
+        pages = _cursor_pages(api, method, base_params, cursor_param, next_cursor_key)
+    else:
+        pages = _offset_pages(
+            api, method, base_params, offset_param, page_size, prefetch, max_items
+        )
+    return _items(pages, item_model, max_items)
+
+
+async def _items(
+    pages: typing.AsyncGenerator[list, None],
+    item_model: typing.Optional[typing.Type[BaseModel]],
+    max_items: typing.Optional[int],
+) -> typing.AsyncGenerator[typing.Any, None]:
+    yielded = 0
+    try:
+        async for items in pages:
+            for item in items:
+                if max_items is not None and yielded >= max_items:
+                    return
+                yield item_model.parse_obj(item) if item_model is not None else item
+                yielded += 1
+    finally:
+        await pages.aclose()
+
+
+async def _offset_pages(
+    api: "APIOptionsRequestContext",
+    method: str,
+    base_params: dict,
+    offset_param: str,
+    page_size: int,
+    prefetch: int,
+    max_items: typing.Optional[int],
+) -> typing.AsyncGenerator[list, None]:
+    start = base_params.pop(offset_param, 0)
+    end: typing.Optional[int] = start + max_items if max_items is not None else None
+    next_offset = start
+    pending: typing.Deque[asyncio.Future] = deque()
+
+    def request(offset: int) -> typing.Awaitable[typing.Any]:
+        page_params = dict(base_params)
+        page_params[offset_param] = offset
+        return _fetch_page(api, method, page_params)
+
+    try:
+        response = await request(next_offset)
+        next_offset += page_size
+        if isinstance(response, dict) and "count" in response:
+            total = response["count"]
+            end = total if end is None else min(end, total)
+
+        while True:
+            items = _page_items(response)
+            if not items:
+                return
+            while len(pending) < prefetch and (end is None or next_offset < end):
+                pending.append(asyncio.ensure_future(request(next_offset)))
+                next_offset += page_size
+            yield items
+            if not pending:
+                return
+            response = await pending.popleft()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+async def _cursor_pages(
+    api: "APIOptionsRequestContext",
+    method: str,
+    base_params: dict,
+    cursor_param: str,
+    next_cursor_key: str,
+) -> typing.AsyncGenerator[list, None]:
+    def request(cursor: typing.Optional[str]) -> typing.Awaitable[typing.Any]:
+        page_params = dict(base_params)
+        if cursor:
+            page_params[cursor_param] = cursor
+        return _fetch_page(api, method, page_params)
+
+    next_page: typing.Optional[asyncio.Future] = None
+    try:
+        response = await request(base_params.pop(cursor_param, None))
+        while True:
+            items = _page_items(response)
+            cursor = response.get(next_cursor_key) if isinstance(response, dict) else None
+            if items and cursor:
+                next_page = asyncio.ensure_future(request(cursor))
+            if items:
+                yield items
+            if next_page is None:
+                return
+            response = await next_page
+            next_page = None
+    finally:
+        if next_page is not None:
+            next_page.cancel()
@@ -1,4 +1,6 @@
-from .core.dispatching.dp.dp import Dispatcher
+from .core.dispatching.dp.dp import Dispatcher, event_peer_id
+from .core.dispatching.dp.multiprocess import MultiprocessDispatcher
+from .core.dispatching.dp.runtime import BaseDispatchRuntime, DispatchRuntime, OverflowPolicy
 from .core.dispatching.filters import (
     AttachmentTypeFilter,
     ChatActionFilter,
@@ -28,6 +30,7 @@ from .core.dispatching.events.base import BotEvent, UserEvent, BotType, BaseEven
 from .core.tokens.types import GroupId, UserId
 from .core.dispatching.extensions import (
     BotLongpollExtension,
+    LongpollMultiplexer,
     UserLongpollExtension,
 )
 from .core.dispatching.router.router import DefaultRouter
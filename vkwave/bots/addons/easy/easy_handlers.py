@@ -1,10 +1,10 @@
-import json
 import random
 import warnings
 from typing import Any, Callable, Dict, List, Union, Type, Optional, NoReturn
 
 from pydantic import PrivateAttr
 
+from vkwave.api.methods import APIOptionsRequestContext
 from vkwave.bots import BotEvent, BotType, EventTypeFilter, UserEvent
 from vkwave.bots.core import BaseFilter
 from vkwave.bots.core.dispatching.router.router import BaseRouter
@@ -12,6 +12,8 @@ from vkwave.bots.core.dispatching.filters.builtin import get_payload, get_text
 from vkwave.bots.core.dispatching.handler.callback import BaseCallback
 from vkwave.bots.core.dispatching.handler.cast import caster as callback_caster
 from vkwave.bots.core.types.json_types import JSONEncoder
+from vkwave.http import LANE_DOWNLOAD
+from vkwave.http.codec import dumps, loads
 from vkwave.types.bot_events import BotEventType
 from vkwave.types.objects import (
     BaseBoolInt,
@@ -28,6 +30,14 @@ except ImportError:
     aiofile = None
 
 
+async def _load_user(api_ctx: APIOptionsRequestContext, user_id: int, **kwargs) -> "UsersUser":
+    user = await api_ctx.loaders.users.load(user_id, **kwargs)
+    if user is None:
+        # like `users.get(...)["response"][0]` when user isn't returned
+        raise IndexError(f"users.get didn't return user {user_id}")
+    return user
+
+
 class SimpleUserEvent(UserEvent):
     def __init__(self, event: UserEvent):
         super().__init__(event.object, event.api_ctx)
@@ -58,10 +68,13 @@ class SimpleUserEvent(UserEvent):
     async def get_user(
         self, raw_mode: bool = False, **kwargs
     ) -> Union["UsersUser", dict]:  # getting information about the sender
+        if not raw_mode:
+            # senders of events which come at the same time are got with one request
+            return await _load_user(self.api_ctx, self.user_id, **kwargs)
         raw_user = (
             await self.api_ctx.api_request("users.get", {"user_ids": self.user_id, **kwargs})
         )["response"][0]
-        return raw_user if raw_mode else UsersUser(**raw_user)
+        return raw_user
 
     async def answer(
         self,
@@ -319,7 +332,7 @@ class SimpleAttachment(MessagesMessageAttachment):
 
         url = self.url
         client, token = await self._event.api_ctx.api_options.get_client_and_token()
-        data = await client.http_client.request_data(method="GET", url=url)
+        data = await client.get_http_client(LANE_DOWNLOAD).request_data(method="GET", url=url)
 
         self._data = data
         return data
@@ -405,7 +418,7 @@ class SimpleBotEvent(BotEvent):
             return current_payload
         if self._payload is None:
             self._payload = (
-                json.loads(current_payload)
+                loads(current_payload)
                 if not isinstance(current_payload, dict)
                 else current_payload
             )
@@ -439,10 +452,12 @@ class SimpleBotEvent(BotEvent):
         Returns:
             Union["UsersUser", dict]: Объект пользователя
         """
+        if not raw_mode:
+            return await _load_user(self.api_ctx, self.user_id, **kwargs)
         raw_user = (
             await self.api_ctx.api_request("users.get", {"user_ids": self.user_id, **kwargs})
         )["response"][0]
-        return raw_user if raw_mode else UsersUser(**raw_user)
+        return raw_user
 
     async def edit(
         self,
@@ -517,7 +532,7 @@ class SimpleBotEvent(BotEvent):
         subscribe_id: Optional[int] = None,
         expire_ttl: Optional[int] = None,
         silent: Optional[bool] = None,
-        json_serialize: JSONEncoder = json.dumps,
+        json_serialize: JSONEncoder = dumps,
     ) -> MessagesSendResponse:
         """Шорткат для отправки ответа на сообщение пользователю, от которого пришло событие
 
@@ -1,5 +1,6 @@
 import logging
-from typing import List, NewType, Optional, cast, Union
+import time
+from typing import TYPE_CHECKING, List, NewType, Optional, cast, Union
 
 from vkwave.api.methods import API
 from vkwave.api.token.token import AnyABCToken
@@ -9,6 +10,7 @@ from vkwave.bots.core.dispatching.router.router import HANDLER_NOT_FOUND, BaseRo
 from vkwave.bots.core.tokens.storage import TokenStorage, UserTokenStorage
 from vkwave.bots.core.tokens.types import GroupId
 from vkwave.bots.core.types.bot_type import BotType
+from vkwave.tracing import get_tracer, span
 from vkwave.types.bot_events import get_event_object
 from vkwave.types.user_events import get_event_object as user_get_event_object
 
@@ -16,19 +18,43 @@ from .result_caster import BaseResultCaster, ResultCaster
 from .middleware.middleware import MiddlewareManager
 from .processing_options import ProcessEventOptions
 
+if TYPE_CHECKING:
+    from vkwave.metrics import DispatcherMetrics
+
 
 ProcessingResult = NewType("ProcessingResult", bool)
 
 logger = logging.getLogger(__name__)
 
 
+def _event_type(revent: ExtensionEvent) -> str:
+    if revent.bot_type is BotType.BOT:
+        return str(cast(dict, revent.raw_event).get("type"))
+    return str(cast(list, revent.raw_event)[0])
+
+
+def event_peer_id(revent: ExtensionEvent) -> Optional[int]:
+    if revent.bot_type is BotType.BOT:
+        obj = cast(dict, revent.raw_event).get("object") or {}
+        message = obj.get("message")
+        if isinstance(message, dict):
+            return message.get("peer_id")
+        return obj.get("peer_id")
+    raw_event = cast(list, revent.raw_event)
+    # new and edited messages: [code, message_id, flags, peer_id, ...]
+    if raw_event[0] in (4, 5) and len(raw_event) > 3:
+        return raw_event[3]
+    return None
+
+
 class Dispatcher:
     def __init__(
         self,
         api: API,
         token_storage: Union[TokenStorage, UserTokenStorage],
         bot_type: BotType = BotType.BOT,
-        result_caster: Optional[BaseResultCaster] = None
+        result_caster: Optional[BaseResultCaster] = None,
+        metrics: Optional["DispatcherMetrics"] = None,
     ):
         self.bot_type: BotType = bot_type
         self.api: API = api
@@ -36,12 +62,33 @@ class Dispatcher:
         self.token_storage: Union[TokenStorage, UserTokenStorage] = token_storage
         self.routers: List[BaseRouter] = []
         self.result_caster: BaseResultCaster = result_caster or ResultCaster()
+        self.metrics = metrics
 
     def add_router(self, router: BaseRouter):
         self.routers.append(router)
 
     async def process_event(
         self, revent: ExtensionEvent, options: ProcessEventOptions
+    ) -> ProcessingResult:
+        if self.metrics is None and get_tracer() is None:
+            return await self._process_event(revent, options)
+
+        event_type = _event_type(revent)
+        with span("vkwave.process_event", event_type=event_type, peer_id=event_peer_id(revent)):
+            if self.metrics is None:
+                return await self._process_event(revent, options)
+
+            self.metrics.event_started()
+            started = time.monotonic()
+            handled = False
+            try:
+                handled = await self._process_event(revent, options)
+                return handled
+            finally:
+                self.metrics.event_finished(event_type, handled, time.monotonic() - started)
+
+    async def _process_event(
+        self, revent: ExtensionEvent, options: ProcessEventOptions
     ) -> ProcessingResult:
         event: BaseEvent
 
@@ -55,28 +102,36 @@ class Dispatcher:
 
         if revent.bot_type is BotType.BOT:
             revent.raw_event = cast(dict, revent.raw_event)
-            group_id = revent.raw_event["group_id"]
-            token = await self.token_storage.get_token(GroupId(group_id))
-            event = BotEvent(get_event_object(revent.raw_event), self.api.with_token(token))
+            api_ctx = revent.api
+            if api_ctx is None:
+                group_id = revent.raw_event["group_id"]
+                token = await self.token_storage.get_token(GroupId(group_id))
+                api_ctx = self.api.with_token(token)
+            event = BotEvent(get_event_object(revent.raw_event), api_ctx)
         else:
             revent.raw_event = cast(list, revent.raw_event)
             obj = user_get_event_object(revent.raw_event)
-            event = UserEvent(obj, self.api.with_token(await self.token_storage.get_token()))
+            api_ctx = revent.api
+            if api_ctx is None:
+                api_ctx = self.api.with_token(await self.token_storage.get_token())
+            event = UserEvent(obj, api_ctx)
 
         logger.debug(f"New event! Formatted:\n{event}")
 
         if not await self.middleware_manager.execute_pre_process_event(event):
             return ProcessingResult(False)
         for router in self.routers:
-            if await router.is_suitable(event):
-                result = await router.process_event(event)
-                if result is HANDLER_NOT_FOUND:
+            with span("vkwave.router", router=type(router).__name__):
+                if not await router.is_suitable(event):
                     continue
-                await self.result_caster.cast(result, event)
-                logger.debug("Event was successfully handled")
+                result = await router.process_event(event)
+            if result is HANDLER_NOT_FOUND:
+                continue
+            await self.result_caster.cast(result, event)
+            logger.debug("Event was successfully handled")
 
-                await self.middleware_manager.execute_post_process_event(event)
-                return ProcessingResult(True)
+            await self.middleware_manager.execute_post_process_event(event)
+            return ProcessingResult(True)
         logger.debug("Event wasn't handled")
         await self.middleware_manager.execute_post_process_event(event)
         return ProcessingResult(False)
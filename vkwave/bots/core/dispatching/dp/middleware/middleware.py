@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from typing import List, NewType
 
 from vkwave.bots.core.dispatching.events.base import BaseEvent
+from vkwave.tracing import span
 
 MiddlewareResult = NewType("MiddlewareResult", bool)
 
@@ -24,11 +25,13 @@ class MiddlewareManager:
 
     async def execute_pre_process_event(self, event: BaseEvent) -> MiddlewareResult:
         for middleware in self.middlewares:
-            m_res = await middleware.pre_process_event(event)
+            with span("vkwave.middleware.pre_process", middleware=type(middleware).__name__):
+                m_res = await middleware.pre_process_event(event)
             if not m_res:
                 return MiddlewareResult(False)
         return MiddlewareResult(True)
 
     async def execute_post_process_event(self, event: BaseEvent):
         for middleware in self.middlewares:
-            await middleware.post_process_event(event)
+            with span("vkwave.middleware.post_process", middleware=type(middleware).__name__):
+                await middleware.post_process_event(event)
@@ -0,0 +1,426 @@
+import asyncio
+import bisect
+import itertools
+import logging
+import multiprocessing
+import os
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Connection
+from typing import (
+    TYPE_CHECKING,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+from vkwave.api.token.token import AnyABCToken, BotSyncSingleToken, Token, UserSyncSingleToken
+from vkwave.bots.core.dispatching.events.raw import ExtensionEvent
+from vkwave.bots.core.types.bot_type import BotType
+from vkwave.http.codec import dumps, loads
+
+from .dp import event_peer_id
+from .processing_options import ProcessEventOptions
+from .runtime import BaseDispatchRuntime, DispatchRuntime, EventKey, OverflowPolicy
+
+if TYPE_CHECKING:
+    from vkwave.api.methods import APIOptionsRequestContext
+
+    from .dp import Dispatcher
+
+logger = logging.getLogger(__name__)
+
+DispatcherFactory = Callable[[], Union["Dispatcher", Awaitable["Dispatcher"]]]
+QueueItem = Tuple[ExtensionEvent, ProcessEventOptions]
+
+# empty frame asks worker to finish queued events and exit
+_STOP = b""
+
+# tokens which context of event may have, worker rebuilds context with `API.with_token`
+_TOKEN_TYPES: Dict[str, Type[Union[BotSyncSingleToken, UserSyncSingleToken]]] = {
+    "bot": BotSyncSingleToken,
+    "user": UserSyncSingleToken,
+}
+TokenReference = Tuple[str, str]
+
+
+class HashRing:
+    """
+    Consistent hashing of keys to nodes.
+    Unlike `hash(key) % n` it doesn't depend on PYTHONHASHSEED of process,
+    and changing number of nodes moves only small part of keys.
+    """
+
+    def __init__(self, nodes: Iterable[int], replicas: int = 64):
+        points = sorted(
+            (self._hash(f"{node}:{replica}"), node)
+            for node in nodes
+            for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    @staticmethod
+    def _hash(key: Hashable) -> int:
+        return zlib.crc32(str(key).encode())
+
+    def get(self, key: Hashable) -> int:
+        index = bisect.bisect(self._hashes, self._hash(key))
+        return self._nodes[index % len(self._nodes)]
+
+
+def _token_reference(api: Optional["APIOptionsRequestContext"]) -> Optional[TokenReference]:
+    """Type and value of the only token of event's context, None if event has no context"""
+    if api is None:
+        return None
+    tokens = api.api_options.tokens
+    if len(tokens) == 1:
+        for kind, token_type in _TOKEN_TYPES.items():
+            if type(tokens[0]) is token_type:
+                return kind, tokens[0].get_token()
+    raise ValueError(
+        "Context of event sent to dispatcher process must have one BotSyncSingleToken "
+        f"or UserSyncSingleToken, got {tokens!r}"
+    )
+
+
+def _encode(batch: List[QueueItem]) -> bytes:
+    return dumps(
+        [
+            [
+                revent.bot_type.name,
+                revent.raw_event,
+                options.do_not_handle,
+                _token_reference(revent.api),
+            ]
+            for revent, options in batch
+        ]
+    ).encode()
+
+
+def _worker_main(
+    factory: DispatcherFactory,
+    conn: Connection,
+    workers: int,
+    key: EventKey,
+    heartbeat_interval: float,
+) -> None:
+    asyncio.run(_serve(factory, conn, workers, key, heartbeat_interval))
+
+
+async def _serve(
+    factory: DispatcherFactory,
+    conn: Connection,
+    workers: int,
+    key: EventKey,
+    heartbeat_interval: float,
+) -> None:
+    dp = factory()
+    if asyncio.iscoroutine(dp):
+        dp = await dp
+    runtime = DispatchRuntime(dp, workers=workers, key=key)  # type: ignore
+    loop = asyncio.get_running_loop()
+    # one thread reads events, another one sends heartbeats
+    executor = ThreadPoolExecutor(2)
+
+    async def heartbeat() -> None:
+        while True:
+            stats = {"processed": runtime.processed, "queued": runtime.queued}
+            await loop.run_in_executor(executor, conn.send_bytes, dumps(stats).encode())
+            await asyncio.sleep(heartbeat_interval)
+
+    # the same token object for every event, so `with_token` returns cached context
+    tokens: Dict[TokenReference, AnyABCToken] = {}
+
+    def get_api(reference: Optional[List[str]]) -> Optional["APIOptionsRequestContext"]:
+        if reference is None:
+            return None
+        kind, value = reference
+        token = tokens.get((kind, value))
+        if token is None:
+            token = tokens[(kind, value)] = _TOKEN_TYPES[kind](Token(value))
+        return dp.api.with_token(token)
+
+    heartbeat_task = loop.create_task(heartbeat())
+    try:
+        while True:
+            try:
+                frame = await loop.run_in_executor(executor, conn.recv_bytes)
+            except EOFError:
+                break
+            if frame == _STOP:
+                break
+            for bot_type, raw_event, do_not_handle, token in loads(frame):
+                await runtime.put(
+                    ExtensionEvent(BotType[bot_type], raw_event, get_api(token)),
+                    ProcessEventOptions(do_not_handle=do_not_handle),
+                )
+        await runtime.stop(drain=True)
+    finally:
+        heartbeat_task.cancel()
+        await asyncio.gather(heartbeat_task, return_exceptions=True)
+        conn.close()
+        executor.shutdown(wait=False)
+        # dispatcher was created by this process, so its clients are closed here
+        for client in dp.api.default_api_options.clients:
+            await client.close()
+
+
+class WorkerProcess:
+    """Dispatcher process and the end of its pipe in parent process"""
+
+    def __init__(self, index: int, max_queue: int):
+        self.index = index
+        self.queue: "asyncio.Queue[QueueItem]" = asyncio.Queue(max_queue)
+        self.process: Optional[multiprocessing.process.BaseProcess] = None
+        self.conn: Optional[Connection] = None
+        self.tasks: List["asyncio.Task[None]"] = []
+
+        # events sent to current process and processed by it
+        self.sent = 0
+        self.processed = 0
+        self.lost = 0
+        self.restarts = 0
+        self.last_heartbeat = 0.0
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+
+class MultiprocessDispatcher(BaseDispatchRuntime):
+    """
+    Sends events to worker processes, every process runs its own dispatcher built by `factory`.
+
+    Events are routed by consistent hashing of `key` (peer_id by default),
+    so events of one chat go to the same process and are processed in order.
+    Parent restarts processes which died or stopped sending heartbeats.
+
+    `factory` is called in worker process, so it must be picklable (module-level function).
+
+    Context of event (`ExtensionEvent.api`, set by `LongpollMultiplexer`) can't be sent
+    to other process as it is: its token is sent and worker uses `dp.api.with_token(token)`.
+    So the context must have one `BotSyncSingleToken` or `UserSyncSingleToken`,
+    `put` raises ValueError for other contexts.
+    Options of the context (priority, cache) are not sent, worker uses options of `dp.api`.
+
+    >>> def create_dispatcher() -> Dispatcher:
+    ...     dp = Dispatcher(API(tokens), TokenStorage({GROUP_ID: tokens}))
+    ...     dp.add_router(router)
+    ...     return dp
+    >>> runtime = MultiprocessDispatcher(create_dispatcher, processes=8)
+    >>> await BotLongpollExtension(ingest_dp, lp, runtime=runtime).start()
+    """
+
+    def __init__(
+        self,
+        factory: DispatcherFactory,
+        processes: Optional[int] = None,
+        workers: int = 32,
+        max_queue: int = 1000,
+        overflow: OverflowPolicy = OverflowPolicy.WAIT,
+        key: EventKey = event_peer_id,
+        batch_size: int = 100,
+        heartbeat_interval: float = 1.0,
+        health_timeout: float = 10.0,
+        start_method: str = "spawn",
+    ):
+        """
+        :param factory: function which creates dispatcher of worker process
+        :param processes: number of worker processes, number of CPUs by default
+        :param workers: number of events processed at the same time in every process
+        :param max_queue: number of events waiting for sending to every process
+        :param key: function of event, events with the same key are ordered
+        :param batch_size: max number of events sent to process at once
+        :param health_timeout: process is restarted if it doesn't send heartbeat for this time
+        :param start_method: start method of `multiprocessing`
+        """
+        self.factory = factory
+        self.processes = processes or os.cpu_count() or 1
+        self.workers = workers
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.key = key
+        self.batch_size = batch_size
+        self.heartbeat_interval = heartbeat_interval
+        self.health_timeout = health_timeout
+        self.context = multiprocessing.get_context(start_method)
+
+        self.ring = HashRing(range(self.processes))
+        self.worker_processes: List[WorkerProcess] = []
+        self.rejected = 0
+        self._next_worker = itertools.cycle(range(self.processes))
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._monitor: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def started(self) -> bool:
+        return self._monitor is not None
+
+    @property
+    def queued(self) -> int:
+        return sum(worker.queue.qsize() for worker in self.worker_processes)
+
+    async def start(self) -> None:
+        self._start()
+
+    def _start(self) -> None:
+        if self.started:
+            return
+        # every process needs a thread for sending events and one for reading heartbeats
+        self._executor = ThreadPoolExecutor(self.processes * 2)
+        self.worker_processes = [
+            WorkerProcess(index, self.max_queue) for index in range(self.processes)
+        ]
+        for worker in self.worker_processes:
+            self._spawn(worker)
+        self._monitor = asyncio.get_running_loop().create_task(self._watch())
+
+    async def stop(self, drain: bool = True) -> None:
+        """Stop processes, waiting for queued events to be processed if `drain`"""
+        if self._monitor is None:
+            return
+        self._monitor.cancel()
+        await asyncio.gather(self._monitor, return_exceptions=True)
+        self._monitor = None
+
+        loop = asyncio.get_running_loop()
+        for worker in self.worker_processes:
+            if drain and worker.alive:
+                await worker.queue.join()
+                await loop.run_in_executor(self._executor, self._send_frame, worker, _STOP)
+            await self._shutdown(worker, graceful=drain)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def put(self, revent: ExtensionEvent, options: ProcessEventOptions) -> bool:
+        """
+        Queue event, waiting while queue of its process is full unless overflow policy is DROP.
+        Processes are started on first event.
+        """
+        if self.overflow is OverflowPolicy.DROP:
+            return self.put_nowait(revent, options)
+        _token_reference(revent.api)
+        await self._get_worker(revent).queue.put((revent, options))
+        return True
+
+    def put_nowait(self, revent: ExtensionEvent, options: ProcessEventOptions) -> bool:
+        # context which can't be rebuilt by worker is rejected before it's queued
+        _token_reference(revent.api)
+        try:
+            self._get_worker(revent).queue.put_nowait((revent, options))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        return True
+
+    def _get_worker(self, revent: ExtensionEvent) -> WorkerProcess:
+        self._start()
+        key = self.key(revent)
+        if key is None:
+            return self.worker_processes[next(self._next_worker)]
+        return self.worker_processes[self.ring.get(key)]
+
+    def _spawn(self, worker: WorkerProcess) -> None:
+        parent_conn, child_conn = self.context.Pipe()
+        process = self.context.Process(
+            target=_worker_main,
+            args=(self.factory, child_conn, self.workers, self.key, self.heartbeat_interval),
+            name=f"vkwave-dispatcher-{worker.index}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        worker.process = process
+        worker.conn = parent_conn
+        worker.sent = 0
+        worker.processed = 0
+        worker.last_heartbeat = time.monotonic()
+        loop = asyncio.get_running_loop()
+        worker.tasks = [
+            loop.create_task(self._forward(worker, parent_conn)),
+            loop.create_task(self._receive(worker, parent_conn)),
+        ]
+        logger.info(f"Started dispatcher process {worker.index} (pid {process.pid})")
+
+    async def _shutdown(self, worker: WorkerProcess, graceful: bool) -> None:
+        for task in worker.tasks:
+            task.cancel()
+        await asyncio.gather(*worker.tasks, return_exceptions=True)
+        worker.tasks = []
+
+        process = worker.process
+        if process is not None:
+            loop = asyncio.get_running_loop()
+            if graceful:
+                await loop.run_in_executor(self._executor, process.join, self.health_timeout)
+            if process.is_alive():
+                process.kill()
+            await loop.run_in_executor(self._executor, process.join)
+        if worker.conn is not None:
+            worker.conn.close()
+            worker.conn = None
+
+    async def _restart(self, worker: WorkerProcess) -> None:
+        logger.warning(f"Dispatcher process {worker.index} is unhealthy, restarting it")
+        await self._shutdown(worker, graceful=False)
+        # processed count is known from last heartbeat, so some of these events
+        # could be processed just before process died
+        unprocessed = max(0, worker.sent - worker.processed)
+        if unprocessed:
+            worker.lost += unprocessed
+            logger.error(
+                f"Lost up to {unprocessed} events sent to dispatcher process {worker.index}"
+            )
+        worker.restarts += 1
+        self._spawn(worker)
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            now = time.monotonic()
+            for worker in self.worker_processes:
+                if not worker.alive or now - worker.last_heartbeat > self.health_timeout:
+                    await self._restart(worker)
+
+    def _send_frame(self, worker: WorkerProcess, frame: bytes) -> None:
+        if worker.conn is not None:
+            worker.conn.send_bytes(frame)
+
+    async def _forward(self, worker: WorkerProcess, conn: Connection) -> None:
+        loop = asyncio.get_running_loop()
+        queue = worker.queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await loop.run_in_executor(self._executor, conn.send_bytes, _encode(batch))
+                worker.sent += len(batch)
+            except (OSError, ValueError) as e:
+                # process died, it will be restarted by monitor
+                worker.lost += len(batch)
+                logger.error(f"Lost {len(batch)} events of dispatcher process {worker.index}: {e}")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _receive(self, worker: WorkerProcess, conn: Connection) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                frame = await loop.run_in_executor(self._executor, conn.recv_bytes)
+            except (EOFError, OSError):
+                return
+            stats = loads(frame)
+            worker.processed = stats["processed"]
+            worker.last_heartbeat = time.monotonic()
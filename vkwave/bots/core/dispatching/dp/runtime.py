@@ -0,0 +1,179 @@
+import asyncio
+import itertools
+import logging
+import time
+import traceback
+from abc import ABC, abstractmethod
+from enum import Enum, auto
+from typing import TYPE_CHECKING, Callable, Hashable, List, Optional, Tuple
+
+from vkwave.bots.core.dispatching.events.raw import ExtensionEvent
+
+from .processing_options import ProcessEventOptions
+
+if TYPE_CHECKING:
+    from .dp import Dispatcher
+
+logger = logging.getLogger(__name__)
+
+QueueItem = Tuple[ExtensionEvent, ProcessEventOptions, float]
+EventKey = Callable[[ExtensionEvent], Optional[Hashable]]
+
+
+class OverflowPolicy(Enum):
+    # producer waits for free place: longpoll stops polling, callback asks VK to resend event
+    WAIT = auto()
+    # event is dropped
+    DROP = auto()
+
+
+class BaseDispatchRuntime(ABC):
+    """Place where extensions put events instead of processing them in new task"""
+
+    overflow: OverflowPolicy
+
+    @abstractmethod
+    async def start(self) -> None:
+        ...
+
+    @abstractmethod
+    async def stop(self, drain: bool = True) -> None:
+        ...
+
+    @abstractmethod
+    async def put(self, revent: ExtensionEvent, options: ProcessEventOptions) -> bool:
+        """Queue event, returns False if event was dropped"""
+
+    @abstractmethod
+    def put_nowait(self, revent: ExtensionEvent, options: ProcessEventOptions) -> bool:
+        """Queue event if there is free place, returns False if event wasn't queued"""
+
+
+class DispatchRuntime(BaseDispatchRuntime):
+    """
+    Bounded queue of events processed by fixed number of workers.
+
+    If `key` is set, every worker has its own queue (shard) and events with the same key
+    always go to the same shard, so they are processed one by one in order of arrival,
+    while events with different keys are processed in parallel.
+    Events without key are spread over shards.
+
+    >>> runtime = DispatchRuntime(dp, workers=64, max_queue=5000)
+    >>> ordered = DispatchRuntime(dp, workers=64, max_queue=100, key=event_peer_id)
+    >>> BotLongpollExtension(dp, lp, runtime=runtime)
+    """
+
+    def __init__(
+        self,
+        dp: "Dispatcher",
+        workers: int = 32,
+        max_queue: int = 1000,
+        overflow: OverflowPolicy = OverflowPolicy.WAIT,
+        key: Optional[EventKey] = None,
+    ):
+        """
+        :param workers: number of events processed at the same time
+        :param max_queue: number of events waiting for worker (in every shard if key is set)
+        :param overflow: what to do with new event when queue is full
+        :param key: function of event (`event_peer_id`), events with the same key are ordered
+        """
+        self.dp = dp
+        self.workers = workers
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.key = key
+
+        self.busy = 0
+        self.processed = 0
+        self.rejected = 0
+        self.waited = 0
+        self.wait_time = 0.0
+
+        self._queues: List["asyncio.Queue[QueueItem]"] = []
+        self._workers: List["asyncio.Task[None]"] = []
+        self._next_shard = itertools.cycle(range(workers))
+
+    @property
+    def queued(self) -> int:
+        return sum(queue.qsize() for queue in self._queues)
+
+    @property
+    def utilization(self) -> float:
+        """Part of workers which are processing events"""
+        return self.busy / self.workers
+
+    @property
+    def started(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self) -> None:
+        self._start()
+
+    def _start(self) -> None:
+        if not self._queues:
+            shards = self.workers if self.key is not None else 1
+            self._queues = [asyncio.Queue(self.max_queue) for _ in range(shards)]
+        if not self._workers:
+            loop = asyncio.get_running_loop()
+            queues = self._queues
+            self._workers = [
+                loop.create_task(self._work(queues[number % len(queues)]))
+                for number in range(self.workers)
+            ]
+
+    def _get_queue(self, revent: ExtensionEvent) -> "asyncio.Queue[QueueItem]":
+        self._start()
+        if self.key is None:
+            return self._queues[0]
+        key = self.key(revent)
+        if key is None:
+            return self._queues[next(self._next_shard)]
+        return self._queues[hash(key) % len(self._queues)]
+
+    async def stop(self, drain: bool = True) -> None:
+        """Stop workers, waiting for queued events to be processed if `drain`"""
+        if drain:
+            await self.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def join(self) -> None:
+        """Wait until all queued events are processed"""
+        for queue in self._queues:
+            await queue.join()
+
+    async def put(self, revent: ExtensionEvent, options: ProcessEventOptions) -> bool:
+        """
+        Queue event, waiting while queue is full unless overflow policy is DROP.
+        Workers are started on first event.
+        """
+        if self.overflow is OverflowPolicy.DROP:
+            return self.put_nowait(revent, options)
+        await self._get_queue(revent).put((revent, options, time.monotonic()))
+        return True
+
+    def put_nowait(self, revent: ExtensionEvent, options: ProcessEventOptions) -> bool:
+        """Queue event if there is free place. Returns False if event wasn't queued"""
+        try:
+            self._get_queue(revent).put_nowait((revent, options, time.monotonic()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        return True
+
+    async def _work(self, queue: "asyncio.Queue[QueueItem]") -> None:
+        while True:
+            revent, options, enqueued_at = await queue.get()
+            self.waited += 1
+            self.wait_time += time.monotonic() - enqueued_at
+            self.busy += 1
+            try:
+                await self.dp.process_event(revent, options)
+            except Exception as e:
+                logger.error(f"Error in processing of event ({e}): {traceback.format_exc()}")
+            finally:
+                self.busy -= 1
+                self.processed += 1
+                queue.task_done()
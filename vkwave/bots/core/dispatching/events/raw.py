@@ -2,11 +2,24 @@ import typing
 
 from vkwave.bots.core.types.bot_type import BotType
 
+if typing.TYPE_CHECKING:
+    from vkwave.api.methods import APIOptionsRequestContext
+
 
 class ExtensionEvent:
-    def __init__(self, bot_type: BotType, raw_event: typing.Union[list, dict]):
+    def __init__(
+        self,
+        bot_type: BotType,
+        raw_event: typing.Union[list, dict],
+        api: typing.Optional["APIOptionsRequestContext"] = None,
+    ):
+        """
+        :param api: context of account which received event,
+         dispatcher takes token from its token storage if it isn't passed
+        """
         self.bot_type = bot_type
         self.raw_event = raw_event
+        self.api = api
 
     def __repr__(self) -> str:
         return f"ExtensionEvent(bot_type={self.bot_type}, raw_event={self.raw_event})"
@@ -1,2 +1,3 @@
 from .longpoll_user import UserLongpoll, UserLongpollExtension
 from .longpoll_bot import BotLongpoll, BotLongpollExtension
+from .longpoll_multiplexer import LongpollMultiplexer, LongpollSource
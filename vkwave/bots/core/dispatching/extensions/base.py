@@ -1,3 +1,4 @@
+import asyncio
 import typing
 from abc import ABC, abstractmethod
 
@@ -7,7 +8,17 @@ if typing.TYPE_CHECKING:
 
 class BaseExtension(ABC):
     dp: "Dispatcher"
+    _tasks: typing.Optional[typing.Set["asyncio.Task"]] = None
 
     @abstractmethod
     async def start(self, *args, **kwargs):
         ...
+
+    def _create_task(self, coro: typing.Awaitable) -> "asyncio.Task":
+        """Run coroutine in background, keeping reference to task until it's done"""
+        if self._tasks is None:
+            self._tasks = set()
+        task = asyncio.get_running_loop().create_task(coro)  # type: ignore
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
@@ -1,13 +1,16 @@
-from asyncio import get_running_loop
-from typing import TYPE_CHECKING, Optional
+from asyncio import Task, get_running_loop
+from typing import TYPE_CHECKING, Any, Optional, Set
 
 from aiohttp import web
 
 from vkwave.bots.core.dispatching.dp.processing_options import ProcessEventOptions
+from vkwave.bots.core.dispatching.dp.runtime import BaseDispatchRuntime, OverflowPolicy
 from vkwave.bots.core.dispatching.events.raw import ExtensionEvent
 from vkwave.bots.core.dispatching.extensions.base import BaseExtension
 from vkwave.bots.core.tokens.types import GroupId
 from vkwave.bots.core.types.bot_type import BotType
+from vkwave.http.codec import loads
+from vkwave.metrics import MetricsRegistry, setup_metrics
 
 from .conf import ConfirmationStorage
 
@@ -15,12 +18,26 @@ if TYPE_CHECKING:
     from vkwave.bots.core.dispatching.dp.dp import Dispatcher
 
 
+def _app_key(name: str) -> Any:
+    # aiohttp < 3.9 has only string keys, newer versions warn about them
+    app_key = getattr(web, "AppKey", None)
+    return name if app_key is None else app_key(name)
+
+
+SECRET_KEY: "web.AppKey[Optional[str]]" = _app_key("secret")
+SUPPORT_SECRET_KEY: "web.AppKey[bool]" = _app_key("support_secret")
+STORAGE_KEY: "web.AppKey[ConfirmationStorage]" = _app_key("storage")
+DP_KEY: "web.AppKey[Dispatcher]" = _app_key("dp")
+RUNTIME_KEY: "web.AppKey[Optional[BaseDispatchRuntime]]" = _app_key("runtime")
+TASKS_KEY: "web.AppKey[Set[Task]]" = _app_key("tasks")
+
+
 class CallbackView(web.View):
     async def get(self):
         raise web.HTTPForbidden()
 
     async def post(self):
-        event: dict = await self.request.json()
+        event: dict = loads(await self.request.read())
         e_type = event.get("type")
         if not e_type:
             raise web.HTTPForbidden()
@@ -28,17 +45,28 @@ class CallbackView(web.View):
 
         if e_type == "confirmation":
             return web.Response(
-                body=await self.request.app["storage"].get_confirmation(GroupId(group_id))
+                body=await self.request.app[STORAGE_KEY].get_confirmation(GroupId(group_id))
             )
 
-        if self.request.app["support_secret"]:
-            if not event["secret"] == self.request.app["secret"]:
+        if self.request.app[SUPPORT_SECRET_KEY]:
+            if not event["secret"] == self.request.app[SECRET_KEY]:
                 raise web.HTTPForbidden()
 
         options = ProcessEventOptions(do_not_handle=False)
         revent = ExtensionEvent(BotType.BOT, event)
 
-        get_running_loop().create_task(self.request.app["dp"].process_event(revent, options))
+        runtime: Optional[BaseDispatchRuntime] = self.request.app[RUNTIME_KEY]
+        if runtime is None:
+            task = get_running_loop().create_task(
+                self.request.app[DP_KEY].process_event(revent, options)
+            )
+            # keep reference to task until it's done
+            tasks: Set[Task] = self.request.app[TASKS_KEY]
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        elif not runtime.put_nowait(revent, options) and runtime.overflow is OverflowPolicy.WAIT:
+            # VK will send event again later
+            raise web.HTTPServiceUnavailable()
 
         return web.Response(body="ok")
 
@@ -52,7 +80,16 @@ class AIOHTTPCallbackExtension(BaseExtension):
         port: int,
         secret: Optional[str] = None,
         confirmation_storage: Optional[ConfirmationStorage] = None,
+        metrics_registry: Optional[MetricsRegistry] = None,
+        metrics_path: str = "/metrics",
+        runtime: Optional[BaseDispatchRuntime] = None,
     ):
+        """
+        :param metrics_registry: metrics are exported on `metrics_path` if it is set
+        :param runtime: queue of events with limited number of workers.
+         When its queue is full, events are dropped or VK is asked to resend them later
+         (depending on runtime's overflow policy)
+        """
         self.confirmation_storage = confirmation_storage or ConfirmationStorage()
         self.secret = secret  # maybe we need secret storage too?
         self.dp = dp
@@ -60,19 +97,29 @@ class AIOHTTPCallbackExtension(BaseExtension):
         self.path = path
         self.host = host
         self.port = port
+        self.metrics_registry = metrics_registry
+        self.metrics_path = metrics_path
+        self.runtime = runtime
 
     def add_confirmation(self, group_id: GroupId, confirmation: str):
         self.confirmation_storage.add_confirmation(group_id, confirmation)
 
-    async def _start(self):
+    def create_app(self) -> web.Application:
         app = web.Application()
-        app["secret"] = self.secret
-        app["support_secret"] = bool(self.secret)
-        app["storage"] = self.confirmation_storage
-        app["dp"] = self.dp
+        app[SECRET_KEY] = self.secret
+        app[SUPPORT_SECRET_KEY] = bool(self.secret)
+        app[STORAGE_KEY] = self.confirmation_storage
+        app[DP_KEY] = self.dp
+        app[RUNTIME_KEY] = self.runtime
+        app[TASKS_KEY] = set()
 
         app.router.add_view(self.path, CallbackView)
+        if self.metrics_registry is not None:
+            setup_metrics(app, self.metrics_registry, self.metrics_path)
+        return app
 
+    async def _start(self):
+        app = self.create_app()
         runner = web.AppRunner(app)
         await runner.setup()
 
@@ -80,4 +127,4 @@ class AIOHTTPCallbackExtension(BaseExtension):
         await site.start()
 
     async def start(self):
-        get_running_loop().create_task(self._start())
+        self._create_task(self._start())
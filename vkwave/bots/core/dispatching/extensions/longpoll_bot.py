@@ -1,13 +1,14 @@
-from asyncio import get_running_loop, sleep
-from typing import TYPE_CHECKING
+from asyncio import sleep
+from typing import TYPE_CHECKING, Optional
 import warnings
 import logging
 import traceback
 
 from vkwave.bots.core.dispatching.dp.processing_options import ProcessEventOptions
+from vkwave.bots.core.dispatching.dp.runtime import BaseDispatchRuntime
 from vkwave.bots.core.dispatching.events.raw import ExtensionEvent
 from vkwave.bots.core.types.bot_type import BotType
-from vkwave.longpoll.bot import BotLongpoll
+from vkwave.longpoll.bot import BotLongpoll, Update
 
 from .base import BaseExtension
 
@@ -18,9 +19,23 @@ logger = logging.getLogger(__name__)
 
 
 class BotLongpollExtension(BaseExtension):
-    def __init__(self, dp: "Dispatcher", lp: BotLongpoll):
+    def __init__(
+        self, dp: "Dispatcher", lp: BotLongpoll, runtime: Optional[BaseDispatchRuntime] = None
+    ):
+        """
+        :param runtime: queue of events with limited number of workers,
+         polling is paused while its queue is full
+        """
         self.dp = dp
         self.lp = lp
+        self.runtime = runtime
+
+    async def _dispatch(self, event: Update, options: ProcessEventOptions) -> None:
+        revent = ExtensionEvent(BotType.BOT, event)
+        if self.runtime is not None:
+            await self.runtime.put(revent, options)
+        else:
+            self._create_task(self.dp.process_event(revent, options))
 
     async def _start(self, ignore_errors: bool = True):
         options = ProcessEventOptions(do_not_handle=False)
@@ -37,17 +52,13 @@ class BotLongpollExtension(BaseExtension):
             while True:
                 events = await self.lp.get_updates()
                 for event in events:
-                    get_running_loop().create_task(
-                        self.dp.process_event(ExtensionEvent(BotType.BOT, event), options)
-                    )
+                    await self._dispatch(event, options)
         else:
             while True:
                 try:
                     events = await self.lp.get_updates()
                     for event in events:
-                        get_running_loop().create_task(
-                            self.dp.process_event(ExtensionEvent(BotType.BOT, event), options)
-                        )
+                        await self._dispatch(event, options)
                 except Exception as e:
                     logger.error(f"Error in Longpoll ({e}): {traceback.format_exc()}")
                     await sleep(0.33)
@@ -55,4 +66,4 @@ class BotLongpollExtension(BaseExtension):
 
     async def start(self, ignore_errors: bool = True):
         logger.info("Starting bot...")
-        get_running_loop().create_task(self._start(ignore_errors))
+        self._create_task(self._start(ignore_errors))
@@ -0,0 +1,240 @@
+import asyncio
+import logging
+import random
+import time
+import traceback
+from typing import TYPE_CHECKING, Dict, Hashable, List, Optional, Union, cast
+
+from aiohttp import ClientSession, TCPConnector
+
+from vkwave.api.methods import APIOptionsRequestContext
+from vkwave.bots.core.dispatching.dp.processing_options import ProcessEventOptions
+from vkwave.bots.core.dispatching.dp.runtime import BaseDispatchRuntime
+from vkwave.bots.core.dispatching.events.raw import ExtensionEvent
+from vkwave.bots.core.tokens.types import GroupId
+from vkwave.bots.core.types.bot_type import BotType
+from vkwave.http import AIOHTTPClient, AbstractHTTPClient
+from vkwave.http.codec import dumps
+from vkwave.longpoll.bot import BotLongpollData
+from vkwave.longpoll.user import UserLongpollData
+
+from .base import BaseExtension
+
+if TYPE_CHECKING:
+    from ..dp.dp import Dispatcher
+
+logger = logging.getLogger(__name__)
+
+LongpollData = Union[BotLongpollData, UserLongpollData]
+
+
+class LongpollSource:
+    """One longpoll server (group or user) which is polled by multiplexer"""
+
+    def __init__(
+        self,
+        key: Hashable,
+        data: LongpollData,
+        bot_type: BotType,
+        api: Optional[APIOptionsRequestContext] = None,
+    ):
+        self.key = key
+        self.data = data
+        self.bot_type = bot_type
+        self.api = api
+        self.task: Optional["asyncio.Task[None]"] = None
+        self.refresh_lock: Optional[asyncio.Lock] = None
+
+        self.polls = 0
+        self.events = 0
+        self.errors = 0
+        self.refreshes = 0
+        self.last_response: Optional[float] = None
+
+    @property
+    def lag(self) -> float:
+        """Seconds since last response of longpoll server"""
+        if self.last_response is None:
+            return 0.0
+        return time.monotonic() - self.last_response
+
+
+class LongpollMultiplexer(BaseExtension):
+    """
+    Polls longpoll servers of many groups and users over one HTTP client
+    and feeds their events to one dispatcher.
+
+    Servers are refreshed (at start and on `failed` 2/3) one by one
+    with `refresh_interval` between refreshes, so hundreds of sources don't
+    call `getLongPollServer` at the same moment.
+
+    >>> multiplexer = LongpollMultiplexer(dp)
+    >>> for group_id in group_ids:
+    ...     multiplexer.add_group(group_id)
+    >>> await multiplexer.start()
+    >>> await multiplexer.remove(group_ids[0])
+    """
+
+    def __init__(
+        self,
+        dp: "Dispatcher",
+        http_client: Optional[AbstractHTTPClient] = None,
+        wait: int = 25,
+        refresh_interval: float = 0.05,
+        error_delay: float = 0.33,
+        runtime: Optional[BaseDispatchRuntime] = None,
+    ):
+        """
+        :param http_client: client of longpoll requests, its connection limit must be
+         big enough for all sources. By default multiplexer opens its own session on start
+         which has a connection for every source and doesn't share connections with API
+        :param refresh_interval: min time between refreshes of servers
+        :param error_delay: pause of source after error (with random jitter)
+        :param runtime: queue of events with limited number of workers,
+         sources are paused while its queue is full
+        """
+        self.dp = dp
+        self.client: Optional[AbstractHTTPClient] = http_client
+        self._own_client = http_client is None
+        self.wait = wait
+        self.refresh_interval = refresh_interval
+        self.error_delay = error_delay
+        self.runtime = runtime
+
+        self.sources: Dict[Hashable, LongpollSource] = {}
+        self._running = False
+        self._last_refresh = 0.0
+        self._options = ProcessEventOptions(do_not_handle=False)
+
+    def add_group(
+        self,
+        group_id: int,
+        api: Optional[APIOptionsRequestContext] = None,
+        wait: Optional[int] = None,
+    ) -> LongpollSource:
+        """
+        Poll events of group. Token of group is taken from dispatcher's token storage
+        if api isn't passed.
+        """
+        data = BotLongpollData(group_id, wait or self.wait)
+        return self.add_source(LongpollSource(group_id, data, BotType.BOT, api))
+
+    def add_user(
+        self, key: Hashable, api: APIOptionsRequestContext, wait: Optional[int] = None
+    ) -> LongpollSource:
+        """Poll events of user whose token is used by api"""
+        data = UserLongpollData(wait or self.wait)
+        return self.add_source(LongpollSource(key, data, BotType.USER, api))
+
+    def add_source(self, source: LongpollSource) -> LongpollSource:
+        if source.key in self.sources:
+            raise ValueError(f"Source {source.key!r} is already added")
+        self.sources[source.key] = source
+        if self._running:
+            self._start_source(source)
+        return source
+
+    async def remove(self, key: Hashable) -> None:
+        source = self.sources.pop(key)
+        if source.task is not None:
+            source.task.cancel()
+            await asyncio.gather(source.task, return_exceptions=True)
+            source.task = None
+
+    async def start(self) -> None:
+        logger.info(f"Starting longpoll of {len(self.sources)} sources...")
+        if self.client is None:
+            self.client = self._create_client()
+        self._running = True
+        for source in self.sources.values():
+            self._start_source(source)
+
+    async def stop(self) -> None:
+        self._running = False
+        tasks = [source.task for source in self.sources.values() if source.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for source in self.sources.values():
+            source.task = None
+        if self._own_client and self.client is not None:
+            await self.client.close()
+            self.client = None
+
+    @staticmethod
+    def _create_client() -> AbstractHTTPClient:
+        # every source has at most one request in flight, so connector without limit
+        # opens one connection per source and nobody waits for a free one
+        session = ClientSession(connector=TCPConnector(limit=0, ssl=False), json_serialize=dumps)
+        return AIOHTTPClient(session=session)
+
+    def _start_source(self, source: LongpollSource) -> None:
+        if source.refresh_lock is None:
+            source.refresh_lock = asyncio.Lock()
+        source.task = asyncio.get_running_loop().create_task(self._poll(source))
+
+    async def _get_api(self, source: LongpollSource) -> APIOptionsRequestContext:
+        if source.api is None:
+            token = await self.dp.token_storage.get_token(
+                GroupId(source.key)  # type: ignore
+            )
+            source.api = self.dp.api.with_token(token)
+        return source.api
+
+    async def _refresh(self, source: LongpollSource) -> None:
+        api = await self._get_api(source)
+        async with source.refresh_lock:  # type: ignore
+            # reserve start time of refresh, so refreshes are staggered
+            # without waiting for `getLongPollServer` of other sources
+            now = time.monotonic()
+            start = max(now, self._last_refresh + self.refresh_interval)
+            self._last_refresh = start
+            if start > now:
+                await asyncio.sleep(start - now)
+            await source.data.update_data(api)
+        source.refreshes += 1
+
+    async def _get_updates(self, source: LongpollSource) -> List:
+        data = source.data
+        if not data.loaded:
+            await self._refresh(source)
+
+        client = cast(AbstractHTTPClient, self.client)
+        response = await client.request_json("POST", data.get_url())
+        source.polls += 1
+        source.last_response = time.monotonic()
+
+        failed = response.get("failed")
+        if failed is None:
+            data.ts = response["ts"]
+            return response["updates"]
+        if failed == 1:
+            data.ts = response["ts"]
+        elif failed in (2, 3):
+            await self._refresh(source)
+        return []
+
+    async def _poll(self, source: LongpollSource) -> None:
+        while True:
+            try:
+                updates = await self._get_updates(source)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                source.errors += 1
+                logger.error(
+                    f"Error in longpoll of {source.key!r} ({e}): {traceback.format_exc()}"
+                )
+                await asyncio.sleep(self.error_delay * (1 + random.random()))
+                continue
+
+            source.events += len(updates)
+            for update in updates:
+                # handlers answer from account of source, not from token storage
+                await self._dispatch(ExtensionEvent(source.bot_type, update, source.api))
+
+    async def _dispatch(self, event: ExtensionEvent) -> None:
+        if self.runtime is not None:
+            await self.runtime.put(event, self._options)
+            return
+        self._create_task(self.dp.process_event(event, self._options))
@@ -1,12 +1,12 @@
 import logging
 import traceback
-from asyncio import get_running_loop
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from vkwave.bots.core.dispatching.dp.processing_options import ProcessEventOptions
+from vkwave.bots.core.dispatching.dp.runtime import BaseDispatchRuntime
 from vkwave.bots.core.dispatching.events.raw import ExtensionEvent
 from vkwave.bots.core.types.bot_type import BotType
-from vkwave.longpoll.user import UserLongpoll
+from vkwave.longpoll.user import UserLongpoll, Update
 
 from .base import BaseExtension
 
@@ -18,9 +18,23 @@ logger = logging.getLogger(__name__)
 
 
 class UserLongpollExtension(BaseExtension):
-    def __init__(self, dp: "Dispatcher", lp: UserLongpoll):
+    def __init__(
+        self, dp: "Dispatcher", lp: UserLongpoll, runtime: Optional[BaseDispatchRuntime] = None
+    ):
+        """
+        :param runtime: queue of events with limited number of workers,
+         polling is paused while its queue is full
+        """
         self.dp = dp
         self.lp = lp
+        self.runtime = runtime
+
+    async def _dispatch(self, event: Update, options: ProcessEventOptions) -> None:
+        revent = ExtensionEvent(BotType.USER, event)
+        if self.runtime is not None:
+            await self.runtime.put(revent, options)
+        else:
+            self._create_task(self.dp.process_event(revent, options))
 
     async def _start(self, ignore_errors: bool = True):
         options = ProcessEventOptions(do_not_handle=False)
@@ -28,20 +42,16 @@ class UserLongpollExtension(BaseExtension):
             while True:
                 events = await self.lp.get_updates()
                 for event in events:
-                    get_running_loop().create_task(
-                        self.dp.process_event(ExtensionEvent(BotType.USER, event), options)
-                    )
+                    await self._dispatch(event, options)
         else:
             while True:
                 try:
                     events = await self.lp.get_updates()
                     for event in events:
-                        get_running_loop().create_task(
-                            self.dp.process_event(ExtensionEvent(BotType.USER, event), options)
-                        )
+                        await self._dispatch(event, options)
                 except Exception as e:
                     logger.error(f"Error in Longpoll ({e}): {traceback.format_exc()}")
                     continue
 
     async def start(self, ignore_errors: bool = True):
-        get_running_loop().create_task(self._start(ignore_errors))
+        self._create_task(self._start(ignore_errors))
@@ -1,4 +1,3 @@
-import json
 import logging
 import re
 import typing
@@ -9,6 +8,7 @@ from typing_extensions import Literal
 from vkwave.bots.core.dispatching.events.base import BaseEvent, UserEvent, BotEvent
 from vkwave.bots.core.types.bot_type import BotType
 from vkwave.bots.core.types.json_types import JSONDecoder
+from vkwave.http.codec import loads
 from vkwave.types.bot_events import BotEventType
 from vkwave.types.objects import MessagesMessageActionStatus, MessagesMessageAttachmentType
 from vkwave.types.user_events import EventId, MessageFlag
@@ -183,7 +183,7 @@ class PayloadFilter(BaseFilter):
     """Filter for message payload"""
 
     def __init__(
-        self, payload: Optional[Dict[str, str]] = None, json_loader: JSONDecoder = json.loads
+        self, payload: Optional[Dict[str, str]] = None, json_loader: JSONDecoder = loads
     ):
         self.json_loader = json_loader
         self.payload = payload
@@ -458,7 +458,7 @@ class PayloadContainsFilter(BaseFilter):
     Checking payload dict contains some key
     """
 
-    def __init__(self, key: str, json_loader: JSONDecoder = json.loads):
+    def __init__(self, key: str, json_loader: JSONDecoder = loads):
         self.key = key
         self.json_loader = json_loader
 
@@ -1,6 +1,7 @@
 from typing import List
 
 from vkwave.bots.core.dispatching.events.base import BaseEvent
+from vkwave.tracing import get_tracer, span
 
 from .base import BaseFilter
 
@@ -14,9 +15,20 @@ class FilterManager:
 
     async def execute_filters(self, event: BaseEvent) -> bool:
         """Return true if all filters succeed."""
+        if get_tracer() is not None:
+            return await self._execute_filters_traced(event)
         result: bool = True
         for filter in self.filters:
             f_result = await filter.check(event)
             if not f_result:
                 return False
         return result
+
+    async def _execute_filters_traced(self, event: BaseEvent) -> bool:
+        for filter in self.filters:
+            with span("vkwave.filter", filter=type(filter).__name__) as current:
+                f_result = await filter.check(event)
+                current.set_attribute("passed", bool(f_result))
+            if not f_result:
+                return False
+        return True
@@ -4,6 +4,7 @@ from typing import Any, List, Optional
 from vkwave.bots.core.dispatching.events.base import BaseEvent
 from vkwave.bots.core.dispatching.filters.base import BaseFilter
 from vkwave.bots.core.dispatching.filters.manage import FilterManager
+from vkwave.tracing import span
 
 from .callback import BaseCallback
 
@@ -37,5 +38,7 @@ class DefaultHandler(BaseHandler):
         f_result = await self.filter_manager.execute_filters(event)
         if not f_result:
             return FILTERS_NOT_PASSED
-        c_result = await self.callback.execute(event)
+        callback = getattr(self.callback, "func", self.callback)
+        with span("vkwave.handler", callback=getattr(callback, "__qualname__", None)):
+            c_result = await self.callback.execute(event)
         return c_result
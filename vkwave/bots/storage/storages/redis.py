@@ -10,6 +10,7 @@ except ImportError:
 
 from vkwave.bots.storage.base import NO_KEY, AbstractExpiredStorage, NoKeyOrValue
 from vkwave.bots.storage.types import TTL, Dumper, Key, Loader, Value
+from vkwave.tracing import traced
 
 
 class RedisStorage(AbstractExpiredStorage):
@@ -49,6 +50,7 @@ class RedisStorage(AbstractExpiredStorage):
         self._redis: typing.Optional["aioredis.Redis"] = None
         self._connection_lock = asyncio.Lock(loop=self._loop)
 
+    @traced("vkwave.storage.get", backend="redis")
     async def get(
         self, key: Key, default: NoKeyOrValue = NO_KEY
     ) -> typing.Union[typing.NoReturn, Value]:
@@ -62,6 +64,7 @@ class RedisStorage(AbstractExpiredStorage):
 
         return default
 
+    @traced("vkwave.storage.put", backend="redis")
     async def put(self, key: Key, value: Value, ttl: typing.Optional[TTL] = None) -> None:
         redis = await self.redis()
 
@@ -75,6 +78,7 @@ class RedisStorage(AbstractExpiredStorage):
         await redis.set(key, self._dumper(value), pexpire=pexpire)
         return None
 
+    @traced("vkwave.storage.delete", backend="redis")
     async def delete(self, key: Key) -> typing.Optional[typing.NoReturn]:
         if not await self.contains(key):
             raise KeyError("Storage doesn't contain this key.")
@@ -84,6 +88,7 @@ class RedisStorage(AbstractExpiredStorage):
         await redis.delete(key)
         return None
 
+    @traced("vkwave.storage.contains", backend="redis")
     async def contains(self, key: Key) -> bool:
         redis = await self.redis()
 
@@ -4,6 +4,7 @@ from typing import Optional
 from vkwave.api.methods import APIOptionsRequestContext
 from vkwave.bots.storage.base import NO_KEY, AbstractStorage, NoKeyOrValue
 from vkwave.bots.storage.types import Dumper, Key, Loader, Value
+from vkwave.tracing import traced
 
 
 class VKStorage(AbstractStorage):
@@ -21,9 +22,11 @@ class VKStorage(AbstractStorage):
         self._dumper = dumper
         self._user_id = user_id
 
+    @traced("vkwave.storage.put", backend="vk")
     async def put(self, key: Key, value: Value) -> None:
         await self._put(key, value)
 
+    @traced("vkwave.storage.get", backend="vk")
     async def get(self, key: Key, default: NoKeyOrValue = NO_KEY) -> Value:
         v = await self._get(key)
         if v:
@@ -33,11 +36,13 @@ class VKStorage(AbstractStorage):
 
         return default
 
+    @traced("vkwave.storage.delete", backend="vk")
     async def delete(self, key: Key) -> None:
         if not await self.contains(key):
             raise KeyError("Storage doesn't contain this key.")
         await self._put(key)
 
+    @traced("vkwave.storage.contains", backend="vk")
     async def contains(self, key: Key) -> bool:
         return await self._get(key) == 'null'
 
@@ -3,7 +3,7 @@ from typing import Union, Dict, Optional
 from vkwave.bots.utils.auth.types import OAuthResponse
 from vkwave.bots.utils.auth.errors import AuthError
 from vkwave.bots.utils.auth import BaseTwoAuth
-from vkwave.http import AIOHTTPClient
+from vkwave.http import AIOHTTPClient, SessionPool
 
 
 class TwoAuth(BaseTwoAuth):
@@ -23,8 +23,9 @@ class Auth:
         client_id: int,
         client_hash: str, client: Optional[AIOHTTPClient] = None,
         two_auth: Optional[BaseTwoAuth] = None,
+        pool: Optional[SessionPool] = None,
     ):
-        self.client = client or AIOHTTPClient()
+        self.client = client or AIOHTTPClient(pool=pool)
         self.two_auth = two_auth or TwoAuth()
         self.client_id = client_id
         self.client_hash = client_hash
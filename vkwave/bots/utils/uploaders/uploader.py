@@ -1,4 +1,3 @@
-import json
 import typing
 from abc import ABC, abstractmethod
 from io import BytesIO
@@ -6,7 +5,8 @@ from typing import BinaryIO, Generic, List, TypeVar
 
 from vkwave.api.methods import APIOptionsRequestContext
 from vkwave.bots.core.types.json_types import JSONDecoder
-from vkwave.http import AbstractHTTPClient
+from vkwave.http import LANE_UPLOAD, AbstractHTTPClient
+from vkwave.http.codec import loads
 
 UploadResult = TypeVar("UploadResult")
 
@@ -20,11 +20,11 @@ class BaseUploader(ABC, Generic[UploadResult]):
         self,
         api_context: APIOptionsRequestContext,
         client: typing.Optional[AbstractHTTPClient] = None,
-        json_deserialize: JSONDecoder = json.loads,
+        json_deserialize: JSONDecoder = loads,
     ):
         self.api_context = api_context
         self.client: AbstractHTTPClient = (
-            client or api_context.api_options.get_client().http_client
+            client or api_context.api_options.get_client().get_http_client(LANE_UPLOAD)
         )
         self.json_deserialize = json_deserialize
 
@@ -1 +1,2 @@
+from .cassette import CassetteAPIClient, CassetteMissError, CassetteMode  # noqa: F401
 from .default import AIOHTTPClient
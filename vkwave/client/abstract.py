@@ -12,6 +12,10 @@ class AbstractAPIClient(ABC):
     def http_client(self) -> AbstractHTTPClient:
         raise NotImplementedError("This client probably doesn't implement 'http_client' property.")
 
+    def get_http_client(self, lane: str) -> AbstractHTTPClient:
+        """HTTP client for requests of lane (longpoll, uploads...)"""
+        return self.http_client
+
     @abstractmethod
     def set_context_factory(self, factory: AbstractFactory) -> None:
         ...
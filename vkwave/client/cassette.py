@@ -0,0 +1,218 @@
+"""
+Client which records responses of real API and replays them offline.
+"""
+import asyncio
+import gzip
+import itertools
+import random
+import typing
+from enum import Enum
+from logging import getLogger
+
+from aiohttp import ClientConnectionError
+
+from vkwave.http.codec import dumps, loads
+
+from .abstract import AbstractAPIClient
+from .context import RequestContext, ResultState
+from .factory import AbstractFactory, DefaultFactory
+from .types import MethodName
+
+logger = getLogger(__name__)
+
+# params which don't change response and must not be written to disk
+NOT_RECORDED_PARAMS = frozenset(("access_token", "v"))
+
+Latency = typing.Union[None, float, str, typing.Callable[[random.Random], float]]
+
+
+class CassetteMode(Enum):
+    RECORD = "record"
+    REPLAY = "replay"
+
+
+class CassetteMissError(KeyError):
+    """There is no recorded response for request"""
+
+
+def _request_key(method_name: str, params: dict) -> str:
+    return dumps(
+        [
+            method_name,
+            sorted(
+                (key, str(value))
+                for key, value in params.items()
+                if key not in NOT_RECORDED_PARAMS and value is not None
+            ),
+        ]
+    )
+
+
+def _open(path: str, mode: str) -> typing.IO[str]:
+    if path.endswith(".gz"):
+        return typing.cast(typing.IO[str], gzip.open(path, mode + "t", encoding="utf-8"))
+    return open(path, mode, encoding="utf-8")
+
+
+class CassetteAPIClient(AbstractAPIClient):
+    """
+    Records `(method, params) -> response` pairs to JSON lines file (gzipped if path ends with .gz)
+    and replays them with configurable latency and injected errors.
+
+    >>> recorder = CassetteAPIClient("users.jsonl.gz", CassetteMode.RECORD, client=AIOHTTPClient())
+    >>> player = CassetteAPIClient(
+    ...     "users.jsonl.gz",
+    ...     latency="recorded",
+    ...     error_rates={6: 0.05, ClientConnectionError: 0.01},
+    ...     seed=42,
+    ... )
+    >>> api = API(tokens, clients=player)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: CassetteMode = CassetteMode.REPLAY,
+        client: typing.Optional[AbstractAPIClient] = None,
+        latency: Latency = None,
+        error_rates: typing.Optional[typing.Dict[typing.Union[int, type], float]] = None,
+        seed: typing.Optional[int] = None,
+    ):
+        """
+        :param path: path of cassette
+        :param mode: record responses of `client` or replay recorded ones
+        :param client: client which does real requests while recording
+        :param latency: delay of replayed responses: seconds, "recorded" or function of random
+        :param error_rates: probability of VK error (by code) or exception (by type) per request
+        :param seed: seed of random, so injected errors and latency are reproducible
+        """
+        if mode is CassetteMode.RECORD and client is None:
+            raise ValueError("Client is required to record cassette")
+        self.path = path
+        self.mode = mode
+        self.client = client
+        self.latency = latency
+        self.error_rates = error_rates or {}
+        self.random = random.Random(seed)
+
+        self._factory: AbstractFactory = DefaultFactory()
+        self._records: typing.List[str] = []
+        self._responses: typing.Dict[str, typing.Iterator[typing.Tuple[str, float]]] = {}
+        if mode is CassetteMode.REPLAY:
+            self._load()
+
+    @property
+    def context_factory(self) -> AbstractFactory:
+        return self._factory
+
+    def set_context_factory(self, factory: AbstractFactory) -> None:
+        self._factory = factory
+
+    def create_request(self, method_name: MethodName, params: dict) -> RequestContext:
+        return self.context_factory.create_context(
+            request_callback=self.request_callback,
+            method_name=method_name,
+            request_params=params,
+            exceptions={
+                ClientConnectionError: None,
+                asyncio.TimeoutError: None,
+                CassetteMissError: None,
+            },
+        )
+
+    async def request_callback(self, method_name: MethodName, params: dict) -> dict:
+        if self.mode is CassetteMode.RECORD:
+            return await self._record(method_name, params)
+        return await self._replay(method_name, params)
+
+    async def _record(self, method_name: MethodName, params: dict) -> dict:
+        client = typing.cast(AbstractAPIClient, self.client)
+        ctx = client.create_request(method_name, dict(params))
+        started = asyncio.get_running_loop().time()
+        await ctx.send_request()
+        latency = asyncio.get_running_loop().time() - started
+
+        if ctx.result.state is not ResultState.SUCCESS:
+            raise typing.cast(Exception, ctx.result.exception)
+        response = typing.cast(dict, ctx.result.data)
+        recorded_params = {
+            key: value for key, value in params.items() if key not in NOT_RECORDED_PARAMS
+        }
+        self._records.append(
+            dumps(
+                {
+                    "method": method_name,
+                    "params": recorded_params,
+                    "response": response,
+                    "latency": round(latency, 4),
+                }
+            )
+        )
+        return response
+
+    async def _replay(self, method_name: MethodName, params: dict) -> dict:
+        responses = self._responses.get(_request_key(method_name, params))
+        if responses is None:
+            raise CassetteMissError(f"{method_name} with {params} wasn't recorded")
+        raw_response, recorded_latency = next(responses)
+
+        delay = self._get_latency(recorded_latency)
+        if delay:
+            await asyncio.sleep(delay)
+
+        for error, rate in self.error_rates.items():
+            if self.random.random() >= rate:
+                continue
+            if isinstance(error, int):
+                return {
+                    "error": {
+                        "error_code": error,
+                        "error_msg": "Injected by cassette",
+                        "request_params": [
+                            {"key": key, "value": str(value)}
+                            for key, value in params.items()
+                            if key != "access_token"
+                        ],
+                    }
+                }
+            raise error()
+
+        return loads(raw_response)
+
+    def _get_latency(self, recorded_latency: float) -> float:
+        latency = self.latency
+        if latency is None:
+            return 0.0
+        if latency == "recorded":
+            return recorded_latency
+        if callable(latency):
+            return latency(self.random)
+        return float(typing.cast(float, latency))
+
+    def _load(self) -> None:
+        recorded: typing.Dict[str, typing.List[typing.Tuple[str, float]]] = {}
+        with _open(self.path, "r") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                record = loads(line)
+                key = _request_key(record["method"], record["params"])
+                recorded.setdefault(key, []).append(
+                    (dumps(record["response"]), record.get("latency", 0.0))
+                )
+        # same request is answered with recorded responses in turn
+        self._responses = {key: itertools.cycle(responses) for key, responses in recorded.items()}
+        logger.debug(f"Loaded {len(recorded)} requests from {self.path}")
+
+    def save(self) -> None:
+        """Append recorded responses to cassette"""
+        if not self._records:
+            return
+        with _open(self.path, "a") as file:
+            file.write("".join(f"{record}\n" for record in self._records))
+        self._records.clear()
+
+    async def close(self) -> None:
+        if self.mode is CassetteMode.RECORD:
+            self.save()
+            await typing.cast(AbstractAPIClient, self.client).close()
@@ -41,14 +41,30 @@ class Signal(Enum):
     BEFORE_REQUEST = auto()
     # when we sent request and ran exception handler (if exception occurred)
     AFTER_REQUEST = auto()
+    # when circuit breaker of client's endpoint opened or closed during request
+    CIRCUIT_STATE_CHANGED = auto()
 
 
 class RequestContext:
     """
     Context of request. It is being returned from `create_request` function.
     Needed to work with request specified things.
+
+    Tables of signals and exception handlers are created only when something is set,
+    so request without callbacks doesn't allocate them.
     """
 
+    __slots__ = (
+        "state",
+        "request_callback",
+        "request_params",
+        "method_name",
+        "result",
+        "_exceptions",
+        "_signals",
+        "_exception_handlers",
+    )
+
     def __init__(
         self,
         request_callback: RequestCallbackCallable,
@@ -71,34 +87,37 @@ class RequestContext:
         self.method_name = method_name
         self.result = ResultContext()
 
-        self._signals: typing.Dict[Signal, typing.List[SignalCallbackCallable]] = {
-            Signal.ON_EXCEPTION: [],
-            Signal.BEFORE_REQUEST: [],
-            Signal.AFTER_REQUEST: [],
-        }
-
-        self._exception_handlers: typing.Dict[typing.Type[Exception], ErrorHandlerCallable] = {}
-
-        if exceptions is None:
-            exceptions = {}
-
-        # set default handlers
-        for exception in exceptions:
-            self._exception_handlers[exception] = _noop_error_handler
+        # exceptions are only read, so client may pass the same mapping to every context
+        self._exceptions: typing.Mapping[typing.Type[Exception], None] = exceptions or {}
+        self._signals: typing.Optional[
+            typing.Dict[Signal, typing.List[SignalCallbackCallable]]
+        ] = None
+        # handlers which replaced default (noop) ones
+        self._exception_handlers: typing.Optional[
+            typing.Dict[typing.Type[Exception], ErrorHandlerCallable]
+        ] = None
 
     @final
     async def _handle_exception(self, exception: Exception) -> bool:
-        handler = self._exception_handlers.get(type(exception))
-        if handler and handler is not _noop_error_handler:
-            await handler(self)
-            return True
+        handlers = self._exception_handlers
+        if handlers is None:
+            return False
+        for exception_type in type(exception).__mro__:
+            handler = handlers.get(exception_type)
+            if handler is not None:
+                await handler(self)
+                return True
         return False
 
     def signal(self, signal: Signal, callback: SignalCallbackCallable) -> None:
-        self._signals[signal].append(callback)
+        if self._signals is None:
+            self._signals = {}
+        self._signals.setdefault(signal, []).append(callback)
 
     async def _push_signal(self, signal: Signal) -> None:
-        for callback in self._signals[signal]:
+        if self._signals is None:
+            return
+        for callback in self._signals.get(signal, ()):
             await callback(self)
 
     def set_exception_handler(
@@ -106,31 +125,40 @@ class RequestContext:
         exception: typing.Type[Exception],
         handler: ErrorHandlerCallable,
     ) -> None:
-        if not self._exception_handlers.get(exception):
+        if exception not in self._exceptions:
             raise ValueError("Unallowed exception")
-        self._exception_handlers[exception] = handler
+        if self._exception_handlers is None:
+            self._exception_handlers = {}
+        if handler is _noop_error_handler:
+            self._exception_handlers.pop(exception, None)
+        else:
+            self._exception_handlers[exception] = handler
 
     @final
     async def send_request(self) -> None:
-        await self._push_signal(Signal.BEFORE_REQUEST)
+        if self._signals is not None:
+            await self._push_signal(Signal.BEFORE_REQUEST)
 
+        result = self.result
         try:
-            result = await self.request_callback(self.method_name, self.request_params)
-            self.result.state = ResultState.SUCCESS
-            self.result.data = result
+            result.data = await self.request_callback(self.method_name, self.request_params)
+            result.state = ResultState.SUCCESS
         except Exception as exc:
-            self.result.exception = exc
+            result.exception = exc
             if await self._handle_exception(exc):
-                self.result.state = ResultState.HANDLED_EXCEPTION
+                result.state = ResultState.HANDLED_EXCEPTION
             else:
-                self.result.state = ResultState.UNHANDLED_EXCEPTION
+                result.state = ResultState.UNHANDLED_EXCEPTION
             await self._push_signal(Signal.ON_EXCEPTION)
 
         self.state = RequestState.SENT
-        await self._push_signal(Signal.AFTER_REQUEST)
+        if self._signals is not None:
+            await self._push_signal(Signal.AFTER_REQUEST)
 
 
 class ResultContext:
+    __slots__ = ("state", "_exception", "_exception_data", "_data")
+
     def __init__(self):
         self.state: ResultState = ResultState.NOTHING
         self._exception: typing.Optional[Exception] = None
@@ -3,14 +3,22 @@ Default implementation of HTTPClient for vkwave-client.
 """
 
 from asyncio import AbstractEventLoop
+from asyncio import TimeoutError as AsyncTimeoutError
 from json import JSONDecodeError
-from logging import getLogger
-from typing import Optional
+from logging import DEBUG, getLogger
+from typing import Dict, Optional
 
 from aiohttp import ClientConnectionError, ClientSession
 from typing_extensions import Final
 
-from vkwave.http import AbstractHTTPClient
+from vkwave.http import (
+    AbstractHTTPClient,
+    CircuitBreaker,
+    CircuitBreakers,
+    CircuitOpenError,
+    LANE_API,
+    SessionPool,
+)
 from vkwave.http import AIOHTTPClient as AHC_H
 
 from .abstract import AbstractAPIClient
@@ -20,6 +28,14 @@ from .types import MethodName
 
 logger = getLogger(__name__)
 
+# shared by every request context, contexts don't change it
+_EXCEPTIONS: Final = {
+    ClientConnectionError: None,
+    AsyncTimeoutError: None,
+    JSONDecodeError: None,
+    CircuitOpenError: None,
+}
+
 
 async def _logging_signal_before_request(ctx: RequestContext):
     logger.debug(
@@ -27,6 +43,17 @@ async def _logging_signal_before_request(ctx: RequestContext):
     )
 
 
+def _watch_circuit_breaker(ctx: RequestContext, breaker: CircuitBreaker) -> None:
+    state_before = breaker.state
+
+    async def push_state_change(ctx: RequestContext):
+        if breaker.state is not state_before:
+            logger.warning(f"Circuit breaker of {breaker.name!r} is {breaker.state.name} now")
+            await ctx._push_signal(Signal.CIRCUIT_STATE_CHANGED)
+
+    ctx.signal(Signal.AFTER_REQUEST, push_state_change)
+
+
 class AIOHTTPClient(AbstractAPIClient):
     API_URL: Final = "https://api.vk.com/method/{method_name}"
 
@@ -34,14 +61,43 @@ class AIOHTTPClient(AbstractAPIClient):
         self,
         session: Optional[ClientSession] = None,
         loop: Optional[AbstractEventLoop] = None,
+        circuit_breakers: Optional[CircuitBreakers] = None,
+        pool: Optional[SessionPool] = None,
     ):
-        self._http_client = AHC_H(session=session, loop=loop)
+        """
+        :param circuit_breakers: breakers of API and other hosts (longpoll, upload servers)
+        :param pool: shared sessions of API, longpoll, uploaders and streaming.
+         Without pool every lane opens its own session on first use
+        """
+        self._http_client = AHC_H(
+            session=session, loop=loop, circuit_breakers=circuit_breakers, pool=pool
+        )
+        self._lane_clients: Dict[str, AHC_H] = {}
+        self.pool = pool
         self._factory: AbstractFactory = DefaultFactory()
+        self.circuit_breaker: Optional[CircuitBreaker] = (
+            circuit_breakers.for_url(self.API_URL) if circuit_breakers is not None else None
+        )
 
     @property
     def http_client(self) -> AbstractHTTPClient:
         return self._http_client
 
+    def get_http_client(self, lane: str) -> AbstractHTTPClient:
+        if lane == LANE_API:
+            return self._http_client
+        client = self._lane_clients.get(lane)
+        if client is None:
+            # lane's session is taken from pool or has its own connector,
+            # so long polls and uploads never wait for connections of API calls
+            client = self._lane_clients[lane] = AHC_H(
+                loop=self._http_client.loop,
+                circuit_breakers=self._http_client.circuit_breakers,
+                pool=self.pool,
+                lane=lane,
+            )
+        return client
+
     @property
     def context_factory(self) -> AbstractFactory:
         return self._factory
@@ -54,9 +110,12 @@ class AIOHTTPClient(AbstractAPIClient):
             request_callback=self.request_callback,
             method_name=method_name,
             request_params=params,
-            exceptions={ClientConnectionError: None, JSONDecodeError: None},
+            exceptions=_EXCEPTIONS,
         )
-        ctx.signal(Signal.BEFORE_REQUEST, _logging_signal_before_request)
+        if logger.isEnabledFor(DEBUG):
+            ctx.signal(Signal.BEFORE_REQUEST, _logging_signal_before_request)
+        if self.circuit_breaker is not None:
+            _watch_circuit_breaker(ctx, self.circuit_breaker)
         return ctx
 
     async def request_callback(self, method_name: MethodName, params: dict) -> dict:
@@ -67,3 +126,5 @@ class AIOHTTPClient(AbstractAPIClient):
     async def close(self) -> None:
         logger.debug("Closing aiohttp session...")
         await self.http_client.close()
+        for client in self._lane_clients.values():
+            await client.close()
@@ -1,2 +1,16 @@
+from .breaker import (  # noqa: F401
+    CircuitBreaker,
+    CircuitBreakers,
+    CircuitOpenError,
+    CircuitState,
+)
+from .codec import JSONCodec, get_codec, set_codec  # noqa: F401
+from .pool import (  # noqa: F401
+    LANE_API,
+    LANE_DOWNLOAD,
+    LANE_LONGPOLL,
+    LANE_UPLOAD,
+    SessionPool,
+)
 from .http import AIOHTTPClient, AbstractHTTPClient  # noqa: F401
 from .ws import AIOHTTPWSClient, AbstractWSClient  # noqa: F401
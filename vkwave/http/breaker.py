@@ -0,0 +1,179 @@
+"""
+Circuit breakers which fail requests fast while endpoint is unhealthy.
+"""
+import time
+import typing
+from collections import deque
+from enum import Enum, auto
+from urllib.parse import urlsplit
+
+T = typing.TypeVar("T")
+
+
+class CircuitState(Enum):
+    # requests are sent, failures are counted
+    CLOSED = auto()
+    # requests fail immediately
+    OPEN = auto()
+    # few probe requests are sent to check whether endpoint is alive again
+    HALF_OPEN = auto()
+
+
+class CircuitOpenError(Exception):
+    """Request wasn't sent because circuit breaker is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit breaker of {name!r} is open, retry after {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_rate` of requests in last `window` seconds failed
+    (at least `min_calls` requests must be done in this window).
+    Requests which took longer than `slow_call_time` are counted as failed.
+
+    After `open_time` seconds `half_open_calls` probe requests are sent,
+    breaker closes if all of them succeed and opens again otherwise.
+    """
+
+    def __init__(
+        self,
+        name: str = "",
+        failure_rate: float = 0.5,
+        min_calls: int = 10,
+        window: float = 30.0,
+        open_time: float = 30.0,
+        half_open_calls: int = 1,
+        slow_call_time: typing.Optional[float] = None,
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.open_time = open_time
+        self.half_open_calls = half_open_calls
+        self.slow_call_time = slow_call_time
+
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        # (finish time, failed) of requests in window
+        self._calls: typing.Deque[typing.Tuple[float, bool]] = deque()
+        self._failures = 0
+        self._probes = 0
+        self._probe_successes = 0
+
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state is CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.open_time
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._probes = 0
+            self._probe_successes = 0
+        return self._state
+
+    def before_call(self) -> bool:
+        """
+        Raise CircuitOpenError if request must not be sent.
+        Returns True if request is a probe of half-open breaker.
+        """
+        state = self.state
+        if state is CircuitState.CLOSED:
+            return False
+        if state is CircuitState.HALF_OPEN and self._probes < self.half_open_calls:
+            self._probes += 1
+            return True
+        self.rejected += 1
+        retry_after = max(0.0, self._opened_at + self.open_time - time.monotonic())
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record(self, latency: float, failed: bool, probe: bool = False) -> None:
+        if self.slow_call_time is not None and latency >= self.slow_call_time:
+            failed = True
+
+        if probe:
+            if self._state is not CircuitState.HALF_OPEN:
+                return
+            if failed:
+                self._open()
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_calls:
+                self._close()
+            return
+
+        if self._state is not CircuitState.CLOSED:
+            # request was sent before breaker opened
+            return
+
+        now = time.monotonic()
+        self._calls.append((now, failed))
+        self._failures += failed
+        while self._calls and self._calls[0][0] < now - self.window:
+            _, old_failed = self._calls.popleft()
+            self._failures -= old_failed
+
+        calls = len(self._calls)
+        if calls >= self.min_calls and self._failures / calls >= self.failure_rate:
+            self._open()
+
+    def release_probe(self) -> None:
+        """Give probe slot back when probe request was cancelled and has no outcome"""
+        if self._state is CircuitState.HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def _open(self) -> None:
+        self._state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self.opened += 1
+
+    def _close(self) -> None:
+        self._state = CircuitState.CLOSED
+        self._calls.clear()
+        self._failures = 0
+
+    async def call(self, func: typing.Callable[..., typing.Awaitable[T]], *args, **kwargs) -> T:
+        probe = self.before_call()
+        started = time.monotonic()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception:
+            self.record(time.monotonic() - started, True, probe)
+            raise
+        except BaseException:
+            # cancelled request says nothing about endpoint
+            if probe:
+                self.release_probe()
+            raise
+        self.record(time.monotonic() - started, False, probe)
+        return result
+
+
+class CircuitBreakers:
+    """
+    Circuit breaker per endpoint (host of URL).
+
+    >>> client = AIOHTTPClient(circuit_breakers=CircuitBreakers(open_time=10))
+    """
+
+    def __init__(self, **breaker_options: typing.Any):
+        """
+        :param breaker_options: arguments of `CircuitBreaker`
+        """
+        self.breaker_options = breaker_options
+        self.breakers: typing.Dict[str, CircuitBreaker] = {}
+
+    def get(self, endpoint: str) -> CircuitBreaker:
+        breaker = self.breakers.get(endpoint)
+        if breaker is None:
+            breaker = self.breakers[endpoint] = CircuitBreaker(endpoint, **self.breaker_options)
+        return breaker
+
+    def for_url(self, url: str) -> CircuitBreaker:
+        return self.get(urlsplit(url).netloc)
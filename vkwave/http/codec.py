@@ -0,0 +1,71 @@
+"""
+JSON codec used by HTTP clients, callback server and payload parsing.
+
+orjson is used when it's installed. Objects which orjson can't serialize
+(non-str dict keys, ints longer than 64 bits) are serialized with stdlib json,
+so installing orjson doesn't break code which worked with stdlib json.
+Other codec can be set:
+
+>>> set_codec(JSONCodec(ujson.loads, ujson.dumps, name="ujson"))
+"""
+import json
+import typing
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+Loads = typing.Callable[[typing.Union[str, bytes]], typing.Any]
+Dumps = typing.Callable[[typing.Any], str]
+
+
+class JSONCodec:
+    __slots__ = ("loads", "dumps", "name")
+
+    def __init__(self, loads: Loads, dumps: Dumps, name: str = "custom"):
+        """
+        :param loads: must accept both str and bytes
+        :param dumps: must return str
+        """
+        self.loads = loads
+        self.dumps = dumps
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f"JSONCodec({self.name})"
+
+
+STDLIB_CODEC = JSONCodec(json.loads, json.dumps, name="json")
+
+ORJSON_CODEC: typing.Optional[JSONCodec] = None
+if orjson is not None:
+
+    def _orjson_dumps(obj: typing.Any) -> str:
+        try:
+            return orjson.dumps(obj).decode()
+        except TypeError:
+            # orjson.JSONEncodeError is TypeError
+            return json.dumps(obj)
+
+    ORJSON_CODEC = JSONCodec(orjson.loads, _orjson_dumps, name="orjson")
+
+_codec: JSONCodec = ORJSON_CODEC or STDLIB_CODEC
+
+
+def get_codec() -> JSONCodec:
+    return _codec
+
+
+def set_codec(codec: typing.Optional[JSONCodec] = None) -> None:
+    """Set global codec. Fastest available one is used if codec is None"""
+    global _codec
+    _codec = codec or ORJSON_CODEC or STDLIB_CODEC
+
+
+def loads(data: typing.Union[str, bytes]) -> typing.Any:
+    return _codec.loads(data)
+
+
+def dumps(obj: typing.Any) -> str:
+    return _codec.dumps(obj)
@@ -1,10 +1,16 @@
 from abc import ABC, abstractmethod
 from asyncio import AbstractEventLoop as AEL
 from asyncio import get_event_loop
-from typing import Optional
+from typing import Any, Awaitable, Callable, Optional, TypeVar
 
 import aiohttp
-from aiohttp import ClientSession
+from aiohttp import ClientResponse, ClientSession
+
+from vkwave.http.breaker import CircuitBreakers
+from vkwave.http.codec import dumps, loads
+from vkwave.http.pool import LANE_API, SessionPool
+
+T = TypeVar("T")
 
 
 class AbstractHTTPClient(ABC):
@@ -33,6 +39,18 @@ class AbstractHTTPClient(ABC):
         ...
 
 
+async def _read_data(resp: ClientResponse) -> bytes:
+    return await resp.read()
+
+
+async def _read_text(resp: ClientResponse) -> str:
+    return await resp.text()
+
+
+async def _read_json(resp: ClientResponse) -> Any:
+    return loads(await resp.read())
+
+
 class AIOHTTPClient(AbstractHTTPClient):
     def __init__(
         self,
@@ -40,39 +58,57 @@ class AIOHTTPClient(AbstractHTTPClient):
         loop: Optional[AEL] = None,
         verify_ssl: bool = False,
         trust_env: bool = False,
+        circuit_breakers: Optional[CircuitBreakers] = None,
+        pool: Optional[SessionPool] = None,
+        lane: str = LANE_API,
     ):
+        """
+        :param circuit_breakers: fail requests to unhealthy hosts fast
+        :param pool: take shared session from pool, it's closed by pool
+        :param lane: lane of pool's connections
+        """
         self.loop = loop or get_event_loop()
+        self.pool = pool
+        self.lane = lane
+        if session is None and pool is not None:
+            session = pool.get_session(self.loop, lane)
         self.session = session or ClientSession(
             loop=self.loop,
             connector=aiohttp.TCPConnector(ssl=verify_ssl),
             trust_env=trust_env,
+            json_serialize=dumps,
         )
+        self.circuit_breakers = circuit_breakers
 
     async def close(self):
-        await self.session.close()
+        if self.pool is None:
+            await self.session.close()
+
+    async def _request(
+        self, method: str, url: str, read: Callable[[ClientResponse], Awaitable[T]], **kwargs
+    ) -> T:
+        async with self.session.request(method, url, **kwargs) as resp:
+            return await read(resp)
+
+    async def _send(
+        self, method: str, url: str, read: Callable[[ClientResponse], Awaitable[T]], **kwargs
+    ) -> T:
+        if self.circuit_breakers is None:
+            return await self._request(method, url, read, **kwargs)
+        breaker = self.circuit_breakers.for_url(url)
+        return await breaker.call(self._request, method, url, read, **kwargs)
 
     async def request_data(self, method: str, url: str, data: Optional[dict] = None) -> bytes:
-        data = data or {}
-
-        async with self.session.request(method, url, data=data) as resp:
-            return await resp.read()
+        return await self._send(method, url, _read_data, data=data or {})
 
     async def request_text(self, method: str, url: str, data: Optional[dict] = None) -> str:
-        data = data or {}
-
-        async with self.session.request(method, url, data=data) as resp:
-            return await resp.text()
+        return await self._send(method, url, _read_text, data=data or {})
 
     async def request_json(self, method: str, url: str, data: Optional[dict] = None) -> dict:
-        data = data or {}
-
-        async with self.session.request(method, url, data=data) as resp:
-            return await resp.json()
+        return await self._send(method, url, _read_json, data=data or {})
 
     async def request_send_json(self, method: str, url: str, json: Optional[dict] = None) -> dict:
-        json = json or {}
-        async with self.session.request(method, url, json=json) as resp:
-            return await resp.json()
+        return await self._send(method, url, _read_json, json=json or {})
 
     async def raw_request(self, *args, **kwargs):
         return await self.session.request(*args, **kwargs)
@@ -0,0 +1,159 @@
+"""
+Shared aiohttp session with tunable connection pool.
+"""
+import asyncio
+import logging
+import typing
+from asyncio import AbstractEventLoop as AEL
+
+import aiohttp
+from aiohttp import ClientSession, ClientTimeout
+
+from vkwave.http.codec import dumps
+
+logger = logging.getLogger(__name__)
+
+API_URL = "https://api.vk.com/"
+
+# lanes of connections, every lane has its own connector,
+# so longpoll requests never wait for connections taken by API calls
+LANE_API = "api"
+LANE_LONGPOLL = "longpoll"
+LANE_UPLOAD = "upload"
+LANE_DOWNLOAD = "download"
+
+
+class SessionPool:
+    """
+    One `ClientSession` for every client created with this pool:
+    API client, longpoll, uploaders and streaming reuse the same connections.
+
+    Every lane (API, longpoll, uploads, downloads) has its own session and connector,
+    limits of lane are taken from `lanes` or pool's ones.
+    Sessions are owned by pool, clients don't close them.
+
+    >>> pool = SessionPool(
+    ...     limit=200,
+    ...     limit_per_host=50,
+    ...     keepalive_timeout=60,
+    ...     lanes={LANE_LONGPOLL: {"limit": 20}, LANE_UPLOAD: {"limit": 10}},
+    ... )
+    >>> await pool.warm_up(10)
+    >>> api = API(tokens, clients=AIOHTTPClient(pool=pool))
+    >>> ...
+    >>> await pool.close()
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 15.0,
+        ttl_dns_cache: typing.Optional[int] = 10,
+        verify_ssl: bool = False,
+        trust_env: bool = False,
+        timeout: typing.Optional[ClientTimeout] = None,
+        connector_options: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        lanes: typing.Optional[typing.Dict[str, typing.Dict[str, typing.Any]]] = None,
+    ):
+        """
+        :param limit: max number of connections, 0 means no limit
+        :param limit_per_host: max number of connections to one host, 0 means no limit
+        :param keepalive_timeout: how long idle connection is kept open
+        :param ttl_dns_cache: how long resolved addresses are cached, None caches forever
+        :param connector_options: other arguments of `aiohttp.TCPConnector`
+         (`local_addr`, `family`...)
+        :param lanes: options of lanes' connectors which differ from pool's ones
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        self.verify_ssl = verify_ssl
+        self.trust_env = trust_env
+        self.timeout = timeout
+        self.connector_options = connector_options or {}
+        self.lanes = lanes or {}
+
+        self._sessions: typing.Dict[str, ClientSession] = {}
+
+    def create_connector(
+        self, loop: typing.Optional[AEL] = None, lane: str = LANE_API
+    ) -> aiohttp.TCPConnector:
+        options: typing.Dict[str, typing.Any] = {
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "keepalive_timeout": self.keepalive_timeout,
+            "ttl_dns_cache": self.ttl_dns_cache,
+            "use_dns_cache": True,
+            "ssl": self.verify_ssl,
+            **self.connector_options,
+            **self.lanes.get(lane, {}),
+        }
+        return aiohttp.TCPConnector(loop=loop, **options)
+
+    def get_session(
+        self, loop: typing.Optional[AEL] = None, lane: str = LANE_API
+    ) -> ClientSession:
+        session = self._sessions.get(lane)
+        if session is None or session.closed:
+            options: typing.Dict[str, typing.Any] = {}
+            if self.timeout is not None:
+                options["timeout"] = self.timeout
+            session = self._sessions[lane] = ClientSession(
+                loop=loop,
+                connector=self.create_connector(loop, lane),
+                trust_env=self.trust_env,
+                json_serialize=dumps,
+                **options,
+            )
+        return session
+
+    def get_connector(self, lane: str = LANE_API) -> typing.Optional[aiohttp.BaseConnector]:
+        session = self._sessions.get(lane)
+        return session.connector if session is not None else None
+
+    @property
+    def connector(self) -> typing.Optional[aiohttp.BaseConnector]:
+        return self.get_connector(LANE_API)
+
+    def stats(self) -> typing.Dict[str, typing.Dict[str, int]]:
+        """Limit, used and idle connections of every opened lane"""
+        result = {}
+        for lane, session in self._sessions.items():
+            connector = session.connector
+            if connector is None or session.closed:
+                continue
+            result[lane] = {
+                "limit": connector.limit,
+                "in_use": len(connector._acquired),  # type: ignore
+                "idle": sum(len(conns) for conns in connector._conns.values()),  # type: ignore
+            }
+        return result
+
+    async def warm_up(self, connections: int = 4, url: str = API_URL, lane: str = LANE_API) -> int:
+        """
+        Open `connections` keep-alive connections to url beforehand,
+        so first requests don't wait for TLS handshake.
+        Returns the number of opened connections.
+        """
+        session = self.get_session(lane=lane)
+
+        async def open_connection() -> bool:
+            try:
+                async with session.head(url, allow_redirects=False) as resp:
+                    await resp.read()
+                return True
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                logger.warning(f"Couldn't warm up connection to {url}: {exc!r}")
+                return False
+
+        opened = sum(await asyncio.gather(*(open_connection() for _ in range(connections))))
+        logger.debug(f"Opened {opened} connections to {url}")
+        return opened
+
+    async def close(self) -> None:
+        for session in self._sessions.values():
+            if not session.closed:
+                await session.close()
+        self._sessions.clear()
@@ -5,6 +5,9 @@ from typing import Optional, AsyncGenerator
 import aiohttp
 from aiohttp import ClientSession
 
+from vkwave.http.codec import dumps, loads
+from vkwave.http.pool import LANE_API, SessionPool
+
 
 class AbstractWSClient(ABC):
     @abstractmethod
@@ -29,9 +32,18 @@ class AbstractWSClient(ABC):
 
 
 class AIOHTTPWSClient(AbstractWSClient):
-    def __init__(self, session: Optional[ClientSession] = None, loop: Optional[AEL] = None):
+    def __init__(
+        self,
+        session: Optional[ClientSession] = None,
+        loop: Optional[AEL] = None,
+        pool: Optional[SessionPool] = None,
+        lane: str = LANE_API,
+    ):
         self.loop = loop or get_event_loop()
-        self.session = session or ClientSession(loop=self.loop)
+        self.pool = pool
+        if session is None and pool is not None:
+            session = pool.get_session(self.loop, lane)
+        self.session = session or ClientSession(loop=self.loop, json_serialize=dumps)
         self._ws_conn: Optional[aiohttp.client._WSRequestContextManager] = None
 
     async def connect(self, url: str):
@@ -52,10 +64,11 @@ class AIOHTTPWSClient(AbstractWSClient):
     async def stream_json(self) -> AsyncGenerator[None, dict]:
         async with self._ws_conn as conn:
             while True:
-                msg = await conn.receive_json()
+                msg = await conn.receive_json(loads=loads)
                 yield msg
 
     async def close(self):
         if self._ws_conn and not self._ws_conn.closed:
             await self._ws_conn.close()
-        await self.session.close()
+        if self.pool is None:
+            await self.session.close()
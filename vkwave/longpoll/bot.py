@@ -1,7 +1,7 @@
 from typing import AsyncGenerator, List, NewType, Optional, cast
 
 from vkwave.api.methods import APIOptionsRequestContext
-from vkwave.http import AbstractHTTPClient
+from vkwave.http import LANE_LONGPOLL, AbstractHTTPClient
 from vkwave.types.objects import GroupsLongPollServer
 
 Update = NewType("Update", dict)
@@ -24,6 +24,15 @@ class BotLongpollData:
         self.key = response.key
         self.server = response.server
         self.ts = response.ts
+        self._first_request = True
+
+    @property
+    def loaded(self) -> bool:
+        """Server and key were received"""
+        return self._first_request
+
+    def get_url(self) -> str:
+        return f"{self.server}?act=a_check&key={self.key}&ts={self.ts}&wait={self.wait}"
 
     async def handle_error(
         self, data: dict, client: AbstractHTTPClient, api: APIOptionsRequestContext
@@ -40,12 +49,8 @@ class BotLongpollData:
     ) -> List[Update]:
         if not self._first_request:
             await self.update_data(api)
-            self._first_request = True
 
-        data = await http_client.request_json(
-            "POST",
-            f"{self.server}?act=a_check&key={self.key}&ts={self.ts}&wait={self.wait}",
-        )
+        data = await http_client.request_json("POST", self.get_url())
 
         if "failed" in data:
             return await self.handle_error(data, http_client, api)
@@ -66,7 +71,7 @@ class BotLongpoll:
         self.api: APIOptionsRequestContext = api
 
         self.client: AbstractHTTPClient = (
-            http_client or self.api.api_options.get_client().http_client
+            http_client or self.api.api_options.get_client().get_http_client(LANE_LONGPOLL)
         )
         self.data = bot_longpoll_data
 
@@ -79,6 +84,6 @@ class BotLongpoll:
         while True:
             while not updates:
                 updates = await self.get_updates()
-            while updates:
-                update = updates.pop()
+            for update in updates:
                 yield update
+            updates = []
@@ -1,7 +1,7 @@
 from typing import AsyncGenerator, List, NewType, Optional, cast
 
 from vkwave.api.methods import APIOptionsRequestContext
-from vkwave.http import AbstractHTTPClient
+from vkwave.http import LANE_LONGPOLL, AbstractHTTPClient
 from vkwave.types.objects import GroupsLongPollServer
 
 Update = NewType("Update", list)
@@ -23,6 +23,18 @@ class UserLongpollData:
         self.key = response.key
         self.server = response.server
         self.ts = response.ts
+        self._first_request = True
+
+    @property
+    def loaded(self) -> bool:
+        """Server and key were received"""
+        return self._first_request
+
+    def get_url(self) -> str:
+        return (
+            f"https://{self.server}?act=a_check&key={self.key}&ts={self.ts}"
+            f"&wait={self.wait}&mode=234&version=10"
+        )
 
     async def handle_error(
         self, data: dict, client: AbstractHTTPClient, api: APIOptionsRequestContext
@@ -41,12 +53,8 @@ class UserLongpollData:
     ) -> List[Update]:
         if not self._first_request:
             await self.update_data(api)
-            self._first_request = True
 
-        data = await http_client.request_json(
-            "POST",
-            f"https://{self.server}?act=a_check&key={self.key}&ts={self.ts}&wait={self.wait}&mode=234&version=10",
-        )
+        data = await http_client.request_json("POST", self.get_url())
 
         if "failed" in data:
             return await self.handle_error(data, http_client, api)
@@ -67,7 +75,7 @@ class UserLongpoll:
         self.api: APIOptionsRequestContext = api
 
         self.client: AbstractHTTPClient = (
-            http_client or self.api.api_options.get_client().http_client
+            http_client or self.api.api_options.get_client().get_http_client(LANE_LONGPOLL)
         )
         self.data = bot_longpoll_data
 
@@ -80,6 +88,6 @@ class UserLongpoll:
         while True:
             while not updates:
                 updates = await self.get_updates()
-            while updates:
-                update = updates.pop()
+            for update in updates:
                 yield update
+            updates = []
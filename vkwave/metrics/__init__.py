@@ -0,0 +1,13 @@
+from .api import APIMetrics  # noqa: F401
+from .dispatcher import DispatcherMetrics  # noqa: F401
+from .http import metrics_handler, setup_metrics  # noqa: F401
+from .longpoll import LongpollMetrics  # noqa: F401
+from .pool import PoolMetrics  # noqa: F401
+from .registry import (  # noqa: F401
+    CallbackMetric,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    default_registry,
+)
@@ -0,0 +1,214 @@
+import typing
+
+from vkwave.api.methods._utils import token_scope
+from vkwave.metrics.registry import (
+    CallbackMetric,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    default_registry,
+)
+
+if typing.TYPE_CHECKING:
+    from vkwave.api.methods._abc import APIOptions
+
+
+OTHER_TOKENS_LABEL = "other"
+
+
+class APIMetrics:
+    """
+    Metrics of API requests.
+
+    Tokens are labeled with short hash, tokens themselves are never exported.
+    Only first `max_token_labels` tokens get their own labels, requests of other tokens
+    are counted under `OTHER_TOKENS_LABEL`, so number of series doesn't grow with tokens.
+
+    >>> api = API(tokens, metrics=APIMetrics())
+    """
+
+    def __init__(
+        self,
+        registry: typing.Optional[MetricsRegistry] = None,
+        prefix: str = "vkwave_api",
+        max_token_labels: int = 100,
+    ):
+        self.registry = registry or default_registry
+        self.prefix = prefix
+        self.max_token_labels = max_token_labels
+        self.requests = self.registry.register(
+            Counter(f"{prefix}_requests_total", "API requests", ["method", "status"])
+        )
+        self.latency = self.registry.register(
+            Histogram(f"{prefix}_request_duration_seconds", "Latency of API requests", ["method"])
+        )
+        self.errors = self.registry.register(
+            Counter(f"{prefix}_errors_total", "API errors by code", ["method", "code"])
+        )
+        self.token_requests = self.registry.register(
+            Counter(f"{prefix}_token_requests_total", "API requests by token", ["token"])
+        )
+        self.token_in_flight = self.registry.register(
+            Gauge(f"{prefix}_token_requests_in_flight", "Unfinished requests by token", ["token"])
+        )
+        self._token_labels: typing.Dict[str, str] = {}
+        self._options: typing.List["APIOptions"] = []
+
+    def token_label(self, token: str) -> str:
+        label = self._token_labels.get(token)
+        if label is None:
+            if len(self._token_labels) >= self.max_token_labels:
+                return OTHER_TOKENS_LABEL
+            label = self._token_labels[token] = token_scope([token])[:8]
+        return label
+
+    def request_started(self, token: str) -> None:
+        self.token_in_flight.inc(self.token_label(token))
+
+    def request_cancelled(self, token: str) -> None:
+        self.token_in_flight.dec(self.token_label(token))
+
+    def request_finished(
+        self,
+        method_name: str,
+        token: str,
+        latency: float,
+        error_code: typing.Optional[int] = None,
+        exception: typing.Optional[Exception] = None,
+    ) -> None:
+        token_label = self.token_label(token)
+        self.token_in_flight.dec(token_label)
+        self.token_requests.inc(token_label)
+        self.latency.observe(latency, method_name)
+        if exception is not None:
+            self.requests.inc(method_name, "exception")
+        elif error_code is not None:
+            self.requests.inc(method_name, "error")
+            self.errors.inc(method_name, error_code)
+        else:
+            self.requests.inc(method_name, "ok")
+
+    def watch(self, options: "APIOptions") -> None:
+        """
+        Export state of retry policy, cache, single-flight, scheduler
+        and rate limits of tokens of options
+        """
+        if not self._options:
+            self._register_callbacks()
+        self._options.append(options)
+
+    def _register_callbacks(self) -> None:
+        prefix = self.prefix
+        metrics = [
+            CallbackMetric(
+                f"{prefix}_retries_total",
+                "Retries of API requests",
+                ["method"],
+                self._retries,
+                type_name="counter",
+            ),
+            CallbackMetric(
+                f"{prefix}_cache_requests_total",
+                "Lookups in response cache",
+                ["result"],
+                self._cache,
+                type_name="counter",
+            ),
+            CallbackMetric(
+                f"{prefix}_shared_requests_total",
+                "Requests which joined identical request in flight",
+                [],
+                self._shared,
+                type_name="counter",
+            ),
+            CallbackMetric(
+                f"{prefix}_token_wait_seconds_total",
+                "Time requests waited for free slot of token's rate limit",
+                ["token"],
+                self._token_wait_time,
+                type_name="counter",
+            ),
+            CallbackMetric(
+                f"{prefix}_token_rate_limit",
+                "Current requests per second budget of token",
+                ["token"],
+                self._token_rate,
+            ),
+            CallbackMetric(
+                f"{prefix}_scheduler_queue_length",
+                "Requests waiting for scheduler",
+                [],
+                self._queued,
+            ),
+            CallbackMetric(
+                f"{prefix}_scheduler_in_flight",
+                "Requests admitted by scheduler",
+                [],
+                self._in_flight,
+            ),
+        ]
+        for metric in metrics:
+            self.registry.register(metric)
+
+    def _components(self, name: str) -> typing.List[typing.Any]:
+        seen: typing.Dict[int, typing.Any] = {}
+        for options in self._options:
+            component = getattr(options, name, None)
+            if component is not None:
+                seen[id(component)] = component
+        return list(seen.values())
+
+    def _retries(self) -> typing.Dict[tuple, float]:
+        result: typing.Dict[tuple, float] = {}
+        for policy in self._components("retry_policy"):
+            for method_name, count in policy.retries.items():
+                result[(method_name,)] = result.get((method_name,), 0) + count
+        return result
+
+    def _cache(self) -> typing.Dict[tuple, float]:
+        caches = self._components("response_cache")
+        if not caches:
+            return {}
+        return {
+            ("hit",): sum(cache.hits for cache in caches),
+            ("miss",): sum(cache.misses for cache in caches),
+        }
+
+    def _token_buckets(self) -> typing.Dict[str, typing.Any]:
+        buckets: typing.Dict[str, typing.Any] = {}
+        for strategy in self._components("get_token_strategy"):
+            # only RateLimitedGetTokenStrategy has buckets
+            buckets.update(getattr(strategy, "buckets", {}))
+        return buckets
+
+    def _token_wait_time(self) -> typing.Dict[tuple, float]:
+        result: typing.Dict[tuple, float] = {}
+        for token, bucket in self._token_buckets().items():
+            label = (self.token_label(token),)
+            result[label] = result.get(label, 0) + bucket.wait_time
+        return result
+
+    def _token_rate(self) -> typing.Dict[tuple, float]:
+        return {
+            (self.token_label(token),): bucket.rate
+            for token, bucket in self._token_buckets().items()
+        }
+
+    def _shared(self) -> typing.Dict[tuple, float]:
+        single_flights = self._components("single_flight")
+        if not single_flights:
+            return {}
+        return {(): sum(single_flight.shared for single_flight in single_flights)}
+
+    def _queued(self) -> typing.Dict[tuple, float]:
+        schedulers = self._components("scheduler")
+        if not schedulers:
+            return {}
+        return {(): sum(scheduler.queued for scheduler in schedulers)}
+
+    def _in_flight(self) -> typing.Dict[tuple, float]:
+        schedulers = self._components("scheduler")
+        if not schedulers:
+            return {}
+        return {(): sum(scheduler.in_flight for scheduler in schedulers)}
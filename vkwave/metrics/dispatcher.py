@@ -0,0 +1,97 @@
+import typing
+
+from vkwave.metrics.registry import (
+    CallbackMetric,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    default_registry,
+)
+
+if typing.TYPE_CHECKING:
+    from vkwave.bots.core.dispatching.dp.runtime import DispatchRuntime
+
+
+class DispatcherMetrics:
+    """
+    Metrics of events processing.
+
+    >>> dp = Dispatcher(api, token_storage, metrics=DispatcherMetrics())
+    """
+
+    def __init__(
+        self, registry: typing.Optional[MetricsRegistry] = None, prefix: str = "vkwave_bots"
+    ):
+        self.registry = registry or default_registry
+        self.prefix = prefix
+        self.events = self.registry.register(
+            Counter(f"{prefix}_events_total", "Processed events", ["type", "handled"])
+        )
+        self.latency = self.registry.register(
+            Histogram(f"{prefix}_event_duration_seconds", "Time of events processing", ["type"])
+        )
+        self.in_progress = self.registry.register(
+            Gauge(f"{prefix}_events_in_progress", "Events which are being processed")
+        )
+        self._runtimes: typing.List["DispatchRuntime"] = []
+
+    def event_started(self) -> None:
+        self.in_progress.inc()
+
+    def event_finished(self, event_type: str, handled: bool, latency: float) -> None:
+        self.in_progress.dec()
+        self.events.inc(event_type, "true" if handled else "false")
+        self.latency.observe(latency, event_type)
+
+    def watch(self, runtime: "DispatchRuntime") -> None:
+        """Export queue and workers of runtime"""
+        if not self._runtimes:
+            self._register_callbacks()
+        self._runtimes.append(runtime)
+
+    def _register_callbacks(self) -> None:
+        prefix = self.prefix
+        metrics = [
+            CallbackMetric(
+                f"{prefix}_queue_length",
+                "Events waiting for worker",
+                [],
+                lambda: self._sum(lambda runtime: runtime.queued),
+            ),
+            CallbackMetric(
+                f"{prefix}_queue_wait_seconds_total",
+                "Time events spent in queue",
+                [],
+                lambda: self._sum(lambda runtime: runtime.wait_time),
+                type_name="counter",
+            ),
+            CallbackMetric(
+                f"{prefix}_queue_rejected_total",
+                "Events which weren't queued because queue was full",
+                [],
+                lambda: self._sum(lambda runtime: runtime.rejected),
+                type_name="counter",
+            ),
+            CallbackMetric(
+                f"{prefix}_workers",
+                "Workers of runtime",
+                [],
+                lambda: self._sum(lambda runtime: runtime.workers),
+            ),
+            CallbackMetric(
+                f"{prefix}_workers_busy",
+                "Workers which are processing events",
+                [],
+                lambda: self._sum(lambda runtime: runtime.busy),
+            ),
+        ]
+        for metric in metrics:
+            self.registry.register(metric)
+
+    def _sum(
+        self, value: typing.Callable[["DispatchRuntime"], float]
+    ) -> typing.Dict[tuple, float]:
+        if not self._runtimes:
+            return {}
+        return {(): sum(value(runtime) for runtime in self._runtimes)}
@@ -0,0 +1,29 @@
+import typing
+
+from aiohttp import web
+
+from vkwave.metrics.registry import MetricsRegistry, default_registry
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def metrics_handler(
+    registry: typing.Optional[MetricsRegistry] = None,
+) -> typing.Callable[[web.Request], typing.Awaitable[web.Response]]:
+    registry = registry or default_registry
+
+    async def handler(request: web.Request) -> web.Response:
+        return web.Response(
+            body=registry.render().encode(), headers={"Content-Type": CONTENT_TYPE}
+        )
+
+    return handler
+
+
+def setup_metrics(
+    app: web.Application,
+    registry: typing.Optional[MetricsRegistry] = None,
+    path: str = "/metrics",
+) -> None:
+    """Add endpoint which returns metrics in Prometheus text format"""
+    app.router.add_get(path, metrics_handler(registry))
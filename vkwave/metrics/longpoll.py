@@ -0,0 +1,78 @@
+import typing
+
+from vkwave.metrics.registry import CallbackMetric, MetricsRegistry, default_registry
+
+if typing.TYPE_CHECKING:
+    from vkwave.bots.core.dispatching.extensions.longpoll_multiplexer import (
+        LongpollMultiplexer,
+        LongpollSource,
+    )
+
+
+class LongpollMetrics:
+    """
+    Metrics of every source of longpoll multiplexers.
+
+    >>> LongpollMetrics().watch(multiplexer)
+    """
+
+    def __init__(
+        self, registry: typing.Optional[MetricsRegistry] = None, prefix: str = "vkwave_longpoll"
+    ):
+        self.registry = registry or default_registry
+        self.prefix = prefix
+        self._multiplexers: typing.List["LongpollMultiplexer"] = []
+
+    def watch(self, multiplexer: "LongpollMultiplexer") -> None:
+        if not self._multiplexers:
+            self._register_callbacks()
+        self._multiplexers.append(multiplexer)
+
+    def _register_callbacks(self) -> None:
+        prefix = self.prefix
+        metrics = [
+            CallbackMetric(
+                f"{prefix}_sources",
+                "Polled longpoll sources",
+                [],
+                lambda: {(): sum(len(mux.sources) for mux in self._multiplexers)},
+            ),
+            CallbackMetric(
+                f"{prefix}_lag_seconds",
+                "Time since last response of longpoll server",
+                ["source"],
+                lambda: self._collect(lambda source: source.lag),
+            ),
+            CallbackMetric(
+                f"{prefix}_events_total",
+                "Received events",
+                ["source"],
+                lambda: self._collect(lambda source: source.events),
+                type_name="counter",
+            ),
+            CallbackMetric(
+                f"{prefix}_errors_total",
+                "Failed longpoll requests",
+                ["source"],
+                lambda: self._collect(lambda source: source.errors),
+                type_name="counter",
+            ),
+            CallbackMetric(
+                f"{prefix}_refreshes_total",
+                "Requests of new longpoll server",
+                ["source"],
+                lambda: self._collect(lambda source: source.refreshes),
+                type_name="counter",
+            ),
+        ]
+        for metric in metrics:
+            self.registry.register(metric)
+
+    def _collect(
+        self, value: typing.Callable[["LongpollSource"], float]
+    ) -> typing.Dict[tuple, float]:
+        return {
+            (str(source.key),): value(source)
+            for multiplexer in self._multiplexers
+            for source in multiplexer.sources.values()
+        }
@@ -0,0 +1,58 @@
+import typing
+
+from vkwave.metrics.registry import CallbackMetric, MetricsRegistry, default_registry
+
+if typing.TYPE_CHECKING:
+    from vkwave.http.pool import SessionPool
+
+
+class PoolMetrics:
+    """
+    Connections of every lane of session pools.
+
+    >>> PoolMetrics().watch(pool)
+    """
+
+    def __init__(
+        self, registry: typing.Optional[MetricsRegistry] = None, prefix: str = "vkwave_http"
+    ):
+        self.registry = registry or default_registry
+        self.prefix = prefix
+        self._pools: typing.List["SessionPool"] = []
+
+    def watch(self, pool: "SessionPool") -> None:
+        if not self._pools:
+            self._register_callbacks()
+        self._pools.append(pool)
+
+    def _register_callbacks(self) -> None:
+        self.registry.register(
+            CallbackMetric(
+                f"{self.prefix}_connections_limit",
+                "Max number of connections of lane",
+                ["lane"],
+                lambda: self._collect("limit"),
+            )
+        )
+        self.registry.register(
+            CallbackMetric(
+                f"{self.prefix}_connections",
+                "Open connections of lane",
+                ["lane", "state"],
+                self._connections,
+            )
+        )
+
+    def _collect(self, key: str) -> typing.Dict[tuple, float]:
+        result: typing.Dict[tuple, float] = {}
+        for pool in self._pools:
+            for lane, stats in pool.stats().items():
+                result[(lane,)] = result.get((lane,), 0) + stats[key]
+        return result
+
+    def _connections(self) -> typing.Dict[tuple, float]:
+        result: typing.Dict[tuple, float] = {}
+        for state in ("in_use", "idle"):
+            for (lane,), value in self._collect(state).items():
+                result[(lane, state)] = value
+        return result
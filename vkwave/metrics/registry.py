@@ -0,0 +1,210 @@
+"""
+Metrics in Prometheus text format without third-party dependencies.
+"""
+import bisect
+import typing
+
+Sample = typing.Tuple[str, tuple, float]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: typing.Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> typing.Iterable[Sample]:
+        raise NotImplementedError
+
+    def _check_labels(self, labels: tuple) -> None:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} has labels {self.labelnames}, got {labels}")
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for name, labels, value in self.samples():
+            if labels:
+                label_names = self.labelnames + ("le",) * (len(labels) - len(self.labelnames))
+                formatted = ",".join(
+                    f'{label_name}="{_escape(str(label))}"'
+                    for label_name, label in zip(label_names, labels)
+                )
+                lines.append(f"{name}{{{formatted}}} {_format_value(value)}")
+            else:
+                lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Value which only grows: number of requests, errors..."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: typing.Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: typing.Dict[tuple, float] = {}
+
+    def inc(self, *labels: typing.Any, value: float = 1.0) -> None:
+        current = self._values.get(labels)
+        if current is None:
+            self._check_labels(labels)
+            current = 0.0
+        self._values[labels] = current + value
+
+    def get(self, *labels: typing.Any) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> typing.Iterable[Sample]:
+        for labels, value in self._values.items():
+            yield self.name, labels, value
+
+
+class Gauge(Counter):
+    """Value which goes up and down: queue length, requests in flight..."""
+
+    type_name = "gauge"
+
+    def dec(self, *labels: typing.Any, value: float = 1.0) -> None:
+        self.inc(*labels, value=-value)
+
+    def set(self, *labels: typing.Any, value: float) -> None:
+        if labels not in self._values:
+            self._check_labels(labels)
+        self._values[labels] = value
+
+
+class Histogram(Metric):
+    """Distribution of values: latency of requests..."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: typing.Sequence[str] = (),
+        buckets: typing.Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # counts of every bucket and +Inf, sum of values
+        self._values: typing.Dict[tuple, typing.Tuple[typing.List[int], typing.List[float]]] = {}
+
+    def observe(self, value: float, *labels: typing.Any) -> None:
+        entry = self._values.get(labels)
+        if entry is None:
+            self._check_labels(labels)
+            entry = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1][0] += value
+
+    def count(self, *labels: typing.Any) -> int:
+        entry = self._values.get(labels)
+        return sum(entry[0]) if entry is not None else 0
+
+    def samples(self) -> typing.Iterable[Sample]:
+        for labels, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", labels + (_format_value(bound),), cumulative
+            yield f"{self.name}_sum", labels, total[0]
+            yield f"{self.name}_count", labels, cumulative
+
+
+class CallbackMetric(Metric):
+    """
+    Metric whose values are read from other object when metrics are rendered.
+    Values of all callbacks are summed by labels.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: typing.Sequence[str],
+        callback: typing.Callable[[], typing.Dict[tuple, float]],
+        type_name: str = "gauge",
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callbacks = [callback]
+        self.type_name = type_name
+
+    def samples(self) -> typing.Iterable[Sample]:
+        if len(self.callbacks) == 1:
+            values = self.callbacks[0]()
+        else:
+            values = {}
+            for callback in self.callbacks:
+                for labels, value in callback().items():
+                    values[labels] = values.get(labels, 0) + value
+        for labels, value in values.items():
+            yield self.name, labels, value
+
+
+M = typing.TypeVar("M", bound=Metric)
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics.
+
+    >>> registry = MetricsRegistry()
+    >>> requests = registry.register(Counter("requests_total", "Requests", ["method"]))
+    >>> requests.inc("users.get")
+    >>> print(registry.render())
+    """
+
+    def __init__(self):
+        self.metrics: typing.Dict[str, Metric] = {}
+
+    def register(self, metric: M) -> M:
+        """
+        Register metric or return already registered metric of the same type and labels,
+        so several instances of `APIMetrics` (several APIs) share one collector.
+        """
+        registered = self.metrics.get(metric.name)
+        if registered is None:
+            self.metrics[metric.name] = metric
+            return metric
+        if (
+            type(registered) is not type(metric)
+            or registered.labelnames != metric.labelnames
+            or registered.type_name != metric.type_name
+        ):
+            raise ValueError(f"Metric {metric.name} is already registered with other type")
+        if isinstance(registered, CallbackMetric):
+            registered.callbacks.extend(typing.cast(CallbackMetric, metric).callbacks)
+        return typing.cast(M, registered)
+
+    def unregister(self, name: str) -> None:
+        self.metrics.pop(name, None)
+
+    def get(self, name: str) -> typing.Optional[Metric]:
+        return self.metrics.get(name)
+
+    def render(self) -> str:
+        """All metrics in Prometheus text format"""
+        return "".join(f"{metric.render()}\n" for metric in self.metrics.values())
+
+
+default_registry = MetricsRegistry()
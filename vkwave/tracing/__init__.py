@@ -0,0 +1,10 @@
+from .opentelemetry import OpenTelemetryTracer  # noqa: F401
+from .tracer import (  # noqa: F401
+    ABCTracer,
+    RecordingTracer,
+    Span,
+    get_tracer,
+    set_tracer,
+    span,
+    traced,
+)
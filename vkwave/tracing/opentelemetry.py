@@ -0,0 +1,29 @@
+import typing
+
+from vkwave.tracing.tracer import ABCTracer, Attributes
+
+try:
+    from opentelemetry import trace
+except ImportError:
+    trace = None
+
+
+class OpenTelemetryTracer(ABCTracer):
+    """
+    Exports spans with OpenTelemetry.
+
+    >>> set_tracer(OpenTelemetryTracer())
+    """
+
+    def __init__(self, tracer: typing.Optional[typing.Any] = None):
+        """
+        :param tracer: `opentelemetry.trace.Tracer`, tracer of global provider is used by default
+        """
+        if trace is None:
+            raise RuntimeError(
+                "You have to install opentelemetry-api - pip install opentelemetry-api"
+            )
+        self.tracer = tracer or trace.get_tracer("vkwave")
+
+    def span(self, name: str, attributes: Attributes) -> typing.ContextManager[typing.Any]:
+        return self.tracer.start_as_current_span(name, attributes=attributes)
@@ -0,0 +1,147 @@
+"""
+Lightweight tracing: nested spans propagated through contextvars.
+Nothing is traced until tracer is set with `set_tracer`.
+"""
+import contextvars
+import functools
+import time
+import typing
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+
+Attributes = typing.Dict[str, typing.Any]
+
+
+class Span:
+    """Span recorded by `RecordingTracer`"""
+
+    __slots__ = ("name", "attributes", "parent", "started_at", "finished_at", "error")
+
+    def __init__(self, name: str, attributes: Attributes, parent: typing.Optional["Span"]):
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.started_at = time.monotonic()
+        self.finished_at: typing.Optional[float] = None
+        self.error: typing.Optional[BaseException] = None
+
+    def set_attribute(self, key: str, value: typing.Any) -> None:
+        self.attributes[key] = value
+
+    @property
+    def duration(self) -> typing.Optional[float]:
+        if self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    def __repr__(self) -> str:
+        return f"Span({self.name!r}, {self.attributes!r}, duration={self.duration})"
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: typing.Any) -> None:
+        pass
+
+
+class _NoopSpanContext:
+    __slots__ = ()
+
+    def __enter__(self) -> _NoopSpan:
+        return NOOP_SPAN
+
+    def __exit__(self, *args) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+_NOOP_SPAN_CONTEXT = _NoopSpanContext()
+
+SpanLike = typing.Union[Span, _NoopSpan, typing.Any]
+
+
+class ABCTracer(ABC):
+    @abstractmethod
+    def span(self, name: str, attributes: Attributes) -> typing.ContextManager[SpanLike]:
+        """Context manager of span which is child of current span"""
+
+
+class RecordingTracer(ABCTracer):
+    """
+    Keeps last finished spans in memory.
+
+    >>> tracer = RecordingTracer()
+    >>> set_tracer(tracer)
+    >>> [span for span in tracer.spans if span.duration > 1]
+    """
+
+    def __init__(self, max_spans: int = 10000):
+        self.spans: typing.Deque[Span] = deque(maxlen=max_spans)
+        self._current: contextvars.ContextVar[typing.Optional[Span]] = contextvars.ContextVar(
+            "vkwave_current_span", default=None
+        )
+
+    @property
+    def current_span(self) -> typing.Optional[Span]:
+        return self._current.get()
+
+    @contextmanager
+    def span(self, name: str, attributes: Attributes) -> typing.Iterator[Span]:
+        span = Span(name, attributes, self._current.get())
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.error = exc
+            raise
+        finally:
+            span.finished_at = time.monotonic()
+            self._current.reset(token)
+            self.spans.append(span)
+
+
+_tracer: typing.Optional[ABCTracer] = None
+
+
+def set_tracer(tracer: typing.Optional[ABCTracer]) -> None:
+    """Set global tracer, None disables tracing"""
+    global _tracer
+    _tracer = tracer
+
+
+def get_tracer() -> typing.Optional[ABCTracer]:
+    return _tracer
+
+
+def span(name: str, **attributes: typing.Any) -> typing.ContextManager[SpanLike]:
+    """
+    >>> with span("my_bot.render", template="menu") as current:
+    ...     current.set_attribute("size", 10)
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NOOP_SPAN_CONTEXT
+    return tracer.span(
+        name, {key: value for key, value in attributes.items() if value is not None}
+    )
+
+
+F = typing.TypeVar("F", bound=typing.Callable[..., typing.Awaitable[typing.Any]])
+
+
+def traced(name: str, **attributes: typing.Any) -> typing.Callable[[F], F]:
+    """Decorator of coroutine function which opens span on every call"""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return await func(*args, **kwargs)
+            with span(name, **attributes):
+                return await func(*args, **kwargs)
+
+        return typing.cast(F, wrapper)
+
+    return decorator